@@ -1,20 +1,56 @@
 import asyncio
+import functools
 import logging
+import time
+from collections import deque
+from collections.abc import Iterable
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import aiohttp_client
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
+    UpdateFailed,
 )
 
 from .api import CurrentConditions, WeatherLinkBroadcast, WeatherLinkRest
-from .api.conditions import DeviceType
-from .config_flow import get_listen_to_broadcasts
+from .api.capture import CaptureRecord, CaptureWriter, RecordKind, replay
+from .api.conditions import (
+    AirQualityCondition,
+    ConditionChanges,
+    ConditionRecord,
+    DeviceType,
+    IssCondition,
+    LssBarCondition,
+    field_names,
+)
+from .api.from_json import JsonObject
+from .api.metrics import (
+    CpuMeter,
+    Histogram,
+    RecentEvent,
+    StageLatency,
+    recent_events,
+)
+from .api.rest import CircuitBreaker
+from .config_flow import (
+    KEY_TRIGGER_BAR_TREND,
+    KEY_TRIGGER_RAIN_RATE,
+    KEY_TRIGGER_WIND_SPEED,
+    get_adaptive_polling,
+    get_broadcast_on_events,
+    get_broadcast_triggers,
+    get_listen_to_broadcasts,
+    get_measure_latency,
+    get_record_traffic,
+    get_update_interval_bounds,
+)
 from .const import DOMAIN, PLATFORMS
+from .polling import AdaptiveInterval, EventTrigger, PhaseLockedPoller, StreamHealth
 
 logger = logging.getLogger(__name__)
 
@@ -33,19 +69,138 @@ def get_update_interval(entry: ConfigEntry) -> timedelta:
     return timedelta(seconds=seconds)
 
 
-MAX_FAIL_COUNTER: int = 3
+type ConditionField = tuple[type[ConditionRecord], str]
+
+
+def condition_fields(
+    classes: type[ConditionRecord] | Iterable[type[ConditionRecord]], *names: str
+) -> frozenset[ConditionField]:
+    """Build the set of input fields of an entity which reads the given fields.
+
+    Every name belongs to the first of `classes` which has a field with that name.
+    """
+    if isinstance(classes, type):
+        classes = (classes,)
+    else:
+        classes = tuple(classes)
+
+    fields: set[ConditionField] = set()
+    for name in names:
+        for cls in classes:
+            if name in field_names(cls):
+                fields.add((cls, name))
+                break
+        else:
+            qualnames = ", ".join(cls.__qualname__ for cls in classes)
+            raise ValueError(f"none of {qualnames} has a field {name!r}")
+
+    return frozenset(fields)
+
+
 FAIL_TIMEOUT: float = 3.0
+REQUEST_DEADLINE_FRACTION: float = 0.8
+"""Fraction of the update interval a refresh (including retries) may take."""
+MIN_REQUEST_DEADLINE: float = 5.0
+
+STORE_VERSION: int = 1
+STORE_SAVE_DELAY: float = 300.0
+"""Seconds to collect polls before the last known conditions are written to disk."""
+MAX_RESTORE_AGE: float = 3600.0
+"""Seconds after which restored conditions no longer count as current.
+
+Older conditions still set up the entities, but they stay unavailable until the device answers.
+"""
+
+
+def get_conditions_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[JsonObject]:
+    return Store(hass, STORE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def get_capture_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    return hass.config.path(f"{DOMAIN}.{entry.entry_id}.capture")
+
+
+MAX_CAPTURE_BYTES: int = 64 * 1024 * 1024
+"""Size at which recording traffic stops, a few days worth of broadcasts."""
+
+
+BROADCAST_STALL_TIMEOUT: float = 10.0
+"""Seconds without a broadcast packet after which regular polling resumes."""
+BROADCAST_POLL_INTERVAL: float = 300.0
+"""Update interval while broadcasts arrive, only the fields missing from them need polling."""
+
+ADAPTIVE_THRESHOLDS: dict[ConditionField, float] = {
+    (IssCondition, "rain_rate_last"): 1.0,
+    (IssCondition, "wind_speed_avg_last_1_min"): 5.0,
+    (IssCondition, "temp"): 0.5,
+    (LssBarCondition, "bar_sea_level"): 0.1,
+    (AirQualityCondition, "pm_2p5"): 5.0,
+}
+"""Change per minute of the fields watched by adaptive polling which counts as fast."""
+
+BROADCAST_TRIGGER_FIELDS: dict[str, ConditionField] = {
+    KEY_TRIGGER_WIND_SPEED: (IssCondition, "wind_speed_last"),
+    KEY_TRIGGER_RAIN_RATE: (IssCondition, "rain_rate_last"),
+    KEY_TRIGGER_BAR_TREND: (LssBarCondition, "bar_trend"),
+}
+"""Fields checked by event-triggered broadcasts.
+
+Wind speed and rain rate are part of every broadcast packet. The pressure trend isn't, it's only
+checked when the conditions are polled.
+"""
+BROADCAST_QUIET_PERIOD: float = 900.0
+"""Seconds without any exceeded trigger after which event-triggered broadcasts lapse."""
 
 
 class WeatherLinkCoordinator(DataUpdateCoordinator[CurrentConditions]):
     session: WeatherLinkRest
+    breaker: CircuitBreaker
+    poller: PhaseLockedPoller
+    next_poll_delay: float
+    """seconds from the end of a refresh to the next one, `update_interval` stays the nominal interval"""
+    adaptive: AdaptiveInterval[ConditionField] | None = None
+    broadcast_health: StreamHealth
+    broadcast_trigger: EventTrigger[ConditionField] | None = None
 
     _device_type: DeviceType
     device_did: str
     device_name: str
     device_model_name: str
 
+    last_changes: ConditionChanges
+    """Fields changed by the most recent poll or broadcast."""
+
+    broadcast: WeatherLinkBroadcast | None = None
+    """currently running broadcast"""
+    capture: CaptureWriter | None = None
+    """records the raw traffic of the device while traffic recording is enabled"""
+    packet_latency: StageLatency | None = None
+    """latency of the broadcast packets until the entities are written, while measured"""
+    refresh_count: int
+    retry_count: int
+    failed_refresh_count: int
+    skipped_refresh_count: int
+    """number of refreshes skipped because the device is offline"""
+    refresh_time: Histogram
+    """time taken by successful refreshes, including retries"""
+    recent_refreshes: deque[RecentEvent]
+    refresh_cpu: CpuMeter | None = None
+    """CPU time spent processing polled conditions, while measured"""
+    notify_cpu: CpuMeter | None = None
+    """CPU time spent notifying listeners including the entity writes, while measured"""
+    entity_cpu: CpuMeter | None = None
+    """CPU time spent writing entity states which evaluates their properties, while measured"""
+
+    __entities_by_field: dict[ConditionField, set["WeatherLinkEntity"]]
+    __entities_without_fields: set["WeatherLinkEntity"]
+    __time_dependent_entities: set["WeatherLinkEntity"]
+
     __broadcast_task: asyncio.Task[None] | None = None
+    __store: Store[JsonObject]
+    __stored_raw: JsonObject | None = None
+    __stored_at: float = 0.0
+    __restored: bool = False
+    """the data was restored from the store and the device hasn't answered since"""
 
     def __set_broadcast_task_state(self, on: bool) -> None:
         if self.__broadcast_task:
@@ -61,61 +216,510 @@ class WeatherLinkCoordinator(DataUpdateCoordinator[CurrentConditions]):
             self.__broadcast_task = None
 
     async def __update_config(self, hass: HomeAssistant, entry: ConfigEntry):
-        self.update_interval = get_update_interval(entry)
+        self.update_interval = update_interval = get_update_interval(entry)
+        self.poller.set_period(update_interval.total_seconds())
+
+        if get_adaptive_polling(entry):
+            min_interval, max_interval = get_update_interval_bounds(entry)
+            self.adaptive = AdaptiveInterval(
+                ADAPTIVE_THRESHOLDS,
+                min_interval=min_interval.total_seconds(),
+                max_interval=max_interval.total_seconds(),
+                interval=update_interval.total_seconds(),
+            )
+            self.poller.set_period(self.adaptive.interval)
+            self.update_interval = timedelta(seconds=self.adaptive.interval)
+        else:
+            self.adaptive = None
+        self.next_poll_delay = self.poller.period
+        # the update interval diagnostic shows the new period
+        self.async_write_time_dependent_entities()
 
-        self.__set_broadcast_task_state(
+        listen = (
             self._device_type.supports_real_time_api()
             and get_listen_to_broadcasts(entry)
         )
+        if listen and get_broadcast_on_events(entry):
+            thresholds = get_broadcast_triggers(entry)
+            self.broadcast_trigger = trigger = EventTrigger(
+                {
+                    field: thresholds[key]
+                    for key, field in BROADCAST_TRIGGER_FIELDS.items()
+                },
+                quiet_period=BROADCAST_QUIET_PERIOD,
+            )
+            listen = trigger.update(
+                hass.loop.time(), self.__field_values(self.data, trigger.thresholds)
+            )
+        else:
+            self.broadcast_trigger = None
+
+        await self.__set_capture_state(
+            get_record_traffic(entry), get_capture_path(hass, entry)
+        )
+        if not get_measure_latency(entry):
+            self.packet_latency = None
+            self.refresh_cpu = self.notify_cpu = self.entity_cpu = None
+            self.session.parse_cpu = None
+        elif self.packet_latency is None:
+            self.packet_latency = StageLatency()
+            self.refresh_cpu = CpuMeter()
+            self.notify_cpu = CpuMeter()
+            self.entity_cpu = CpuMeter()
+            self.session.parse_cpu = CpuMeter()
+        if self.broadcast is not None:
+            self.__set_broadcast_metrics(self.broadcast)
+        self.__set_broadcast_task_state(listen)
+
+    async def __set_capture_state(self, on: bool, path: str) -> None:
+        capture = self.capture
+        if capture is not None and not on:
+            logger.info("stopping to record traffic to %s", capture.path)
+            self.capture = None
+            self.session.capture = None
+            if self.broadcast is not None:
+                self.broadcast.protocol.capture = None
+            await self.hass.async_add_executor_job(capture.close)
+        elif capture is None and on:
+            logger.info("recording traffic to %s", path)
+            self.capture = capture = await self.hass.async_add_executor_job(
+                functools.partial(CaptureWriter, path, max_bytes=MAX_CAPTURE_BYTES)
+            )
+            self.session.capture = capture
+            if self.broadcast is not None:
+                self.broadcast.protocol.capture = capture
 
     async def __initialize(self, session: WeatherLinkRest, entry: ConfigEntry) -> None:
         self.session = session
+        self.breaker = CircuitBreaker()
+        self.broadcast_health = StreamHealth(BROADCAST_STALL_TIMEOUT)
+        assert self.update_interval is not None
+        self.poller = PhaseLockedPoller(self.update_interval.total_seconds())
+        self.next_poll_delay = self.poller.period
         entry.add_update_listener(self.__update_config)
 
+        self.last_changes = {}
+        self.refresh_count = 0
+        self.retry_count = 0
+        self.failed_refresh_count = 0
+        self.skipped_refresh_count = 0
+        self.refresh_time = Histogram()
+        self.recent_refreshes = recent_events()
+        self.__entities_by_field = {}
+        self.__entities_without_fields = set()
+        self.__time_dependent_entities = set()
         self.update_method = self.__fetch_data
-        conditions = self.data = await self.__fetch_data()
-        if conditions is None:
-            raise RuntimeError(f"failed to get conditions from {session.base_url!r}")
-        self._device_type = conditions.determine_device_type()
-        self.device_did = conditions.did
-        self.device_model_name = self._device_type.value
-        self.device_name = conditions.determine_device_name()
+        self.__store = get_conditions_store(self.hass, entry)
+
+        if await self.__restore():
+            # entities are created from the last known conditions, the device can take its time
+            entry.async_create_background_task(
+                self.hass, self.async_refresh(), "weatherlink initial refresh"
+            )
+        else:
+            conditions = self.data = await self.__fetch_data()
+            if conditions is None:
+                raise RuntimeError(
+                    f"failed to get conditions from {session.base_url!r}"
+                )
+            self._device_type = conditions.determine_device_type()
+            self.device_did = conditions.did
+            self.device_model_name = self._device_type.value
+            self.device_name = conditions.determine_device_name()
 
         await self.__update_config(self.hass, entry)
 
+    async def __restore(self) -> bool:
+        try:
+            stored = await self.__store.async_load()
+            if stored is None:
+                return False
+
+            # stores written before the time was saved count as old
+            stored_at: float = stored.get("stored_at", 0.0)
+            conditions = CurrentConditions.from_json(stored["conditions"])
+            device_type = DeviceType(stored["device_type"])
+            device_name: str = stored["device_name"]
+        except Exception:
+            logger.exception("failed to restore the last known conditions")
+            return False
+
+        fresh = time.time() - stored_at <= MAX_RESTORE_AGE
+        logger.debug(
+            "restored %s conditions of %s from %s",
+            "current" if fresh else "old",
+            conditions.did,
+            conditions.ts,
+        )
+        self.data = conditions
+        # old conditions are only shown once the device confirmed them
+        self.last_update_success = fresh
+        self.__restored = True
+        self.__stored_raw = conditions.raw
+        self.__stored_at = stored_at
+        self._device_type = device_type
+        self.device_did = conditions.did
+        self.device_model_name = device_type.value
+        self.device_name = device_name
+        return True
+
+    def __persist(self, conditions: CurrentConditions) -> None:
+        if conditions.raw is None:
+            return
+
+        self.__stored_raw = conditions.raw
+        self.__stored_at = time.time()
+        self.__store.async_delay_save(self.__stored_data, STORE_SAVE_DELAY)
+
+    def __stored_data(self) -> JsonObject:
+        return {
+            "device_type": self._device_type.value,
+            "device_name": self.device_name,
+            "conditions": self.__stored_raw,
+            "stored_at": self.__stored_at,
+        }
+
+    def __request_deadline(self) -> float:
+        return max(self.poller.period * REQUEST_DEADLINE_FRACTION, MIN_REQUEST_DEADLINE)
+
+    def __schedule_next_poll(
+        self, conditions: CurrentConditions, polled_at: float
+    ) -> None:
+        # Only the AirLink reports when it last refreshed its data. The WLL's ts is when the
+        # response was generated and its ISS data changes every few seconds, so there's no
+        # refresh to lock onto and a WLL keeps polling at the fixed interval.
+        data_age = None
+        if AirQualityCondition in conditions:
+            last_report_time = conditions[AirQualityCondition].last_report_time
+            data_age = (conditions.ts - last_report_time).total_seconds()
+
+        poller = self.poller
+        if self.adaptive is not None:
+            interval = self.adaptive.observe(
+                polled_at, self.__field_values(conditions, ADAPTIVE_THRESHOLDS)
+            )
+            if interval != poller.period:
+                logger.debug("adapting update interval to %.1f seconds", interval)
+                poller.set_period(interval)
+                self.update_interval = timedelta(seconds=interval)
+
+        poller.observe(polled_at, data_age=data_age)
+        delay = poller.next_delay(polled_at)
+        if self.broadcast_health.is_healthy(polled_at):
+            delay = max(delay, BROADCAST_POLL_INTERVAL)
+        self.next_poll_delay = delay
+
+        if logger.isEnabledFor(logging.DEBUG) and (summary := poller.age_summary()):
+            logger.debug(
+                "data age over the last %d polls: mean %.1fs, p50 %.1fs, p90 %.1fs, max %.1fs",
+                summary.count,
+                summary.mean,
+                summary.p50,
+                summary.p90,
+                summary.max,
+            )
+
+    @staticmethod
+    def __field_values(
+        conditions: CurrentConditions, fields: Iterable[ConditionField]
+    ) -> dict[ConditionField, float | None]:
+        values: dict[ConditionField, float | None] = {}
+        for field in fields:
+            cls, name = field
+            if cls in conditions:
+                values[field] = getattr(conditions[cls], name)
+        return values
+
+    def __check_broadcast_trigger(self, conditions: CurrentConditions) -> None:
+        trigger = self.broadcast_trigger
+        if trigger is None:
+            return
+
+        was_active = trigger.active
+        active = trigger.update(
+            self.hass.loop.time(), self.__field_values(conditions, trigger.thresholds)
+        )
+        if active == was_active:
+            return
+
+        if active:
+            cls, name = trigger.triggered_by  # type: ignore[misc]
+            logger.info(
+                "%s.%s exceeded its threshold, requesting real-time broadcasts",
+                cls.__qualname__,
+                name,
+            )
+        else:
+            logger.info(
+                "conditions are quiet again, letting real-time broadcasts lapse"
+            )
+        self.__set_broadcast_task_state(active)
+
     async def __fetch_data(self) -> CurrentConditions:
-        exc_info = None
-        for _ in range(MAX_FAIL_COUNTER):
+        # fall back to the nominal period unless the poll succeeds
+        self.next_poll_delay = self.poller.period
+        self.refresh_count += 1
+        breaker = self.breaker
+        if not breaker.allow():
+            self.skipped_refresh_count += 1
+            logger.debug(
+                "device is offline, next attempt in %.1f seconds", breaker.retry_in
+            )
+            return self.__keep_data()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.__request_deadline()
+        while True:
             try:
-                conditions = await self.session.current_conditions()
+                # a cached result would report a poll time long after the fetch and skew the
+                # phase, so a poll may only share an in-flight request
+                conditions = await self.session.current_conditions(
+                    max_age=0, timeout=deadline - loop.time()
+                )
             except Exception as exc:
-                exc_info = exc
-                await asyncio.sleep(FAIL_TIMEOUT)
+                delay = breaker.record_failure()
+                # an open breaker only allows a single probe per refresh
+                if breaker.is_open or loop.time() + delay >= deadline:
+                    self.failed_refresh_count += 1
+                    self.recent_refreshes.append(
+                        RecentEvent(
+                            at=time.time(),
+                            name="refresh",
+                            duration=loop.time() - start,
+                            error=repr(exc),
+                        )
+                    )
+                    logger.warning(
+                        "failed to get current conditions after %d consecutive attempt(s)",
+                        breaker.failures,
+                        exc_info=exc,
+                    )
+                    return self.__keep_data()
+                self.retry_count += 1
+                await asyncio.sleep(delay)
             else:
-                break
-        else:
-            logger.warning(
-                f"failed to get current conditions in {MAX_FAIL_COUNTER} attempt(s)",
-                exc_info=exc_info,
-            )
-            conditions = self.data
+                cpu = self.refresh_cpu
+                cpu_start = time.thread_time() if cpu is not None else 0.0
+                breaker.record_success()
+                duration = loop.time() - start
+                self.refresh_time.observe(duration)
+                self.recent_refreshes.append(
+                    RecentEvent(at=time.time(), name="refresh", duration=duration)
+                )
+                self.__restored = False
+                self.__schedule_next_poll(conditions, loop.time())
+                self.__persist(conditions)
+                conditions = self.__apply_polled_conditions(conditions)
+                self.__check_broadcast_trigger(conditions)
+                if cpu is not None:
+                    cpu.add(time.thread_time() - cpu_start)
+                return conditions
+
+    def __keep_data(self) -> CurrentConditions:
+        """Get the data to keep after a failed refresh."""
+        if self.__restored:
+            # restored conditions only count once the device confirmed them
+            raise UpdateFailed("the device hasn't answered since starting")
+        return self.data
+
+    def __apply_polled_conditions(
+        self, conditions: CurrentConditions
+    ) -> CurrentConditions:
+        previous = self.data
+        if previous is None:
+            return conditions
+
+        self.last_changes = changes = previous.changes_to(conditions)
+        if not changes:
+            # returning the unchanged data object makes the coordinator skip notifying the listeners
+            previous.ts = conditions.ts
+            self.async_write_time_dependent_entities()
+            return previous
 
         return conditions
 
+    @callback
+    def async_subscribe_fields(
+        self,
+        entity: "WeatherLinkEntity",
+        fields: frozenset[ConditionField] | None,
+        *,
+        time_dependent: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Register an entity for the given input fields.
+
+        Entities without declared fields (`None`) are written on every change. Time dependent
+        entities are additionally written after every successful poll, even if nothing changed.
+        """
+        if fields is None:
+            self.__entities_without_fields.add(entity)
+        else:
+            for field in fields:
+                self.__entities_by_field.setdefault(field, set()).add(entity)
+        if time_dependent:
+            self.__time_dependent_entities.add(entity)
+
+        @callback
+        def unsubscribe() -> None:
+            self.__entities_without_fields.discard(entity)
+            self.__time_dependent_entities.discard(entity)
+            for field in fields or ():
+                if entities := self.__entities_by_field.get(field):
+                    entities.discard(entity)
+
+        return unsubscribe
+
+    @callback
+    def async_write_changed_entities(self, changes: ConditionChanges) -> None:
+        """Write the state of every entity which reads one of the changed fields."""
+        entities = set(self.__entities_without_fields)
+        by_field = self.__entities_by_field
+        for cls, names in changes.items():
+            for name in names:
+                if field_entities := by_field.get((cls, name)):
+                    entities.update(field_entities)
+
+        cpu = self.notify_cpu
+        cpu_start = time.thread_time() if cpu is not None else 0.0
+        for entity in entities:
+            entity.async_write_ha_state()
+        if cpu is not None:
+            cpu.add(time.thread_time() - cpu_start)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        # the base class schedules the next refresh after `update_interval`, which only changes
+        # with the nominal interval
+        update_interval = self.update_interval
+        if update_interval is None:
+            super()._schedule_refresh()
+            return
+
+        self.update_interval = timedelta(seconds=self.next_poll_delay)
+        try:
+            super()._schedule_refresh()
+        finally:
+            self.update_interval = update_interval
+
+    @callback
+    def async_write_time_dependent_entities(self) -> None:
+        """Write the state of the entities which change over time without any new data."""
+        cpu = self.notify_cpu
+        cpu_start = time.thread_time() if cpu is not None else 0.0
+        for entity in self.__time_dependent_entities:
+            entity.async_write_ha_state()
+        if cpu is not None:
+            cpu.add(time.thread_time() - cpu_start)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        if (cpu := self.notify_cpu) is None:
+            super().async_update_listeners()
+            return
+        cpu_start = time.thread_time()
+        super().async_update_listeners()
+        cpu.add(time.thread_time() - cpu_start)
+
+    def cpu_meters(self) -> dict[str, CpuMeter]:
+        """Get the CPU time spent per class of callbacks on the event loop.
+
+        Empty unless latency is measured.
+        """
+        meters = {
+            "response_parse": self.session.parse_cpu,
+            "refresh": self.refresh_cpu,
+            "notify": self.notify_cpu,
+            "entity_write": self.entity_cpu,
+        }
+        if (broadcast := self.broadcast) is not None:
+            meters["datagram_parse"] = broadcast.protocol.parse_cpu
+        return {name: meter for name, meter in meters.items() if meter is not None}
+
+    def __set_broadcast_metrics(self, broadcast: WeatherLinkBroadcast) -> None:
+        protocol = broadcast.protocol
+        protocol.latency = self.packet_latency
+        if self.packet_latency is None:
+            protocol.parse_cpu = None
+        elif protocol.parse_cpu is None:
+            protocol.parse_cpu = CpuMeter()
+
+    def __apply_broadcast_conditions(self, conditions: CurrentConditions) -> None:
+        received_at = conditions.received_at
+        latency = self.packet_latency
+        changes = self.data.update_from(conditions)
+        if latency is not None and received_at is not None:
+            latency.observe("merged", received_at)
+        # only the fields in the packet, the merged data would repeat the polled values
+        self.__check_broadcast_trigger(conditions)
+        if not changes:
+            return
+
+        self.last_changes = changes
+        # only notify the entities reading the changed fields without resetting the polling interval
+        self.async_write_changed_entities(changes)
+        if latency is not None and received_at is not None:
+            latency.observe("written", received_at)
+
+    async def async_replay(
+        self, records: Iterable[CaptureRecord], *, speed: float | None = 1.0
+    ) -> None:
+        """Feed captured traffic through the coordinator as if it arrived just now.
+
+        Args:
+            records: Captured records, e.g. from `read_capture`.
+            speed: Factor by which the replay is faster than real time.
+                `None` replays the records as fast as possible.
+        """
+        async for record in replay(records, speed=speed):
+            try:
+                conditions = record.parse()
+            except Exception:
+                logger.exception("failed to parse captured %s", record.kind.name)
+                continue
+
+            if record.kind == RecordKind.Datagram:
+                self.__apply_broadcast_conditions(conditions)
+                continue
+
+            previous = self.data
+            conditions = self.__apply_polled_conditions(conditions)
+            if conditions is not previous:
+                self.async_set_updated_data(conditions)
+
+    async def __broadcast_stalled(self) -> None:
+        if self.broadcast_health.stall():
+            logger.info("broadcasts stalled, resuming regular polling")
+            await self.async_request_refresh()
+
     async def __broadcast_loop(self) -> None:
+        loop = asyncio.get_running_loop()
         broadcast: WeatherLinkBroadcast | None = None
         try:
             while True:
                 if broadcast is None:
                     try:
-                        broadcast = await WeatherLinkBroadcast.start(self.session)
+                        broadcast = self.broadcast = await WeatherLinkBroadcast.start(
+                            self.session, did=self.device_did
+                        )
+                        broadcast.protocol.capture = self.capture
+                        self.__set_broadcast_metrics(broadcast)
                     except Exception:
                         logger.exception("failed to start broadcast")
+                        await self.__broadcast_stalled()
                         await asyncio.sleep(FAIL_TIMEOUT)
                         continue
 
                 try:
-                    conditions = await broadcast.read()
+                    try:
+                        async with asyncio.timeout(BROADCAST_STALL_TIMEOUT):
+                            conditions = await broadcast.read()
+                    except TimeoutError:
+                        await self.__broadcast_stalled()
+                        continue
+
+                    if self.broadcast_health.feed(loop.time()):
+                        logger.info("receiving broadcasts, slowing down polling")
                     if logger.isEnabledFor(logging.DEBUG):
                         condition_types = {
                             cond.__class__.__name__ for cond in conditions.conditions
@@ -126,15 +730,16 @@ class WeatherLinkCoordinator(DataUpdateCoordinator[CurrentConditions]):
                             conditions.ts,
                             condition_types,
                         )
-                    self.data.update_from(conditions)
-
-                    # TODO theoretically this only needs to update sensors which actually make use of the live data
-                    # notify all listeners without resetting the polling interval
-                    self.async_update_listeners()
+                    # the device is obviously reachable
+                    self.breaker.record_success()
+                    self.__apply_broadcast_conditions(conditions)
                 except Exception:
                     logger.exception("failed to read broadcast")
+                    await self.__broadcast_stalled()
                     await asyncio.sleep(FAIL_TIMEOUT)
         finally:
+            self.broadcast_health.stall()
+            self.broadcast = None
             if broadcast:
                 await broadcast.stop()
 
@@ -147,6 +752,7 @@ class WeatherLinkCoordinator(DataUpdateCoordinator[CurrentConditions]):
             logger,
             name="state",
             update_interval=get_update_interval(entry),
+            always_update=False,
         )
         await coordinator.__initialize(session, entry)
 
@@ -154,16 +760,20 @@ class WeatherLinkCoordinator(DataUpdateCoordinator[CurrentConditions]):
 
     async def destroy(self) -> None:
         self.__set_broadcast_task_state(False)
+        if self.capture is not None:
+            await self.__set_capture_state(False, self.capture.path)
+        self.session.close()
 
 
 async def setup_coordinator(hass: HomeAssistant, entry: ConfigEntry):
     host = entry.data["host"]
 
-    coordinator = await WeatherLinkCoordinator.build(
-        hass,
-        WeatherLinkRest(aiohttp_client.async_get_clientsession(hass), host),
-        entry,
-    )
+    session = WeatherLinkRest(aiohttp_client.async_get_clientsession(hass), host)
+    try:
+        coordinator = await WeatherLinkCoordinator.build(hass, session, entry)
+    except BaseException:
+        session.close()
+        raise
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
@@ -176,6 +786,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await get_conditions_store(hass, entry).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     for platform in PLATFORMS:
         await hass.config_entries.async_forward_entry_unload(entry, platform)
@@ -187,9 +801,31 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 class WeatherLinkEntity(CoordinatorEntity[WeatherLinkCoordinator]):
+    _input_fields: frozenset[ConditionField] | None = None
+    """Condition fields the state is derived from. `None` means the entity depends on everything."""
+    _time_dependent: bool = False
+    """The state also depends on the current time or other entities, so it's written after every poll."""
+
     def __init__(self, coordinator: WeatherLinkCoordinator) -> None:
         super().__init__(coordinator)
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_subscribe_fields(
+                self, self._input_fields, time_dependent=self._time_dependent
+            )
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        if (cpu := self.coordinator.entity_cpu) is None:
+            super().async_write_ha_state()
+            return
+        cpu_start = time.thread_time()
+        super().async_write_ha_state()
+        cpu.add(time.thread_time() - cpu_start)
+
     @property
     def _conditions(self) -> CurrentConditions:
         return self.coordinator.data
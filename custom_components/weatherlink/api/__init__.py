@@ -1,6 +1,7 @@
 from .broadcast import WeatherLinkBroadcast
 from .conditions import CurrentConditions
-from .rest import ApiError, WeatherLinkRest
+from .from_json import ApiError
+from .rest import WeatherLinkRest
 
 __all__ = [
     "ApiError",
@@ -3,81 +3,247 @@ import contextlib
 import json
 import logging
 import time
+from collections import deque
+from collections.abc import Callable
 from datetime import timedelta
 from typing import Any, override
 
+from .capture import CaptureWriter, RecordKind
 from .conditions import CurrentConditions
+from .metrics import (
+    CpuMeter,
+    Histogram,
+    RateMeter,
+    RecentEvent,
+    StageLatency,
+    recent_events,
+)
 from .rest import WeatherLinkRest
 
 logger = logging.getLogger(__name__)
 
 
-class Protocol(asyncio.DatagramProtocol):
-    remote_addr: str
+type _Message = CurrentConditions | BaseException
 
-    transport: asyncio.DatagramTransport
-    queue: asyncio.Queue[CurrentConditions | BaseException]
-    connection_lost_fut: asyncio.Future[Exception | None]
 
-    def __init__(self, remote_addr: str, *, queue_size: int = 16) -> None:
-        super().__init__()
-        self.remote_addr = remote_addr
+class Mailbox:
+    """Single slot holding the latest broadcast message.
 
-        # transport made by `connection_made`
-        self.queue = asyncio.Queue(queue_size)
+    Instead of queueing up, packets which arrive while the reader is behind are merged into the
+    pending one. The reader therefore always gets the most recent state.
+    """
+
+    merged: int
+    """number of packets merged into a pending one"""
+    dropped: int
+    """number of messages thrown away, e.g. errors superseded by newer data"""
+
+    _item: _Message | None
+    _waiter: asyncio.Future[None] | None
+    _closed_exc: BaseException | None
+
+    def __init__(self) -> None:
+        self.merged = 0
+        self.dropped = 0
+
+        self._item = None
+        self._waiter = None
+        self._closed_exc = None
+
+    def put(self, item: _Message) -> None:
+        pending = self._item
+        if isinstance(pending, CurrentConditions):
+            if isinstance(item, BaseException):
+                # keep the data, the error will most likely repeat with the next packet anyway
+                self.dropped += 1
+                return
+
+            self._item = _merge_conditions(pending, item)
+            self.merged += 1
+            return
+
+        if pending is not None:
+            self.dropped += 1
+
+        self._item = item
+        if (waiter := self._waiter) is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def close(self, exc: BaseException) -> None:
+        """Make all current and future reads fail with `exc` once the pending message is consumed."""
+        self._closed_exc = exc
+        if (waiter := self._waiter) is not None and not waiter.done():
+            waiter.set_exception(exc)
+
+    def get_nowait(self) -> _Message | None:
+        item = self._item
+        self._item = None
+        return item
+
+    async def get(self) -> _Message:
+        while (item := self.get_nowait()) is None:
+            if self._closed_exc is not None:
+                raise self._closed_exc
+
+            # the waiter is only resolved, the message itself stays in the slot so that
+            # packets arriving before the reader resumes are still merged into it
+            waiter = self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await waiter
+            finally:
+                self._waiter = None
+
+        return item
+
+
+def _merge_conditions(
+    pending: CurrentConditions, item: CurrentConditions
+) -> CurrentConditions:
+    # the newer packet wins, even if the packets arrived out of order
+    older, newer = (pending, item) if pending.ts <= item.ts else (item, pending)
+    older.update_from(newer)
+    older.ts = newer.ts
+    # the latency is measured from the packet which has been waiting the longest
+    older.received_at = pending.received_at
+    return older
+
+
+class Protocol:
+    """Receives the broadcasts of a single device.
+
+    The socket itself is owned by a `BroadcastHub` endpoint which is shared by all devices
+    broadcasting to the same port.
+    """
+
+    did: str | None
+    """serial number of the device, packets from other devices are rejected"""
+    rejected: int
+    """number of packets rejected because they came from a different device"""
+    bytes_received: int
+    packets: RateMeter
+    """packets received from the device, including invalid and rejected ones"""
+    parse_time: Histogram
+    parse_cpu: CpuMeter | None
+    """measures the CPU time spent handling packets of the device while set"""
+    parse_errors: deque[RecentEvent]
+    capture: CaptureWriter | None
+    """records every packet of the device while set, even ones which fail to parse"""
+    latency: StageLatency | None
+    """measures the latency of the packets through the stages while set"""
+
+    mailbox: Mailbox
+    connection_lost_fut: asyncio.Future[Exception | None]
+
+    _remote_addr: str
+    _endpoint: "_HubEndpoint | None"
+
+    def __init__(self, remote_addr: str, *, did: str | None = None) -> None:
+        self._remote_addr = remote_addr
+        self._endpoint = None
+        self.did = did
+        self.rejected = 0
+        self.bytes_received = 0
+        self.packets = RateMeter()
+        self.parse_time = Histogram()
+        self.parse_cpu = None
+        self.parse_errors = recent_events()
+        self.capture = None
+        self.latency = None
+
+        self.mailbox = Mailbox()
         self.connection_lost_fut = asyncio.Future()
 
     def __str__(self) -> str:
         return f"<{type(self).__qualname__} {self.remote_addr=!r}>"
 
     @classmethod
-    async def open(cls, remote_addr: str, *, addr: str, port: int, **kwargs: Any):
-        loop = asyncio.get_running_loop()
-        _, protocol = await loop.create_datagram_endpoint(
-            lambda: cls(remote_addr, **kwargs),
-            local_addr=(addr, port),
-        )
+    async def open(
+        cls,
+        remote_addr: str,
+        *,
+        addr: str,
+        port: int,
+        hub: "BroadcastHub | None" = None,
+        **kwargs: Any,
+    ):
+        protocol = cls(remote_addr, **kwargs)
+        await (hub or BroadcastHub.default()).register(protocol, addr=addr, port=port)
         return protocol
 
-    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
-        logger.debug("%s connection made", self)
-        self.transport = transport
+    @property
+    def remote_addr(self) -> str:
+        return self._remote_addr
+
+    @remote_addr.setter
+    def remote_addr(self, remote_addr: str) -> None:
+        if self._endpoint is not None:
+            self._endpoint.reroute(self, self._remote_addr, remote_addr)
+        self._remote_addr = remote_addr
 
     def connection_lost(self, exc: Exception | None) -> None:
         logger.debug("%s connection lost with error: %s", self, exc)
-        self.connection_lost_fut.set_result(exc)
+        self._endpoint = None
+        if not self.connection_lost_fut.done():
+            self.connection_lost_fut.set_result(exc)
+        self.mailbox.close(exc or RuntimeError("connection closed"))
 
-    def __queue_put(self, item: CurrentConditions | BaseException) -> None:
-        with contextlib.suppress(asyncio.QueueFull):
-            self.queue.put_nowait(item)
-
-    @override
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
-        if addr[0] != self.remote_addr:
+        if addr[0] != self._remote_addr:
             return
 
-        if self.queue.full():
-            logger.warning(
-                "ignoring message from %s because queue is already full", addr
-            )
+        if (cpu := self.parse_cpu) is None:
+            start = time.perf_counter()
+            self.packets.mark(time.monotonic())
+            self.__handle_datagram(data, addr, start)
             return
 
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        now = time.monotonic()
+        self.packets.mark(now)
+        try:
+            self.__handle_datagram(data, addr, start)
+        finally:
+            cpu.add(time.thread_time() - cpu_start, now)
+
+    def __handle_datagram(
+        self, data: bytes, addr: tuple[str, int], start: float
+    ) -> None:
+        self.bytes_received += len(data)
+        if (capture := self.capture) is not None:
+            capture.write(RecordKind.Datagram, data)
         try:
             parsed_data = json.loads(data)
-        except Exception:
+        except Exception as exc:
             logger.exception(f"failed to parse broadcast payload from {addr}: {data}")
+            self.parse_errors.append(
+                RecentEvent(at=time.time(), name="json", error=repr(exc))
+            )
             return
 
         msg: CurrentConditions | BaseException
         try:
             msg = CurrentConditions.from_json(parsed_data)
         except Exception as exc:
+            self.parse_errors.append(
+                RecentEvent(at=time.time(), name="conditions", error=repr(exc))
+            )
             msg = exc
+        else:
+            self.parse_time.observe(time.perf_counter() - start)
+            if self.did is not None and msg.did != self.did:
+                self.rejected += 1
+                return
+            if (latency := self.latency) is not None:
+                msg.received_at = start
+                latency.observe("parsed", start)
 
-        self.__queue_put(msg)
+        self.mailbox.put(msg)
 
     async def close(self) -> None:
-        self.transport.close()
+        if (endpoint := self._endpoint) is not None:
+            endpoint.unregister(self)
+        self.connection_lost(None)
         await self.connection_lost_fut
 
     def raise_if_connection_lost(self) -> None:
@@ -90,30 +256,173 @@ class Protocol(asyncio.DatagramProtocol):
 
         raise RuntimeError("connection closed")
 
-    async def __queue_get_raw(self) -> CurrentConditions | BaseException:
-        try:
-            return self.queue.get_nowait()
-        except asyncio.QueueEmpty:
-            pass
-
-        conn_lost = self.connection_lost_fut
-        queue_get = asyncio.create_task(self.queue.get())
-        await asyncio.wait({conn_lost, queue_get}, return_when=asyncio.FIRST_COMPLETED)
-        # handle the case where the connection was lost
-        self.raise_if_connection_lost()
-        return await queue_get
-
     async def queue_get(self) -> CurrentConditions:
-        msg = await self.__queue_get_raw()
+        msg = await self.mailbox.get()
         if isinstance(msg, BaseException):
             raise msg
+        if (latency := self.latency) is not None and msg.received_at is not None:
+            latency.observe("read", msg.received_at)
         return msg
 
 
+class _HubEndpoint(asyncio.DatagramProtocol):
+    """Datagram endpoint routing the packets received on a port to the registered protocols."""
+
+    key: tuple[str, int]
+    rejected: int
+    """number of packets from unregistered addresses"""
+
+    transport: asyncio.DatagramTransport
+    closed: asyncio.Future[None]
+
+    _hub: "BroadcastHub"
+    _routes: dict[str, list[Protocol]]
+
+    def __init__(self, hub: "BroadcastHub", key: tuple[str, int]) -> None:
+        super().__init__()
+        self.key = key
+        self.rejected = 0
+        # transport made by `connection_made`
+        self.closed = asyncio.get_running_loop().create_future()
+
+        self._hub = hub
+        self._routes = {}
+
+    def __str__(self) -> str:
+        return f"<{type(self).__qualname__} {self.key=!r}>"
+
+    def __len__(self) -> int:
+        return sum(len(protocols) for protocols in self._routes.values())
+
+    def register(self, protocol: Protocol) -> None:
+        self._routes.setdefault(protocol.remote_addr, []).append(protocol)
+        protocol._endpoint = self
+
+    def unregister(self, protocol: Protocol) -> None:
+        self.__remove_route(protocol.remote_addr, protocol)
+        protocol._endpoint = None
+        if not self._routes:
+            self._hub._close_endpoint(self)
+
+    def reroute(self, protocol: Protocol, old_addr: str, new_addr: str) -> None:
+        self.__remove_route(old_addr, protocol)
+        self._routes.setdefault(new_addr, []).append(protocol)
+
+    def __remove_route(self, addr: str, protocol: Protocol) -> None:
+        protocols = self._routes.get(addr)
+        if protocols is None:
+            return
+        with contextlib.suppress(ValueError):
+            protocols.remove(protocol)
+        if not protocols:
+            del self._routes[addr]
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:  # type: ignore[override]
+        logger.debug("%s connection made", self)
+        self.transport = transport
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        logger.debug("%s connection lost with error: %s", self, exc)
+        if not self.closed.done():
+            self.closed.set_result(None)
+        self._hub._forget_endpoint(self)
+
+        routes, self._routes = self._routes, {}
+        for protocols in routes.values():
+            for protocol in protocols:
+                protocol.connection_lost(exc)
+
+    @override
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        # reject unknown devices before spending any time on parsing
+        protocols = self._routes.get(addr[0])
+        if protocols is None:
+            self.rejected += 1
+            return
+
+        for protocol in protocols:
+            protocol.datagram_received(data, addr)
+
+
+class BroadcastHub:
+    """Shares one UDP socket per port between all devices broadcasting to it.
+
+    Every WeatherLink Live broadcasts to the same port, so opening a socket per device doesn't work
+    for more than one device.
+    """
+
+    _DEFAULT: "BroadcastHub | None" = None
+
+    _endpoints: dict[tuple[str, int], _HubEndpoint]
+    _closing: dict[tuple[str, int], _HubEndpoint]
+    _lock: asyncio.Lock
+
+    def __init__(self) -> None:
+        self._endpoints = {}
+        self._closing = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def default(cls) -> "BroadcastHub":
+        """Get the process-wide hub."""
+        if cls._DEFAULT is None:
+            cls._DEFAULT = cls()
+        return cls._DEFAULT
+
+    @property
+    def endpoints(self) -> list[_HubEndpoint]:
+        return list(self._endpoints.values())
+
+    async def register(self, protocol: Protocol, *, addr: str, port: int) -> None:
+        async with self._lock:
+            key = (addr, port)
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                if (closing := self._closing.get(key)) is not None:
+                    # the port is only free once the old socket is actually closed
+                    await closing.closed
+                endpoint = await self.__open_endpoint(key)
+            endpoint.register(protocol)
+
+        logger.debug("registered %s with %s", protocol, endpoint)
+
+    async def __open_endpoint(self, key: tuple[str, int]) -> _HubEndpoint:
+        loop = asyncio.get_running_loop()
+        _, endpoint = await loop.create_datagram_endpoint(
+            lambda: _HubEndpoint(self, key), local_addr=key
+        )
+        self._endpoints[key] = endpoint
+        return endpoint
+
+    def _close_endpoint(self, endpoint: _HubEndpoint) -> None:
+        self._forget_endpoint(endpoint)
+        self._closing[endpoint.key] = endpoint
+        endpoint.transport.close()
+
+    def _forget_endpoint(self, endpoint: _HubEndpoint) -> None:
+        key = endpoint.key
+        if self._endpoints.get(key) is endpoint:
+            del self._endpoints[key]
+        if self._closing.get(key) is endpoint and endpoint.closed.done():
+            del self._closing[key]
+
+
+RENEW_RETRY_MIN: float = 5.0
+RENEW_RETRY_MAX: float = 300.0
+
+
 class BroadcastRenewer:
     remote_addr: str
     broadcast_port: int
 
+    renew_count: int
+    """number of successful renewals"""
+    failure_count: int
+    """number of failed renewal attempts"""
+    last_latency: float | None
+    """duration of the last successful `/v1/real_time` request in seconds"""
+    last_error: BaseException | None
+
     _rest: WeatherLinkRest
     _duration: timedelta
     _renew_at: float
@@ -127,12 +436,22 @@ class BroadcastRenewer:
         self._duration = duration
         self._renew_at = 0.0
 
+        self.renew_count = 0
+        self.failure_count = 0
+        self.last_latency = None
+        self.last_error = None
+
     @classmethod
     async def init(cls, rest: WeatherLinkRest, *, duration: timedelta):
         inst = cls(rest, duration)
         await inst.update()
         return inst
 
+    @property
+    def renew_at(self) -> float:
+        """Unix timestamp of the next scheduled renewal."""
+        return self._renew_at
+
     def should_renew(self) -> bool:
         return time.time() >= self._renew_at
 
@@ -141,36 +460,98 @@ class BroadcastRenewer:
             return False
 
         logger.info("renewing real-time broadcast")
-        rt = await self._rest.real_time(duration=self._duration)
+        start = time.monotonic()
+        try:
+            rt = await self._rest.real_time(duration=self._duration)
+        except Exception as exc:
+            self.failure_count += 1
+            self.last_error = exc
+            raise
 
+        self.last_latency = time.monotonic() - start
+        self.renew_count += 1
+        # renew halfway through so there's plenty of time for retries before the broadcast expires
         self._renew_at = time.time() + rt.duration / 2
         self.remote_addr = rt.addr
         self.broadcast_port = rt.broadcast_port
         return True
 
+    async def run(self, on_renewed: Callable[[], None]) -> None:
+        """Keep renewing the broadcast in the background until cancelled.
+
+        Failed renewals are retried with an exponential backoff.
+        """
+        while True:
+            await asyncio.sleep(max(self._renew_at - time.time(), 0.0))
+
+            retry_delay = RENEW_RETRY_MIN
+            while True:
+                try:
+                    renewed = await self.update()
+                except Exception:
+                    logger.warning(
+                        "failed to renew real-time broadcast, retrying in %.0f seconds",
+                        retry_delay,
+                        exc_info=True,
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, RENEW_RETRY_MAX)
+                    continue
+
+                if renewed:
+                    on_renewed()
+                break
+
 
 class WeatherLinkBroadcast:
     _protocol: Protocol
     _renewer: BroadcastRenewer
+    _renew_task: asyncio.Task[None]
 
     def __init__(self, protocol: Protocol, renewer: BroadcastRenewer) -> None:
         self._protocol = protocol
         self._renewer = renewer
+        self._renew_task = asyncio.create_task(
+            renewer.run(self.__on_renewed), name="broadcast renewer"
+        )
 
     @classmethod
-    async def start(cls, rest: WeatherLinkRest):
+    async def start(
+        cls,
+        rest: WeatherLinkRest,
+        *,
+        did: str | None = None,
+        hub: BroadcastHub | None = None,
+    ):
         renewer: BroadcastRenewer = await BroadcastRenewer.init(
             rest, duration=timedelta(hours=1)
         )
         protocol = await Protocol.open(
-            renewer.remote_addr, addr="0.0.0.0", port=renewer.broadcast_port
+            renewer.remote_addr,
+            addr="0.0.0.0",
+            port=renewer.broadcast_port,
+            hub=hub,
+            did=did,
         )
         return cls(protocol, renewer)
 
+    @property
+    def renewer(self) -> BroadcastRenewer:
+        return self._renewer
+
+    @property
+    def protocol(self) -> Protocol:
+        return self._protocol
+
+    def __on_renewed(self) -> None:
+        self._protocol.remote_addr = self._renewer.remote_addr
+
     async def stop(self) -> None:
+        self._renew_task.cancel()
+        # a renewal in flight holds the host scheduler until it's done
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._renew_task
         await self._protocol.close()
 
     async def read(self) -> CurrentConditions:
-        if await self._renewer.update():
-            self._protocol.remote_addr = self._renewer.remote_addr
         return await self._protocol.queue_get()
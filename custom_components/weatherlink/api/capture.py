@@ -0,0 +1,201 @@
+"""Record and replay the raw traffic of a device.
+
+A capture file is an append-only sequence of records. Each record is a fixed header followed by
+the payload exactly as it was received:
+
+    kind (uint8) | arrival time as unix timestamp (float64) | payload length (uint32)
+
+All numbers are little-endian. A record cut off by a crash while writing is ignored when reading.
+"""
+
+import asyncio
+import dataclasses
+import enum
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import BinaryIO
+
+from .conditions import CurrentConditions
+from .from_json import parse_from_json
+
+__all__ = [
+    "CaptureRecord",
+    "CaptureWriter",
+    "RecordKind",
+    "read_capture",
+    "replay",
+]
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<BdI")
+
+
+class RecordKind(enum.IntEnum):
+    Response = 1
+    """body of a `/v1/current_conditions` response"""
+    Datagram = 2
+    """broadcast packet"""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CaptureRecord:
+    kind: RecordKind
+    at: float
+    """unix timestamp of the arrival"""
+    payload: bytes
+
+    def parse(self) -> CurrentConditions:
+        """Parse the payload the same way the client did when it arrived."""
+        data = json.loads(self.payload)
+        if self.kind == RecordKind.Response:
+            return parse_from_json(CurrentConditions, data)
+        return CurrentConditions.from_json(data)
+
+
+class CaptureWriter:
+    """Appends records to a capture file.
+
+    The file is written by a thread of its own, so recording never blocks the event loop. The
+    thread flushes the file whenever it caught up with the queued records.
+    Once the file reached `max_bytes` or writing to it failed, any further records are dropped.
+    """
+
+    path: str
+    max_bytes: int | None
+    record_count: int
+    bytes_written: int
+    dropped_count: int
+    """number of records dropped because the file is full or broken"""
+    error: Exception | None
+    """error which stopped the writing thread"""
+
+    _file: BinaryIO
+    _size: int
+    _queue: queue.SimpleQueue[bytes | threading.Event | None]
+    _thread: threading.Thread
+    _closed: bool
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, max_bytes: int | None = None
+    ) -> None:
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.record_count = 0
+        self.bytes_written = 0
+        self.dropped_count = 0
+        self.error = None
+
+        self._file = open(self.path, "ab")  # noqa: SIM115
+        self._size = self._file.tell()
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self.__run, name=f"capture {self.path}", daemon=True
+        )
+        self._thread.start()
+
+    def __run(self) -> None:
+        try:
+            with self._file as fp:
+                while (item := self._queue.get()) is not None:
+                    if isinstance(item, threading.Event):
+                        fp.flush()
+                        item.set()
+                        continue
+
+                    fp.write(item)
+                    if self._queue.empty():
+                        fp.flush()
+        except Exception as e:
+            logger.exception("failed to write to capture %s", self.path)
+            self.error = e
+            # keep releasing the flushes until the writer is closed
+            while (item := self._queue.get()) is not None:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def write(self, kind: RecordKind, payload: bytes, at: float | None = None) -> None:
+        """Queue a record for writing, this never blocks."""
+        if self._closed:
+            raise ValueError("capture is closed")
+        if at is None:
+            at = time.time()
+
+        record = _HEADER.pack(kind, at, len(payload)) + payload
+        if self.error is not None or (
+            self.max_bytes is not None and self._size + len(record) > self.max_bytes
+        ):
+            self.dropped_count += 1
+            return
+
+        self._size += len(record)
+        self.record_count += 1
+        self.bytes_written += len(record)
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Wait until every queued record is written to the file.
+
+        Raises `error` if the records couldn't be written.
+        """
+        if not self._closed:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+        if self.error is not None:
+            raise self.error
+
+    def close(self) -> None:
+        """Write the queued records and close the file."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+def read_capture(path: str | os.PathLike[str]) -> Iterator[CaptureRecord]:
+    with open(path, "rb") as fp:
+        while header := fp.read(_HEADER.size):
+            if len(header) < _HEADER.size:
+                return
+            kind, at, length = _HEADER.unpack(header)
+            payload = fp.read(length)
+            if len(payload) < length:
+                return
+            yield CaptureRecord(RecordKind(kind), at, payload)
+
+
+async def replay(
+    records: Iterable[CaptureRecord], *, speed: float | None = 1.0
+) -> AsyncIterator[CaptureRecord]:
+    """Yield the records spaced out like they originally arrived.
+
+    Args:
+        records: Records in the order they were captured.
+        speed: Factor by which the replay is faster than real time.
+            `None` yields the records as fast as possible.
+    """
+    loop = asyncio.get_running_loop()
+    started_at: float | None = None
+    first_at = 0.0
+    for record in records:
+        if speed is not None:
+            if started_at is None:
+                started_at = loop.time()
+                first_at = record.at
+            else:
+                due = started_at + (record.at - first_at) / speed
+                if (delay := due - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+        yield record
@@ -1,18 +1,20 @@
+import copy
 import dataclasses
 import enum
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from datetime import datetime
 from typing import Any, Self, TypeVar, override
 
 from .. import from_json
 from .air_quality import AirQualityCondition
-from .condition import ConditionRecord, ReceiverState
+from .condition import STRUCTURE_TYPE_KEY, ConditionRecord, ReceiverState, field_names
 from .iss import CollectorSize, IssCondition
 from .lss import LssBarCondition, LssTempHumCondition
 from .moisture import MoistureCondition
 
 __all__ = [
+    "ConditionChanges",
     "ConditionType",
     "CurrentConditions",
     "DeviceType",
@@ -24,6 +26,7 @@ __all__ = [
     "LssBarCondition",
     "LssTempHumCondition",
     "MoistureCondition",
+    "field_names",
 ]
 
 logger = logging.getLogger(__name__)
@@ -51,6 +54,9 @@ class DeviceType(enum.Enum):
 
 RecordT = TypeVar("RecordT", bound=ConditionRecord)
 
+type ConditionChanges = dict[type[ConditionRecord], Sequence[str]]
+"""Names of the changed fields by record class. Only contains records with changes."""
+
 
 @dataclasses.dataclass()
 class CurrentConditions(from_json.FromJson):
@@ -68,6 +74,52 @@ class CurrentConditions(from_json.FromJson):
     name: str | None = None
     """Only present for AirLink"""
 
+    raw: from_json.JsonObject | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    """JSON object the conditions were parsed from. It can be parsed again to restore them."""
+    received_at: float | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    """`time.perf_counter()` when the packet arrived, only set while its latency is measured"""
+
+    _by_cls: dict[type[ConditionRecord], ConditionRecord] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    _by_type: dict[ConditionType, ConditionRecord] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._by_cls = {}
+        self._by_type = {}
+        for cond in self.conditions:
+            self.__index(cond)
+
+    def __index(self, cond: ConditionRecord) -> None:
+        # the first record of a type wins, just like the linear scan used to
+        cls = type(cond)
+        self._by_cls.setdefault(cls, cond)
+        if (cond_ty := _CLS2COND.get(cls)) is not None:
+            self._by_type.setdefault(cond_ty, cond)
+
+    def copy(self) -> Self:
+        """Get a copy whose records can be updated without affecting these conditions.
+
+        `raw` and the `extra` keys of the records are shared, they're never modified.
+        """
+        return dataclasses.replace(
+            self, conditions=[copy.copy(cond) for cond in self.conditions]
+        )
+
+    def append(self, cond: ConditionRecord) -> None:
+        """Add a condition record, keeping the lookup indices up to date.
+
+        Always use this instead of appending to `conditions` directly.
+        """
+        self.conditions.append(cond)
+        self.__index(cond)
+
     @classmethod
     @override
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any) -> Self:
@@ -92,9 +144,17 @@ class CurrentConditions(from_json.FromJson):
             ts=datetime.fromtimestamp(data["ts"]),
             conditions=conditions,
             name=data.get("name"),
+            raw=data,
         )
 
     def __getitem__[T: ConditionRecord](self, cls: type[T]) -> T:
+        try:
+            return self._by_cls[cls]  # type: ignore[return-value]
+        except KeyError:
+            if cls in _CLS2COND:
+                raise KeyError(repr(cls.__qualname__)) from None
+
+        # slow path for lookups by a base class
         try:
             return next(cond for cond in self.conditions if isinstance(cond, cls))
         except StopIteration:
@@ -102,6 +162,10 @@ class CurrentConditions(from_json.FromJson):
 
     def __contains__(self, cls: type[ConditionRecord]) -> bool:
         """Check if a condition of the given class is present in the current conditions."""
+        if cls in self._by_cls:
+            return True
+        if cls in _CLS2COND:
+            return False
         return any(isinstance(cond, cls) for cond in self.conditions)
 
     def get(self, cls: type[RecordT]) -> RecordT | None:
@@ -110,6 +174,10 @@ class CurrentConditions(from_json.FromJson):
         except KeyError:
             return None
 
+    def get_by_type(self, cond_ty: ConditionType) -> ConditionRecord | None:
+        """Get the condition record for the given data structure type."""
+        return self._by_type.get(cond_ty)
+
     def determine_device_type(self) -> DeviceType:
         if self.name is None:
             return DeviceType.WeatherLink
@@ -124,18 +192,45 @@ class CurrentConditions(from_json.FromJson):
         model_name = self.determine_device_type().name
         return f"{model_name} {self.did}"
 
-    def update_from(self, other: "CurrentConditions") -> None:
+    def update_from(self, other: "CurrentConditions") -> ConditionChanges:
+        """Merge the records of `other` into these conditions.
+
+        Returns:
+            The fields which actually changed value.
+        """
+        changes: ConditionChanges = {}
         for other_condition in other.conditions:
             condition_cls = type(other_condition)
             try:
                 condition: ConditionRecord = self[condition_cls]
             except KeyError:
-                self.conditions.append(other_condition)
+                self.append(other_condition)
+                changes[condition_cls] = field_names(condition_cls)
             else:
-                condition.update_from(other_condition)
+                if changed := condition.update_from(other_condition):
+                    changes[condition_cls] = changed
 
+        return changes
+
+    def changes_to(self, other: "CurrentConditions") -> ConditionChanges:
+        """Get the fields which differ in `other`, a full replacement for these conditions."""
+        changes: ConditionChanges = {}
+        for condition in self.conditions:
+            if type(condition) not in other:
+                changes[type(condition)] = field_names(type(condition))
+
+        for other_condition in other.conditions:
+            condition_cls = type(other_condition)
+            try:
+                condition = self[condition_cls]
+            except KeyError:
+                changes[condition_cls] = field_names(condition_cls)
+            else:
+                if changed := condition.changed_fields(other_condition):
+                    changes[condition_cls] = changed
+
+        return changes
 
-_STRUCTURE_TYPE_KEY = "data_structure_type"
 
 _COND2CLS: dict[ConditionType, type[ConditionRecord]] = {
     ConditionType.Iss: IssCondition,
@@ -144,10 +239,14 @@ _COND2CLS: dict[ConditionType, type[ConditionRecord]] = {
     ConditionType.LssTempHum: LssTempHumCondition,
     ConditionType.AirQuality: AirQualityCondition,
 }
+_CLS2COND: dict[type[ConditionRecord], ConditionType] = {
+    cls: cond_ty for cond_ty, cls in _COND2CLS.items()
+}
 
 
 def condition_from_json(data: from_json.JsonObject, **kwargs: Any) -> ConditionRecord:
-    cond_ty = ConditionType(data.pop(_STRUCTURE_TYPE_KEY))
+    # the data isn't modified so it can be parsed again
+    cond_ty = ConditionType(data[STRUCTURE_TYPE_KEY])
     cls = cond_ty.record_class()
     return cls.from_json(data, **kwargs)
 
@@ -157,7 +256,7 @@ def flatten_conditions(
 ) -> list[from_json.JsonObject]:
     cond_by_type: dict[int, from_json.JsonObject] = {}
     for cond in conditions:
-        cond_type: int = cond[_STRUCTURE_TYPE_KEY]
+        cond_type: int = cond[STRUCTURE_TYPE_KEY]
         try:
             existing = cond_by_type[cond_type]
         except KeyError:
@@ -3,14 +3,14 @@ from datetime import datetime
 from typing import Any, override
 
 from .. import from_json
-from .condition import ConditionRecord
+from .condition import STRUCTURE_TYPE_KEY, ConditionRecord
 
 __all__ = [
     "AirQualityCondition",
 ]
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class AirQualityCondition(ConditionRecord):
     temp: float
     """most recent valid air temperature reading"""
@@ -70,6 +70,17 @@ class AirQualityCondition(ConditionRecord):
     @classmethod
     @override
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any):
-        from_json.keys_to_celsius(data, "temp", "dew_point", "wet_bulb", "heat_index")
-        from_json.keys_to_datetime(data, "last_report_time")
-        return cls(**data)
+        return _decode(data, **kwargs)
+
+
+_decode = from_json.compile_decoder(
+    AirQualityCondition,
+    converters={
+        **dict.fromkeys(
+            ("temp", "dew_point", "wet_bulb", "heat_index"),
+            from_json.fahrenheit_to_celsius,
+        ),
+        "last_report_time": datetime.fromtimestamp,
+    },
+    ignore=(STRUCTURE_TYPE_KEY,),
+)
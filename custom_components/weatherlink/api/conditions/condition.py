@@ -1,14 +1,20 @@
 import abc
 import dataclasses
 import enum
+from collections.abc import Sequence
 
-from ..from_json import FromJson
+from ..from_json import FromJson, JsonObject
 
 __all__ = [
+    "STRUCTURE_TYPE_KEY",
     "ConditionRecord",
     "ReceiverState",
+    "field_names",
 ]
 
+STRUCTURE_TYPE_KEY = "data_structure_type"
+"""Key of the record type, every record decoder ignores it."""
+
 
 class ReceiverState(enum.IntEnum):
     Tracking = 0
@@ -19,13 +25,54 @@ class ReceiverState(enum.IntEnum):
     """Transmitter has not been acquired yet, or we’ve lost it (more than 15 missed packets in a row)."""
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class ConditionRecord(FromJson, abc.ABC):
     lsid: int | None
     """the numeric logic sensor identifier, or null if the device has not been registered"""
 
-    def update_from(self, other: "ConditionRecord") -> None:
-        for key, value in dataclasses.asdict(other).items():
-            if value is None:
+    extra: JsonObject | None = dataclasses.field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+    """keys sent by the device that aren't known (yet), e.g. from newer firmware"""
+
+    def update_from(self, other: "ConditionRecord") -> Sequence[str]:
+        """Copy all fields which are set in `other` to this record.
+
+        Broadcasts only contain a subset of the fields, the rest are `None` and thus skipped.
+
+        Returns:
+            The names of the fields whose value changed.
+        """
+        changed: list[str] | None = None
+        for key in field_names(type(other)):
+            value = getattr(other, key)
+            if value is None or value == getattr(self, key):
                 continue
             setattr(self, key, value)
+            if changed is None:
+                changed = []
+            changed.append(key)
+
+        return changed or ()
+
+    def changed_fields(self, other: "ConditionRecord") -> Sequence[str]:
+        """Get the names of the fields whose value differs in `other`, including `None` values."""
+        return [
+            key
+            for key in field_names(type(other))
+            if getattr(other, key) != getattr(self, key)
+        ]
+
+
+_FIELD_NAMES: dict[type[ConditionRecord], tuple[str, ...]] = {}
+
+
+def field_names(cls: type[ConditionRecord]) -> tuple[str, ...]:
+    """Get the (cached) names of all fields of the given record class."""
+    try:
+        return _FIELD_NAMES[cls]
+    except KeyError:
+        names = _FIELD_NAMES[cls] = tuple(
+            field.name for field in dataclasses.fields(cls)
+        )
+        return names
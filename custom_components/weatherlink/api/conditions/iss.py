@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Any, override
 
 from .. import from_json
-from .condition import ConditionRecord, ReceiverState
+from .condition import STRUCTURE_TYPE_KEY, ConditionRecord, ReceiverState
 
 __all__ = [
     "CollectorSize",
@@ -28,7 +28,7 @@ class CollectorSize(enum.IntEnum):
         return value * mul if value is not None else mul
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class IssCondition(ConditionRecord):
     txid: int
     """transmitter ID"""
@@ -142,56 +142,7 @@ class IssCondition(ConditionRecord):
     @classmethod
     @override
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any):
-        collector = CollectorSize(data["rain_size"])
-        data["rain_size"] = collector
-        from_json.keys_from_aliases(
-            data,
-            rainfall_last_15_min="rain_15_min",
-            rainfall_last_60_min="rain_60_min",
-            rainfall_last_24_hr="rain_24_hr",
-        )
-        keys_counts_to_mm(
-            data,
-            collector,
-            "rain_rate_last",
-            "rain_rate_hi",
-            "rainfall_last_15_min",
-            "rain_rate_hi_last_15_min",
-            "rainfall_last_60_min",
-            "rainfall_last_24_hr",
-            "rain_storm",
-            "rainfall_daily",
-            "rainfall_monthly",
-            "rainfall_year",
-            "rain_storm_last",
-        )
-        from_json.apply_converters(data, rx_state=ReceiverState)
-        from_json.keys_to_celsius(
-            data,
-            "temp",
-            "dew_point",
-            "wet_bulb",
-            "heat_index",
-            "wind_chill",
-            "thw_index",
-            "thsw_index",
-        )
-        from_json.keys_to_datetime(
-            data,
-            "rain_storm_start_at",
-            "rain_storm_last_start_at",
-            "rain_storm_last_end_at",
-        )
-        from_json.keys_to_kph(
-            data,
-            "wind_speed_last",
-            "wind_speed_avg_last_1_min",
-            "wind_speed_avg_last_2_min",
-            "wind_speed_hi_last_2_min",
-            "wind_speed_avg_last_10_min",
-            "wind_speed_hi_last_10_min",
-        )
-        return cls(**data)
+        return _decode(data, **kwargs)
 
 
 _IN2MM = 25.4
@@ -203,9 +154,72 @@ _COLLECTOR2MM = {
 }
 
 
-def keys_counts_to_mm(d: from_json.JsonObject, collector: CollectorSize, *keys: str):
-    for key in keys:
+_COUNT_KEYS = (
+    "rain_rate_last",
+    "rain_rate_hi",
+    "rainfall_last_15_min",
+    "rain_rate_hi_last_15_min",
+    "rainfall_last_60_min",
+    "rainfall_last_24_hr",
+    "rain_storm",
+    "rainfall_daily",
+    "rainfall_monthly",
+    "rainfall_year",
+    "rain_storm_last",
+)
+
+
+def _counts_to_mm(d: from_json.JsonObject) -> None:
+    collector: CollectorSize = d["rain_size"]
+    for key in _COUNT_KEYS:
         counts = d.get(key)
         d[f"{key}_counts"] = counts
         if counts:
             d[key] = collector.to_mm(counts)
+
+
+_decode = from_json.compile_decoder(
+    IssCondition,
+    converters={
+        "rain_size": CollectorSize,
+        "rx_state": ReceiverState,
+        **dict.fromkeys(
+            (
+                "temp",
+                "dew_point",
+                "wet_bulb",
+                "heat_index",
+                "wind_chill",
+                "thw_index",
+                "thsw_index",
+            ),
+            from_json.fahrenheit_to_celsius,
+        ),
+        **dict.fromkeys(
+            (
+                "rain_storm_start_at",
+                "rain_storm_last_start_at",
+                "rain_storm_last_end_at",
+            ),
+            datetime.fromtimestamp,
+        ),
+        **dict.fromkeys(
+            (
+                "wind_speed_last",
+                "wind_speed_avg_last_1_min",
+                "wind_speed_avg_last_2_min",
+                "wind_speed_hi_last_2_min",
+                "wind_speed_avg_last_10_min",
+                "wind_speed_hi_last_10_min",
+            ),
+            from_json.mph_to_kph,
+        ),
+    },
+    aliases={
+        "rainfall_last_15_min": "rain_15_min",
+        "rainfall_last_60_min": "rain_60_min",
+        "rainfall_last_24_hr": "rain_24_hr",
+    },
+    finish=_counts_to_mm,
+    ignore=(STRUCTURE_TYPE_KEY,),
+)
@@ -2,7 +2,7 @@ import dataclasses
 from typing import Any
 
 from .. import from_json
-from .condition import ConditionRecord
+from .condition import STRUCTURE_TYPE_KEY, ConditionRecord
 
 __all__ = [
     "LssBarCondition",
@@ -10,7 +10,7 @@ __all__ = [
 ]
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class LssBarCondition(ConditionRecord):
     bar_sea_level: float
     """most recent bar sensor reading with elevation adjustment **(hpa)**"""
@@ -21,11 +21,10 @@ class LssBarCondition(ConditionRecord):
 
     @classmethod
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any):
-        from_json.keys_to_hpa(data, "bar_sea_level", "bar_trend", "bar_absolute")
-        return cls(**data)
+        return _decode_bar(data, **kwargs)
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class LssTempHumCondition(ConditionRecord):
     temp_in: float
     """most recent valid inside temp"""
@@ -38,5 +37,20 @@ class LssTempHumCondition(ConditionRecord):
 
     @classmethod
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any):
-        from_json.keys_to_celsius(data, "temp_in", "dew_point_in", "heat_index_in")
-        return cls(**data)
+        return _decode_temp_hum(data, **kwargs)
+
+
+_decode_bar = from_json.compile_decoder(
+    LssBarCondition,
+    converters=dict.fromkeys(
+        ("bar_sea_level", "bar_trend", "bar_absolute"), from_json.in_hg_to_hpa
+    ),
+    ignore=(STRUCTURE_TYPE_KEY,),
+)
+_decode_temp_hum = from_json.compile_decoder(
+    LssTempHumCondition,
+    converters=dict.fromkeys(
+        ("temp_in", "dew_point_in", "heat_index_in"), from_json.fahrenheit_to_celsius
+    ),
+    ignore=(STRUCTURE_TYPE_KEY,),
+)
@@ -2,14 +2,14 @@ import dataclasses
 from typing import Any
 
 from .. import from_json
-from .condition import ConditionRecord, ReceiverState
+from .condition import STRUCTURE_TYPE_KEY, ConditionRecord, ReceiverState
 
 __all__ = [
     "MoistureCondition",
 ]
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class MoistureCondition(ConditionRecord):
     txid: int
     rx_state: ReceiverState | None
@@ -43,6 +43,16 @@ class MoistureCondition(ConditionRecord):
 
     @classmethod
     def _from_json(cls, data: from_json.JsonObject, **kwargs: Any):
-        from_json.apply_converters(data, rx_state=ReceiverState)
-        from_json.keys_to_celsius(data, "temp_1", "temp_2", "temp_3", "temp_4")
-        return cls(**data)
+        return _decode(data, **kwargs)
+
+
+_decode = from_json.compile_decoder(
+    MoistureCondition,
+    converters={
+        "rx_state": ReceiverState,
+        **dict.fromkeys(
+            ("temp_1", "temp_2", "temp_3", "temp_4"), from_json.fahrenheit_to_celsius
+        ),
+    },
+    ignore=(STRUCTURE_TYPE_KEY,),
+)
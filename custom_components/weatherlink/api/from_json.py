@@ -1,12 +1,15 @@
 import abc
+import dataclasses
 import logging
-from collections.abc import Callable, Iterable
-from datetime import datetime
-from typing import Any, Self
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Self, override
 
 __all__ = [
+    "ApiError",
     "FromJson",
     "JsonObject",
+    "compile_decoder",
+    "parse_from_json",
 ]
 
 logger = logging.getLogger(__name__)
@@ -15,6 +18,9 @@ type JsonObject = dict[str, Any]
 
 
 class FromJson(abc.ABC):
+    # allows subclasses to be slotted
+    __slots__ = ()
+
     OPT_STRICT = "strict"
 
     @classmethod
@@ -35,76 +41,135 @@ class FromJson(abc.ABC):
             raise e from None
 
 
-def fahrenheit_to_celsius(value: float) -> float:
-    return (value - 32) * 5 / 9
-
-
-def mph_to_kph(value: float) -> float:
-    return 1.609344 * value
+@dataclasses.dataclass()
+class ApiError(Exception, FromJson):
+    code: int
+    message: str
 
+    def __str__(self) -> str:
+        return f"{self.code}: {self.message}"
 
-def in_hg_to_hpa(value: float) -> float:
-    return 33.86389 * value
-
+    @classmethod
+    @override
+    def _from_json(cls, data: JsonObject, **kwargs: Any):
+        return cls(code=data["code"], message=data["message"])
 
-def apply_converters(d: JsonObject, **converters: Callable[[Any], Any]) -> None:
-    for key, converter in converters.items():
-        try:
-            value = d[key]
-        except KeyError:
-            continue
 
-        if value is None:
-            continue
+def raw_data_from_body(body: JsonObject) -> JsonObject:
+    if err := body.get("error"):
+        raise ApiError.from_json(err)
 
-        d[key] = converter(value)
+    return body["data"]
 
 
-def keys_to_datetime(d: JsonObject, *keys: str) -> None:
-    apply_converters(d, **dict.fromkeys(keys, datetime.fromtimestamp))
+def parse_from_json[T: FromJson](cls: type[T], body: JsonObject, **kwargs: Any) -> T:
+    data = raw_data_from_body(body)
+    return cls.from_json(data, **kwargs)
 
 
-def keys_to_celsius(d: JsonObject, *keys: str) -> None:
-    apply_converters(d, **dict.fromkeys(keys, fahrenheit_to_celsius))
+def fahrenheit_to_celsius(value: float) -> float:
+    return (value - 32) * 5 / 9
 
 
-def keys_to_kph(d: JsonObject, *keys: str) -> None:
-    apply_converters(d, **dict.fromkeys(keys, mph_to_kph))
+def mph_to_kph(value: float) -> float:
+    return 1.609344 * value
 
 
-def keys_to_hpa(d: JsonObject, *keys: str) -> None:
-    apply_converters(d, **dict.fromkeys(keys, in_hg_to_hpa))
+def in_hg_to_hpa(value: float) -> float:
+    return 33.86389 * value
 
 
-def remove_optional_keys(d: JsonObject, *keys: str) -> None:
-    for key in keys:
-        try:
-            del d[key]
-        except KeyError:
-            continue
+type Converter = Callable[[Any], Any]
+
+_EXTRA_FIELD = "extra"
+
+
+def compile_decoder[T](
+    cls: type[T],
+    *,
+    converters: Mapping[str, Converter] | None = None,
+    aliases: Mapping[str, str | Iterable[str]] | None = None,
+    finish: Callable[[JsonObject], None] | None = None,
+    ignore: Iterable[str] = (),
+) -> Callable[..., T]:
+    """Compile a decoder that builds a `cls` instance from a JSON object in a single pass.
+
+    Args:
+        cls: Dataclass to build. Every init field is accepted as a key.
+        converters: Converter applied to the (non-null) value of a field.
+        aliases: Alternative keys for a field. The field's own key always takes precedence.
+        finish: Called with the decoded keyword arguments right before `cls` is built.
+            Used for conversions that depend on multiple fields.
+        ignore: Keys which are skipped without being reported as extra.
+
+    Keys which don't belong to any field are collected in the `extra` field of `cls` instead
+    of making the constructor raise. In strict mode they raise a `TypeError`.
+    """
+    converters = converters or {}
+    aliases = aliases or {}
+
+    field_names = {field.name for field in dataclasses.fields(cls) if field.init}  # type: ignore[arg-type]
+    collect_extra = _EXTRA_FIELD in field_names
+    field_names.discard(_EXTRA_FIELD)
+    for key in (*converters, *aliases):
+        if key not in field_names:
+            raise ValueError(f"{cls.__qualname__} has no field {key!r}")
+
+    # key -> (field name, converter), None for ignored keys
+    key_map: dict[str, tuple[str, Converter | None] | None] = dict.fromkeys(ignore)
+    for name in field_names:
+        key_map[name] = (name, converters.get(name))
+    for name, field_aliases in aliases.items():
+        if isinstance(field_aliases, str):
+            field_aliases = (field_aliases,)
+        for alias in field_aliases:
+            key_map[alias] = (name, converters.get(name))
+
+    reported_keys: set[str] = set()
+
+    def decode(data: JsonObject, **kwargs: Any) -> T:
+        values: JsonObject = {}
+        extra: JsonObject | None = None
+        for key, value in data.items():
+            try:
+                entry = key_map[key]
+            except KeyError:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if entry is None:
+                continue
 
+            name, convert = entry
+            if name != key and name in values:
+                # the field was already set by its own key
+                continue
+            if convert is not None and value is not None:
+                value = convert(value)
+            values[name] = value
 
-def keys_from_aliases(d: JsonObject, **key_aliases: str | Iterable[str]) -> None:
-    for key, aliases in key_aliases.items():
-        if key in d:
-            continue
+        if finish is not None:
+            finish(values)
 
-        if isinstance(aliases, str):
-            aliases = (aliases,)
+        if extra is not None:
+            if kwargs.get(FromJson.OPT_STRICT) or not collect_extra:
+                raise TypeError(
+                    f"unexpected keys for {cls.__qualname__}: {', '.join(extra)}"
+                )
 
-        for alias in aliases:
-            try:
-                value = d[alias]
-            except KeyError:
-                continue
+            if new_keys := extra.keys() - reported_keys:
+                reported_keys.update(new_keys)
+                logger.info(
+                    "ignoring unknown keys for %s: %s",
+                    cls.__qualname__,
+                    ", ".join(sorted(new_keys)),
+                )
+            values[_EXTRA_FIELD] = extra
 
-            d[key] = value
-            break
+        return cls(**values)
 
-    for aliases in key_aliases.values():
-        if isinstance(aliases, str):
-            aliases = (aliases,)
-        remove_optional_keys(d, *aliases)
+    return decode
 
 
 def update_dict_where_none(d: JsonObject, updates: JsonObject) -> None:
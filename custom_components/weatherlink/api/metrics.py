@@ -0,0 +1,283 @@
+"""Cheap counters, fixed-bucket histograms and ring buffers used to instrument the clients."""
+
+import bisect
+import dataclasses
+import time
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+__all__ = [
+    "CpuMeter",
+    "LATENCY_BUCKETS",
+    "RECENT_EVENTS",
+    "Histogram",
+    "RateMeter",
+    "RecentEvent",
+    "StageLatency",
+    "recent_events",
+]
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""Upper bounds (in seconds) of the latency buckets, from parsing a packet to a hung request."""
+
+
+RECENT_EVENTS: int = 32
+"""Number of events kept in the ring buffers of recent events."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RecentEvent:
+    """Entry of a ring buffer of recent events."""
+
+    at: float
+    """unix timestamp of the event"""
+    name: str
+    duration: float | None = None
+    """duration in seconds, if the event took any time"""
+    error: str | None = None
+
+
+def recent_events() -> deque[RecentEvent]:
+    """Create a ring buffer holding the most recent events."""
+    return deque(maxlen=RECENT_EVENTS)
+
+
+class Histogram:
+    """Counts observations in buckets with fixed upper bounds.
+
+    Observing a value doesn't allocate, it's a bisect and a few additions.
+    Quantiles are only as precise as the buckets.
+    """
+
+    __slots__ = ("bounds", "count", "counts", "max", "total")
+
+    bounds: tuple[float, ...]
+    counts: list[int]
+    """number of observations per bucket, the last one counts everything above the last bound"""
+    count: int
+    total: float
+    max: float
+
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float | None:
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q: float) -> float | None:
+        """Get the upper bound of the bucket containing the `q` quantile."""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": {
+                **{
+                    f"le_{bound:g}": count
+                    for bound, count in zip(self.bounds, self.counts, strict=False)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class RateMeter:
+    """Counts events and their rate per second over fixed windows."""
+
+    __slots__ = ("_rate", "_window_count", "_window_start", "count", "window")
+
+    window: float
+    """length of a window in seconds"""
+    count: int
+    """total number of events"""
+
+    _window_start: float | None
+    _window_count: int
+    _rate: float
+
+    def __init__(self, window: float = 60.0) -> None:
+        self.window = window
+        self.count = 0
+        self._window_start = None
+        self._window_count = 0
+        self._rate = 0.0
+
+    def mark(self, now: float | None = None) -> None:
+        if now is None:
+            now = time.monotonic()
+
+        start = self._window_start
+        if start is None:
+            self._window_start = now
+        elif now - start >= self.window:
+            self._rate = self._window_count / (now - start)
+            self._window_start = now
+            self._window_count = 0
+
+        self._window_count += 1
+        self.count += 1
+
+    def rate(self, now: float | None = None) -> float:
+        """Get the rate of the most recent complete window."""
+        if now is None:
+            now = time.monotonic()
+
+        start = self._window_start
+        if start is None:
+            return 0.0
+        if now - start >= self.window:
+            # the current window is complete, events may have stopped altogether
+            return self._window_count / (now - start)
+        return self._rate
+
+
+class StageLatency:
+    """Latency from the arrival of a packet until it passed each stage on its way to the state.
+
+    Every stage is measured from the arrival, the time spent in a stage is the difference to the
+    previous one.
+    """
+
+    __slots__ = ("stages",)
+
+    stages: dict[str, Histogram]
+
+    def __init__(self) -> None:
+        self.stages = {}
+
+    def observe(self, stage: str, received_at: float) -> None:
+        """Record that a packet received at `received_at` (`time.perf_counter()`) passed `stage`."""
+        try:
+            histogram = self.stages[stage]
+        except KeyError:
+            histogram = self.stages[stage] = Histogram()
+        histogram.observe(time.perf_counter() - received_at)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {stage: histogram.as_dict() for stage, histogram in self.stages.items()}
+
+
+class CpuMeter:
+    """CPU time spent in one class of callbacks on the event loop.
+
+    Measured with `time.thread_time` around the synchronous part of a callback, so time spent
+    waiting and other tasks running in between don't count. A measurement costs one to two
+    microseconds, reading the thread CPU clock is a system call.
+    """
+
+    __slots__ = (
+        "_utilization",
+        "_window_start",
+        "_window_total",
+        "count",
+        "max",
+        "total",
+        "window",
+    )
+
+    window: float
+    """length of a window in seconds"""
+    count: int
+    total: float
+    """total CPU time in seconds"""
+    max: float
+    """longest single callback in seconds"""
+
+    _window_start: float | None
+    _window_total: float
+    _utilization: float
+
+    def __init__(self, window: float = 60.0) -> None:
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._window_start = None
+        self._window_total = 0.0
+        self._utilization = 0.0
+
+    def add(self, cpu_time: float, now: float | None = None) -> None:
+        """Record a callback which took `cpu_time` seconds of CPU time."""
+        if now is None:
+            now = time.monotonic()
+
+        start = self._window_start
+        if start is None:
+            self._window_start = now
+        elif now - start >= self.window:
+            self._utilization = self._window_total / (now - start)
+            self._window_start = now
+            self._window_total = 0.0
+
+        self._window_total += cpu_time
+        self.count += 1
+        self.total += cpu_time
+        if cpu_time > self.max:
+            self.max = cpu_time
+
+    def utilization(self, now: float | None = None) -> float:
+        """Get the fraction of the most recent complete window spent in these callbacks."""
+        if now is None:
+            now = time.monotonic()
+
+        start = self._window_start
+        if start is None:
+            return 0.0
+        if now - start >= self.window:
+            return self._window_total / (now - start)
+        return self._utilization
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "utilization": self.utilization(),
+        }
@@ -1,13 +1,25 @@
 import asyncio
+import contextlib
 import dataclasses
-from collections.abc import Mapping
+import enum
+import heapq
+import itertools
+import json
+import random
+import socket
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from datetime import timedelta
-from typing import Any, override
+from typing import Any, ClassVar, Self, override
 
 import aiohttp
+import yarl
 
+from .capture import CaptureWriter, RecordKind
 from .conditions import CurrentConditions
-from .from_json import FromJson, JsonObject
+from .from_json import FromJson, JsonObject, parse_from_json
+from .metrics import CpuMeter, Histogram, RecentEvent, recent_events
 
 EP_CURRENT_CONDITIONS = "/v1/current_conditions"
 EP_REAL_TIME = "/v1/real_time"
@@ -25,43 +37,384 @@ class RealTimeBroadcastResponse(FromJson):
         return cls(**data)
 
 
-@dataclasses.dataclass()
-class ApiError(Exception, FromJson):
-    code: int
-    message: str
+type _HostKey = tuple[str | None, int | None]
+
+
+def _host_key(base_url: str) -> _HostKey:
+    url = yarl.URL(base_url)
+    return (url.host, url.port)
+
+
+class _PerHost:
+    """Base of the objects every client of the same host shares.
 
-    def __str__(self) -> str:
-        return f"{self.code}: {self.message}"
+    The instances are reference counted, every `for_base_url` must be paired with a `release` so
+    that the instance is dropped once the last client is done with the host.
+    """
+
+    _REGISTRY: ClassVar[dict[_HostKey, tuple[Any, int]]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._REGISTRY = {}
 
     @classmethod
-    @override
-    def _from_json(cls, data: JsonObject, **kwargs: Any):
-        return cls(code=data["code"], message=data["message"])
+    def for_base_url(cls, base_url: str) -> Self:
+        key = _host_key(base_url)
+        instance, users = cls._REGISTRY.get(key, (None, 0))
+        if instance is None:
+            instance = cls()
+        cls._REGISTRY[key] = (instance, users + 1)
+        return instance
+
+    @classmethod
+    def release(cls, base_url: str) -> None:
+        key = _host_key(base_url)
+        instance, users = cls._REGISTRY[key]
+        if users > 1:
+            cls._REGISTRY[key] = (instance, users - 1)
+        else:
+            del cls._REGISTRY[key]
+
+
+class RequestPriority(enum.IntEnum):
+    """Requests with a lower value are served first."""
+
+    Renewal = 0
+    Poll = 1
+    Discovery = 2
+
+
+class HostScheduler(_PerHost):
+    """Serializes all requests to a single device.
+
+    The WeatherLink hardware can't serve multiple clients at once, so every `WeatherLinkRest`
+    for the same host shares one scheduler.
+    """
+
+    request_count: int
+    """number of requests which got their turn"""
+    wait_time_total: float
+    """total time spent waiting for a turn in seconds"""
+    wait_time_max: float
+    """longest time spent waiting for a turn in seconds"""
+
+    _busy: bool
+    _waiters: list[tuple[int, int, asyncio.Future[None], asyncio.Task[Any] | None]]
+    _counter: itertools.count
+
+    def __init__(self) -> None:
+        self.request_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+        self._busy = False
+        self._waiters = []
+        self._counter = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for their turn."""
+        return sum(not fut.done() for _, _, fut, _ in self._waiters)
+
+    @contextlib.asynccontextmanager
+    async def turn(self, priority: RequestPriority) -> AsyncIterator[None]:
+        """Wait until it's the caller's turn to talk to the device."""
+        start = time.monotonic()
+        if self._busy or self._waiters:
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(
+                self._waiters,
+                (priority, next(self._counter), fut, asyncio.current_task()),
+            )
+            try:
+                await fut
+            except BaseException:
+                if fut.done() and not fut.cancelled():
+                    # we were handed the turn right before being cancelled
+                    self.__release()
+                raise
+        else:
+            self._busy = True
+
+        wait_time = time.monotonic() - start
+        self.request_count += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    def raise_priority(
+        self, task: asyncio.Task[Any], priority: RequestPriority
+    ) -> None:
+        """Serve the request `task` is waiting with at `priority` or higher."""
+        for i, (current, order, fut, waiter) in enumerate(self._waiters):
+            if waiter is task and priority < current and not fut.done():
+                self._waiters[i] = (priority, order, fut, waiter)
+                heapq.heapify(self._waiters)
+                return
+
+    def __release(self) -> None:
+        while self._waiters:
+            _, _, fut, _ = heapq.heappop(self._waiters)
+            if not fut.done():
+                # hand the turn over directly, `_busy` stays set
+                fut.set_result(None)
+                return
+
+        self._busy = False
+
+
+def _retrieve_exception(task: asyncio.Task[Any]) -> None:
+    # every waiter may already be gone, in which case nobody else sees the exception
+    if not task.cancelled():
+        task.exception()
+
+
+class ConditionsCache(_PerHost):
+    """Shares the current conditions of a device between all callers.
+
+    Concurrent callers share a single in-flight request and recent results are served from the
+    cache. Like `HostScheduler` there's one cache per host.
+    The shared request is served at the highest priority of its callers. It keeps the deadline of
+    the caller who started it, a caller with a later deadline starts over once it ran out.
+    Every caller gets its own copy of the conditions, so it's free to merge broadcasts into it.
+    """
+
+    hits: int
+    """number of calls served from the cache"""
+    misses: int
+    """number of calls which started a request"""
+    coalesced: int
+    """number of calls which joined an in-flight request"""
+
+    _value: CurrentConditions | None
+    _fetched_at: float
+    _inflight: asyncio.Task[CurrentConditions] | None
+    _priority: RequestPriority
+    _deadline: float | None
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._value = None
+        self._fetched_at = 0.0
+        self._inflight = None
+        self._priority = RequestPriority.Poll
+        self._deadline = None
 
+    def invalidate(self) -> None:
+        self._value = None
 
-def raw_data_from_body(body: JsonObject) -> JsonObject:
-    if err := body.get("error"):
-        raise ApiError.from_json(err)
+    async def get(
+        self,
+        fetch: Callable[[RequestPriority, float | None], Awaitable[CurrentConditions]],
+        *,
+        max_age: float,
+        priority: RequestPriority = RequestPriority.Poll,
+        timeout: float | None = None,
+        scheduler: HostScheduler | None = None,
+    ) -> CurrentConditions:
+        """Get the conditions, calling `fetch(priority, timeout)` if a request is needed.
+
+        Args:
+            max_age: Maximum age of cached conditions in seconds.
+            priority: Priority of the caller.
+            timeout: Deadline of the caller in seconds.
+            scheduler: Scheduler `fetch` waits for its turn with. Needed to raise the priority of
+                a request that's already waiting.
+        """
+        value = self._value
+        if value is not None and time.monotonic() - self._fetched_at <= max_age:
+            self.hits += 1
+            return value.copy()
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            task = self._inflight
+            if task is None:
+                self.misses += 1
+                self._priority = priority
+                self._deadline = deadline
+                remaining = None if deadline is None else deadline - loop.time()
+                task = self._inflight = asyncio.create_task(
+                    self.__fetch(fetch, remaining)
+                )
+                task.add_done_callback(_retrieve_exception)
+                outlives = False
+            else:
+                self.coalesced += 1
+                if priority < self._priority:
+                    self._priority = priority
+                    if scheduler is not None:
+                        scheduler.raise_priority(task, priority)
+                outlives = self._deadline is not None and (
+                    deadline is None or deadline > self._deadline
+                )
+
+            try:
+                # a cancelled caller mustn't cancel the request for everyone else
+                value = await asyncio.shield(task)
+            except TimeoutError:
+                if not outlives:
+                    raise
+                # out of the time of the caller who started it, but not of ours
+                continue
+
+            return value.copy()
+
+    async def __fetch(
+        self,
+        fetch: Callable[[RequestPriority, float | None], Awaitable[CurrentConditions]],
+        timeout: float | None,
+    ) -> CurrentConditions:
+        try:
+            # callers who joined before the request started may have raised the priority
+            value = await fetch(self._priority, timeout)
+        finally:
+            self._inflight = None
+
+        self._value = value
+        self._fetched_at = time.monotonic()
+        return value
+
+
+class CircuitBreaker:
+    """Backs off from a device which stopped answering.
+
+    Every failure schedules the next attempt after an exponentially growing delay with jitter.
+    After `threshold` consecutive failures the breaker opens and `allow` only lets a single probe
+    through once the delay expired.
+    The breaker closes again as soon as the device answers.
+    """
+
+    threshold: int
+    base_delay: float
+    max_delay: float
+
+    failures: int
+    """number of consecutive failures"""
+    open_count: int
+    """number of times the breaker opened"""
+
+    _retry_at: float
+
+    def __init__(
+        self,
+        *,
+        threshold: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+    ) -> None:
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.failures = 0
+        self.open_count = 0
+        self._retry_at = 0.0
 
-    return body["data"]
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.threshold
 
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next attempt is due."""
+        return max(self._retry_at - time.monotonic(), 0.0)
 
-def parse_from_json[T: FromJson](cls: type[T], body: JsonObject, **kwargs: Any) -> T:
-    data = raw_data_from_body(body)
-    return cls.from_json(data, **kwargs)
+    def allow(self) -> bool:
+        return not self.is_open or time.monotonic() >= self._retry_at
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def record_failure(self) -> float:
+        """Record a failed attempt and return the delay until the next one."""
+        self.failures += 1
+        if self.failures == self.threshold:
+            self.open_count += 1
+
+        delay = min(self.base_delay * 2 ** (self.failures - 1), self.max_delay)
+        # "equal jitter" keeps at least half of the delay while spreading out the retries
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        self._retry_at = time.monotonic() + delay
+        return delay
+
+
+DEFAULT_CACHE_TTL: float = 5.0
+REAL_TIME_TIMEOUT: float = 10.0
+"""Deadline of a `/v1/real_time` request in seconds, the device is blocked while it's pending."""
 
 
 class WeatherLinkRest:
     session: aiohttp.ClientSession
     base_url: str
+    scheduler: HostScheduler
+    cache: ConditionsCache
+    cache_ttl: float
+    """how old (in seconds) cached conditions may be to be returned by `current_conditions`"""
 
-    _lock: asyncio.Lock
+    request_count: int
+    error_count: int
+    """number of requests which failed, including timeouts"""
+    bytes_received: int
+    wait_time: Histogram
+    """time spent waiting for the turn on the device"""
+    request_time: Histogram
+    """time from sending the request until the body was received"""
+    parse_time: Histogram
+    parse_cpu: CpuMeter | None
+    """measures the CPU time spent parsing responses while set"""
+    recent_requests: deque[RecentEvent]
+    capture: CaptureWriter | None
+    """records every received `/v1/current_conditions` response body while set"""
+    remote_addr: str | None
+    """address the host of `base_url` resolved to for the last real-time request"""
+    closed: bool
 
-    def __init__(self, session: aiohttp.ClientSession, base_url: str) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        *,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
         self.session = session
         self.base_url = base_url
+        self.scheduler = HostScheduler.for_base_url(base_url)
+        self.cache = ConditionsCache.for_base_url(base_url)
+        self.cache_ttl = cache_ttl
+
+        self.request_count = 0
+        self.error_count = 0
+        self.bytes_received = 0
+        self.wait_time = Histogram()
+        self.request_time = Histogram()
+        self.parse_time = Histogram()
+        self.parse_cpu = None
+        self.recent_requests = recent_events()
+        self.capture = None
+        self.remote_addr = None
+        self.closed = False
+
+    def close(self) -> None:
+        """Release the scheduler and cache shared with the other clients of the host.
 
-        self._lock = asyncio.Lock()
+        The aiohttp session isn't closed, it belongs to the caller.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+        HostScheduler.release(self.base_url)
+        ConditionsCache.release(self.base_url)
 
     async def _request[T: FromJson](
         self,
@@ -70,32 +423,107 @@ class WeatherLinkRest:
         /,
         *,
         params: Mapping[str, str] | None = None,
+        priority: RequestPriority = RequestPriority.Poll,
+        timeout: float | None = None,
+        record: bool = False,
     ) -> T:
-        # lock is needed because the WeatherLink hardware can't serve multiple clients at once
-        async with self._lock:
-            async with self.session.get(self.base_url + path, params=params) as resp:
-                body = await resp.json()
-            return parse_from_json(cls, body)
-
-    async def current_conditions(self) -> CurrentConditions:
-        return await self._request(CurrentConditions, EP_CURRENT_CONDITIONS)
-
-    async def real_time(self, *, duration: timedelta) -> RealTimeBroadcastResponse:
-        async with self.session.get(
-            self.base_url + EP_REAL_TIME,
-            params={"duration": int(duration.total_seconds())},
-        ) as resp:
-            assert resp.connection is not None, "no connection for response"
-            assert resp.connection.transport is not None, (
-                "no transport for response connection"
+        self.request_count += 1
+        start = time.perf_counter()
+        error: str | None = None
+        try:
+            # the deadline includes waiting for our turn so a hung device can't stall the caller
+            async with asyncio.timeout(timeout), self.scheduler.turn(priority):
+                sent = time.perf_counter()
+                self.wait_time.observe(sent - start)
+                async with self.session.get(
+                    self.base_url + path, params=params
+                ) as resp:
+                    raw = await resp.read()
+                received = time.perf_counter()
+                self.request_time.observe(received - sent)
+                self.bytes_received += len(raw)
+                if record and (capture := self.capture) is not None:
+                    capture.write(RecordKind.Response, raw)
+
+                if (cpu := self.parse_cpu) is None:
+                    result = parse_from_json(cls, json.loads(raw))
+                else:
+                    cpu_start = time.thread_time()
+                    result = parse_from_json(cls, json.loads(raw))
+                    cpu.add(time.thread_time() - cpu_start)
+                self.parse_time.observe(time.perf_counter() - received)
+                return result
+        except Exception as exc:
+            self.error_count += 1
+            error = repr(exc)
+            raise
+        finally:
+            self.recent_requests.append(
+                RecentEvent(
+                    at=time.time(),
+                    name=path,
+                    duration=time.perf_counter() - start,
+                    error=error,
+                )
             )
-            peername_raw = resp.connection.transport.get_extra_info("peername")
-            if peername_raw is None:
-                raise ValueError("failed to get peername from request")
 
-            body = await resp.json()
+    async def current_conditions(
+        self,
+        *,
+        priority: RequestPriority = RequestPriority.Poll,
+        max_age: float | None = None,
+        timeout: float | None = None,
+    ) -> CurrentConditions:
+        """Get the current conditions.
 
-        broadcast_resp = parse_from_json(RealTimeBroadcastResponse, body)
-        server_addr, _ = peername_raw
-        broadcast_resp.addr = server_addr
+        Args:
+            priority: Priority of the request if one is needed.
+            max_age: Maximum age of cached conditions in seconds, defaults to `cache_ttl`.
+                Pass 0 to force a request, which is still shared with concurrent callers.
+            timeout: Deadline in seconds for the call, including waiting for the device.
+        """
+        async with asyncio.timeout(timeout):
+            return await self.cache.get(
+                lambda priority, timeout: self._request(
+                    CurrentConditions,
+                    EP_CURRENT_CONDITIONS,
+                    priority=priority,
+                    timeout=timeout,
+                    record=True,
+                ),
+                max_age=self.cache_ttl if max_age is None else max_age,
+                priority=priority,
+                timeout=timeout,
+                scheduler=self.scheduler,
+            )
+
+    async def real_time(
+        self, *, duration: timedelta, timeout: float | None = REAL_TIME_TIMEOUT
+    ) -> RealTimeBroadcastResponse:
+        """Ask the device to broadcast its conditions for the given duration.
+
+        The address of the returned response is the one the host of `base_url` resolves to, which
+        the broadcasts come from.
+        """
+        broadcast_resp = await self._request(
+            RealTimeBroadcastResponse,
+            EP_REAL_TIME,
+            params={"duration": str(int(duration.total_seconds()))},
+            priority=RequestPriority.Renewal,
+            timeout=timeout,
+        )
+        # aiohttp may release the connection before the response is even returned, so the peer
+        # address can't be read from it. Resolved on every renewal to follow address changes.
+        async with asyncio.timeout(timeout):
+            self.remote_addr = broadcast_resp.addr = await _resolve_host(self.base_url)
         return broadcast_resp
+
+
+async def _resolve_host(base_url: str) -> str:
+    url = yarl.URL(base_url)
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        url.host, url.port, type=socket.SOCK_STREAM
+    )
+    if not infos:
+        raise OSError(f"failed to resolve {url.host!r}")
+    return infos[0][4][0]
@@ -1,5 +1,6 @@
 import dataclasses
 import logging
+from datetime import timedelta
 from typing import Any
 
 import voluptuous as vol
@@ -9,6 +10,7 @@ from homeassistant.helpers import aiohttp_client
 from homeassistant.helpers import config_validation as cv
 
 from .api import WeatherLinkRest
+from .api.rest import RequestPriority
 from .const import DOMAIN
 
 logger = logging.getLogger(__name__)
@@ -16,12 +18,69 @@ logger = logging.getLogger(__name__)
 FORM_SCHEMA = vol.Schema({vol.Required("host"): str})
 
 KEY_LISTEN_TO_BROADCASTS = "listen_to_broadcasts"
+KEY_ADAPTIVE_POLLING = "adaptive_polling"
+KEY_MIN_UPDATE_INTERVAL = "min_update_interval"
+KEY_MAX_UPDATE_INTERVAL = "max_update_interval"
+
+KEY_BROADCAST_ON_EVENTS = "broadcast_on_events"
+KEY_TRIGGER_WIND_SPEED = "trigger_wind_speed"
+KEY_TRIGGER_RAIN_RATE = "trigger_rain_rate"
+KEY_TRIGGER_BAR_TREND = "trigger_bar_trend"
+KEY_RECORD_TRAFFIC = "record_traffic"
+KEY_MEASURE_LATENCY = "measure_latency"
+
+DEFAULT_MIN_UPDATE_INTERVAL = 10.0
+DEFAULT_MAX_UPDATE_INTERVAL = 300.0
+DEFAULT_BROADCAST_TRIGGERS = {
+    KEY_TRIGGER_WIND_SPEED: 30.0,
+    KEY_TRIGGER_RAIN_RATE: 0.0,
+    KEY_TRIGGER_BAR_TREND: 3.0,
+}
 
 
 def get_listen_to_broadcasts(config_entry: config_entries.ConfigEntry) -> bool:
     return config_entry.options.get(KEY_LISTEN_TO_BROADCASTS, True)
 
 
+def get_adaptive_polling(config_entry: config_entries.ConfigEntry) -> bool:
+    return config_entry.options.get(KEY_ADAPTIVE_POLLING, False)
+
+
+def get_broadcast_on_events(config_entry: config_entries.ConfigEntry) -> bool:
+    return config_entry.options.get(KEY_BROADCAST_ON_EVENTS, False)
+
+
+def get_record_traffic(config_entry: config_entries.ConfigEntry) -> bool:
+    return config_entry.options.get(KEY_RECORD_TRAFFIC, False)
+
+
+def get_measure_latency(config_entry: config_entries.ConfigEntry) -> bool:
+    return config_entry.options.get(KEY_MEASURE_LATENCY, False)
+
+
+def get_broadcast_triggers(
+    config_entry: config_entries.ConfigEntry,
+) -> dict[str, float]:
+    return {
+        key: config_entry.options.get(key, default)
+        for key, default in DEFAULT_BROADCAST_TRIGGERS.items()
+    }
+
+
+def get_update_interval_bounds(
+    config_entry: config_entries.ConfigEntry,
+) -> tuple[timedelta, timedelta]:
+    options = config_entry.options
+    return (
+        timedelta(
+            seconds=options.get(KEY_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL)
+        ),
+        timedelta(
+            seconds=options.get(KEY_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL)
+        ),
+    )
+
+
 @dataclasses.dataclass()
 class FormError(Exception):
     key: str
@@ -41,7 +100,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         session = aiohttp_client.async_get_clientsession(self.hass)
         session = WeatherLinkRest(session, host)
         try:
-            conditions = await session.current_conditions()
+            conditions = await session.current_conditions(
+                priority=RequestPriority.Discovery
+            )
         except ServerDisconnectedError:
             logger.warning(
                 f"server {host!r} disconnected during request, this device is probably already being polled"
@@ -50,6 +111,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except Exception:
             logger.exception(f"failed to connect to {host!r}")
             raise FormError("host", "connect_failed")
+        finally:
+            session.close()
 
         await self.async_set_unique_id(conditions.did)
         self._abort_if_unique_id_configured()
@@ -112,15 +175,36 @@ class OptionsFlow(config_entries.OptionsFlow):
             self.options[KEY_LISTEN_TO_BROADCASTS] = user_input[
                 KEY_LISTEN_TO_BROADCASTS
             ]
-            try:
-                self.options["update_interval"] = cv.time_period_str(
-                    user_input["update_interval"]
-                ).total_seconds()
-            except vol.Error:
-                errors["update_interval"] = "invalid_time_period"
-            else:
+            self.options[KEY_ADAPTIVE_POLLING] = user_input[KEY_ADAPTIVE_POLLING]
+            self.options[KEY_BROADCAST_ON_EVENTS] = user_input[KEY_BROADCAST_ON_EVENTS]
+            self.options[KEY_RECORD_TRAFFIC] = user_input[KEY_RECORD_TRAFFIC]
+            self.options[KEY_MEASURE_LATENCY] = user_input[KEY_MEASURE_LATENCY]
+            for key in DEFAULT_BROADCAST_TRIGGERS:
+                self.options[key] = user_input[key]
+            for key in (
+                "update_interval",
+                KEY_MIN_UPDATE_INTERVAL,
+                KEY_MAX_UPDATE_INTERVAL,
+            ):
+                try:
+                    self.options[key] = cv.time_period_str(
+                        user_input[key]
+                    ).total_seconds()
+                except vol.Error:
+                    errors[key] = "invalid_time_period"
+
+            if (
+                not errors
+                and self.options[KEY_MIN_UPDATE_INTERVAL]
+                > self.options[KEY_MAX_UPDATE_INTERVAL]
+            ):
+                errors[KEY_MAX_UPDATE_INTERVAL] = "invalid_interval_bounds"
+
+            if not errors:
                 return await self.finish()
 
+        min_interval, max_interval = get_update_interval_bounds(self.config_entry)
+        triggers = get_broadcast_triggers(self.config_entry)
         return self.async_show_form(
             step_id="misc",
             data_schema=vol.Schema(
@@ -133,6 +217,34 @@ class OptionsFlow(config_entries.OptionsFlow):
                         KEY_LISTEN_TO_BROADCASTS,
                         default=get_listen_to_broadcasts(self.config_entry),
                     ): bool,
+                    vol.Required(
+                        KEY_BROADCAST_ON_EVENTS,
+                        default=get_broadcast_on_events(self.config_entry),
+                    ): bool,
+                    **{
+                        vol.Required(key, default=value): vol.All(
+                            vol.Coerce(float), vol.Range(min=0)
+                        )
+                        for key, value in triggers.items()
+                    },
+                    vol.Required(
+                        KEY_ADAPTIVE_POLLING,
+                        default=get_adaptive_polling(self.config_entry),
+                    ): bool,
+                    vol.Required(
+                        KEY_MIN_UPDATE_INTERVAL, default=str(min_interval)
+                    ): str,
+                    vol.Required(
+                        KEY_MAX_UPDATE_INTERVAL, default=str(max_interval)
+                    ): str,
+                    vol.Required(
+                        KEY_RECORD_TRAFFIC,
+                        default=get_record_traffic(self.config_entry),
+                    ): bool,
+                    vol.Required(
+                        KEY_MEASURE_LATENCY,
+                        default=get_measure_latency(self.config_entry),
+                    ): bool,
                 }
             ),
             errors=errors,
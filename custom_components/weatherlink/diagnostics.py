@@ -0,0 +1,220 @@
+import dataclasses
+import enum
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+import yarl
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import WeatherLinkCoordinator
+from .api import CurrentConditions, WeatherLinkBroadcast, WeatherLinkRest
+from .api.conditions import field_names
+from .api.metrics import RecentEvent
+from .const import DOMAIN
+
+TO_REDACT = {"host", "remote_addr"}
+
+
+def _addresses(entry: ConfigEntry, coord: WeatherLinkCoordinator) -> set[str]:
+    """Get the addresses of the device, which error messages may contain as well."""
+    addresses = {yarl.URL(entry.data["host"]).host, coord.session.remote_addr}
+    if (broadcast := coord.broadcast) is not None:
+        addresses.add(broadcast.renewer.remote_addr)
+        addresses.add(broadcast.protocol.remote_addr)
+    return {addr for addr in addresses if addr}
+
+
+def _scrub(value: Any, addresses: set[str]) -> Any:
+    if isinstance(value, str):
+        for addr in addresses:
+            value = value.replace(addr, REDACTED)
+        return value
+    if isinstance(value, dict):
+        return {key: _scrub(item, addresses) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub(item, addresses) for item in value]
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def _events(events: Iterable[RecentEvent]) -> list[dict[str, Any]]:
+    return [dataclasses.asdict(event) for event in events]
+
+
+def _conditions(conditions: CurrentConditions) -> dict[str, Any]:
+    return {
+        "did": conditions.did,
+        "ts": conditions.ts.isoformat(),
+        "name": conditions.name,
+        "conditions": [
+            {
+                "type": type(record).__qualname__,
+                **{
+                    name: _json_value(getattr(record, name))
+                    for name in field_names(type(record))
+                },
+                "extra": record.extra,
+            }
+            for record in conditions.conditions
+        ],
+    }
+
+
+def _rest(rest: WeatherLinkRest) -> dict[str, Any]:
+    scheduler = rest.scheduler
+    cache = rest.cache
+    return {
+        "requests": rest.request_count,
+        "errors": rest.error_count,
+        "bytes_received": rest.bytes_received,
+        "wait_time": rest.wait_time.as_dict(),
+        "request_time": rest.request_time.as_dict(),
+        "parse_time": rest.parse_time.as_dict(),
+        "recent_requests": _events(rest.recent_requests),
+        "scheduler": {
+            "queue_depth": scheduler.queue_depth,
+            "requests": scheduler.request_count,
+            "wait_time_total": scheduler.wait_time_total,
+            "wait_time_max": scheduler.wait_time_max,
+        },
+        "cache": {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "coalesced": cache.coalesced,
+        },
+    }
+
+
+def _broadcast(broadcast: WeatherLinkBroadcast | None) -> dict[str, Any] | None:
+    if broadcast is None:
+        return None
+
+    renewer = broadcast.renewer
+    protocol = broadcast.protocol
+    return {
+        "renewer": {
+            "remote_addr": renewer.remote_addr,
+            "broadcast_port": renewer.broadcast_port,
+            "renew_at": datetime.fromtimestamp(renewer.renew_at).isoformat(),
+            "renew_count": renewer.renew_count,
+            "failure_count": renewer.failure_count,
+            "last_latency": renewer.last_latency,
+            "last_error": repr(renewer.last_error) if renewer.last_error else None,
+        },
+        "protocol": {
+            "remote_addr": protocol.remote_addr,
+            "did": protocol.did,
+            "packets": protocol.packets.count,
+            "packet_rate": protocol.packets.rate(),
+            "bytes_received": protocol.bytes_received,
+            "rejected": protocol.rejected,
+            "parse_time": protocol.parse_time.as_dict(),
+            "parse_errors": _events(protocol.parse_errors),
+        },
+        "mailbox": {
+            "merged": protocol.mailbox.merged,
+            "dropped": protocol.mailbox.dropped,
+        },
+    }
+
+
+def _coordinator(hass: HomeAssistant, coord: WeatherLinkCoordinator) -> dict[str, Any]:
+    now = hass.loop.time()
+    poller = coord.poller
+    age_summary = poller.age_summary()
+    adaptive = coord.adaptive
+    trigger = coord.broadcast_trigger
+    capture = coord.capture
+    return {
+        "last_update_success": coord.last_update_success,
+        "update_interval": coord.update_interval.total_seconds()
+        if coord.update_interval
+        else None,
+        "next_poll_delay": coord.next_poll_delay,
+        "refreshes": coord.refresh_count,
+        "retries": coord.retry_count,
+        "failed_refreshes": coord.failed_refresh_count,
+        "skipped_refreshes": coord.skipped_refresh_count,
+        "refresh_time": coord.refresh_time.as_dict(),
+        "recent_refreshes": _events(coord.recent_refreshes),
+        "last_changes": {
+            cls.__qualname__: list(names) for cls, names in coord.last_changes.items()
+        },
+        "poller": {
+            "period": poller.period,
+            "phase": poller.phase,
+            "data_age": dataclasses.asdict(age_summary) if age_summary else None,
+        },
+        "adaptive": {
+            "interval": adaptive.interval,
+            "activity": adaptive.activity,
+            "min_interval": adaptive.min_interval,
+            "max_interval": adaptive.max_interval,
+        }
+        if adaptive
+        else None,
+        "breaker": {
+            "open": coord.breaker.is_open,
+            "failures": coord.breaker.failures,
+            "open_count": coord.breaker.open_count,
+            "retry_in": coord.breaker.retry_in,
+        },
+        "broadcast_health": {
+            "healthy": coord.broadcast_health.is_healthy(now),
+            "stall_count": coord.broadcast_health.stall_count,
+        },
+        "broadcast_trigger": {
+            "active": trigger.active,
+            "trigger_count": trigger.trigger_count,
+        }
+        if trigger
+        else None,
+        "cpu": {name: meter.as_dict() for name, meter in coord.cpu_meters().items()},
+        "packet_latency": coord.packet_latency.as_dict()
+        if coord.packet_latency
+        else None,
+        "capture": {
+            "records": capture.record_count,
+            "bytes_written": capture.bytes_written,
+            "dropped": capture.dropped_count,
+            "error": repr(capture.error) if capture.error else None,
+        }
+        if capture
+        else None,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    coord: WeatherLinkCoordinator = hass.data[DOMAIN][entry.entry_id]
+    conditions = coord.data
+    diagnostics = {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "device": {
+            "did": coord.device_did,
+            "name": coord.device_name,
+            "model": coord.device_model_name,
+        },
+        "conditions": {
+            "raw": conditions.raw,
+            "parsed": _conditions(conditions),
+        },
+        "coordinator": _coordinator(hass, coord),
+        "rest": _rest(coord.session),
+        "broadcast": _broadcast(coord.broadcast),
+    }
+    return _scrub(async_redact_data(diagnostics, TO_REDACT), _addresses(entry, coord))
@@ -0,0 +1,292 @@
+import dataclasses
+import math
+import statistics
+from collections import deque
+from collections.abc import Hashable, Mapping
+
+PHASE_SMOOTHING: float = 0.3
+"""Weight of a new observation in the running phase estimate."""
+POLL_MARGIN: float = 1.5
+"""Seconds to wait after the expected refresh. Device timestamps only have a resolution of seconds."""
+MIN_POLL_GAP: float = 0.5
+"""Minimum time between two polls as a fraction of the period."""
+AGE_SAMPLES: int = 256
+
+FAST_CHANGE: float = 1.0
+"""Activity (in significant steps per minute) at which the adaptive interval shrinks."""
+FLAT_CHANGE: float = 0.25
+"""Activity below which the adaptive interval grows."""
+INTERVAL_SHRINK: float = 0.5
+INTERVAL_GROWTH: float = 1.25
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DataAgeSummary:
+    """Distribution of the age of the polled data in seconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    max: float
+
+
+class PhaseLockedPoller:
+    """Schedules polls just after the device is expected to refresh its data.
+
+    The device doesn't tell us when it will refresh, but some records report when they last did.
+    The phase of these refreshes relative to the polling period is tracked as a circular mean so
+    the estimate follows a slowly drifting device clock.
+    Without any observations the poller simply polls every `period` seconds.
+    """
+
+    period: float
+    """nominal time between polls in seconds"""
+    phase: float | None
+    """offset of the refreshes within the period in seconds, `None` while unknown"""
+    ages: deque[float]
+    """age of the data of the most recent polls in seconds"""
+
+    _phase_x: float
+    _phase_y: float
+    _last_refresh: float | None
+
+    def __init__(self, period: float) -> None:
+        self.ages = deque(maxlen=AGE_SAMPLES)
+        self.phase = None
+        self._last_refresh = None
+        self.set_period(period)
+
+    def set_period(self, period: float) -> None:
+        """Change the period.
+
+        The device keeps refreshing on its own clock no matter how often it's polled, so the
+        phase is carried over from the most recent refresh, aligned to the current estimate.
+        """
+        anchor = self.__refresh_anchor()
+        self.period = period
+        if anchor is None:
+            self.phase = None
+            self._phase_x = 0.0
+            self._phase_y = 0.0
+            return
+
+        self.phase = anchor % period
+        angle = 2 * math.pi * self.phase / period
+        self._phase_x = math.cos(angle)
+        self._phase_y = math.sin(angle)
+
+    def __refresh_anchor(self) -> float | None:
+        """Time of the most recent refresh, moved onto the estimated phase."""
+        last_refresh = self._last_refresh
+        if last_refresh is None or self.phase is None:
+            return None
+
+        period = self.period
+        offset = (self.phase - last_refresh) % period
+        if offset > period / 2:
+            offset -= period
+        return last_refresh + offset
+
+    def observe(self, polled_at: float, *, data_age: float | None) -> None:
+        """Record a poll.
+
+        Args:
+            polled_at: Time of the poll in seconds on the same clock as used for `next_delay`.
+            data_age: How long before the poll the device last refreshed its data, if known.
+        """
+        if data_age is None or data_age < 0:
+            return
+
+        self.ages.append(data_age)
+        if data_age > 2 * self.period:
+            # the sensor stopped reporting, its last report says nothing about the phase
+            return
+
+        self._last_refresh = polled_at - data_age
+        angle = 2 * math.pi * (self._last_refresh % self.period) / self.period
+        if self.phase is None:
+            self._phase_x = math.cos(angle)
+            self._phase_y = math.sin(angle)
+        else:
+            self._phase_x += PHASE_SMOOTHING * (math.cos(angle) - self._phase_x)
+            self._phase_y += PHASE_SMOOTHING * (math.sin(angle) - self._phase_y)
+
+        mean_angle = math.atan2(self._phase_y, self._phase_x)
+        self.phase = (mean_angle / (2 * math.pi) * self.period) % self.period
+
+    def next_delay(self, now: float) -> float:
+        """Get the delay until the next poll in seconds."""
+        period = self.period
+        if self.phase is None:
+            return period
+
+        target = self.phase + POLL_MARGIN
+        earliest = now + MIN_POLL_GAP * period
+        next_poll = target + math.ceil((earliest - target) / period) * period
+        return next_poll - now
+
+    def age_summary(self) -> DataAgeSummary | None:
+        ages = self.ages
+        if not ages:
+            return None
+
+        deciles = statistics.quantiles(ages, n=10) if len(ages) > 1 else [ages[0]] * 9
+        return DataAgeSummary(
+            count=len(ages),
+            mean=statistics.fmean(ages),
+            p50=deciles[4],
+            p90=deciles[8],
+            max=max(ages),
+        )
+
+
+class AdaptiveInterval[K: Hashable]:
+    """Adapts the polling interval to how fast the watched values change.
+
+    Each watched value has a threshold of what counts as a significant change per minute.
+    The interval is halved as soon as any value changes faster than that and slowly grows back
+    while all of them are flat.
+    """
+
+    thresholds: Mapping[K, float]
+    min_interval: float
+    max_interval: float
+    interval: float
+    """currently chosen interval in seconds"""
+    activity: float
+    """largest rate of change of the last observation in significant steps per minute"""
+
+    _last_values: dict[K, float]
+    _last_at: float | None
+
+    def __init__(
+        self,
+        thresholds: Mapping[K, float],
+        *,
+        min_interval: float,
+        max_interval: float,
+        interval: float,
+    ) -> None:
+        if min_interval > max_interval:
+            raise ValueError("min_interval must not exceed max_interval")
+
+        self.thresholds = thresholds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.activity = 0.0
+
+        self._last_values = {}
+        self._last_at = None
+
+    def observe(self, at: float, values: Mapping[K, float | None]) -> float:
+        """Record a snapshot of the watched values and return the interval to use next."""
+        last_at = self._last_at
+        last_values = self._last_values
+        self._last_at = at
+        self._last_values = {
+            key: value for key, value in values.items() if value is not None
+        }
+        if last_at is None or at <= last_at:
+            return self.interval
+
+        minutes = (at - last_at) / 60
+        activity = 0.0
+        for key, value in self._last_values.items():
+            try:
+                delta = abs(value - last_values[key])
+            except KeyError:
+                continue
+            activity = max(activity, delta / self.thresholds[key] / minutes)
+
+        self.activity = activity
+        if activity >= FAST_CHANGE:
+            self.interval = max(self.interval * INTERVAL_SHRINK, self.min_interval)
+        elif activity < FLAT_CHANGE:
+            self.interval = min(self.interval * INTERVAL_GROWTH, self.max_interval)
+
+        return self.interval
+
+
+class StreamHealth:
+    """Tracks whether a stream of periodic packets still arrives on time."""
+
+    timeout: float
+    """seconds without a packet after which the stream counts as stalled"""
+    stall_count: int
+    """number of times the stream stalled"""
+
+    _last_at: float | None
+    _stalled: bool
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.stall_count = 0
+        self._last_at = None
+        self._stalled = True
+
+    def feed(self, at: float) -> bool:
+        """Record a packet and return whether the stream recovered from a stall."""
+        self._last_at = at
+        recovered = self._stalled
+        self._stalled = False
+        return recovered
+
+    def stall(self) -> bool:
+        """Mark the stream as stalled and return whether it was healthy before."""
+        if self._stalled:
+            return False
+
+        self._stalled = True
+        self.stall_count += 1
+        return True
+
+    def is_healthy(self, now: float) -> bool:
+        last_at = self._last_at
+        return (
+            not self._stalled and last_at is not None and now - last_at < self.timeout
+        )
+
+
+class EventTrigger[K: Hashable]:
+    """Switches on while any watched value exceeds its threshold.
+
+    Once on, it stays on until none of the values exceeded its threshold for `quiet_period` seconds.
+    """
+
+    thresholds: Mapping[K, float]
+    quiet_period: float
+    active: bool
+    triggered_by: K | None
+    """value which switched the trigger on most recently"""
+    trigger_count: int
+
+    _last_event_at: float
+
+    def __init__(self, thresholds: Mapping[K, float], *, quiet_period: float) -> None:
+        self.thresholds = thresholds
+        self.quiet_period = quiet_period
+        self.active = False
+        self.triggered_by = None
+        self.trigger_count = 0
+        self._last_event_at = 0.0
+
+    def update(self, now: float, values: Mapping[K, float | None]) -> bool:
+        """Check the values and return whether the trigger is on."""
+        thresholds = self.thresholds
+        for key, value in values.items():
+            if value is None or abs(value) <= thresholds[key]:
+                continue
+
+            if not self.active:
+                self.active = True
+                self.triggered_by = key
+                self.trigger_count += 1
+            self._last_event_at = now
+            return True
+
+        if self.active and now - self._last_event_at >= self.quiet_period:
+            self.active = False
+
+        return self.active
@@ -16,6 +16,16 @@ from .sensor_air_quality import (
     Temperature,
 )
 from .sensor_common import WeatherLinkSensor
+from .sensor_diagnostic import (
+    BroadcastPacketRate,
+    BytesReceived,
+    CallbackCpu,
+    ParseTime,
+    RefreshRetries,
+    RequestTime,
+    RequestWaitTime,
+    UpdateInterval,
+)
 from .sensor_iss import (
     IssHumidity,
     IssStatus,
@@ -56,6 +66,14 @@ __all__ = [
     "SOIL_MOISTURE_CLS",
     "SOIL_TEMPERATURE_CLS",
     "LEAF_CLS",
+    "UpdateInterval",
+    "RequestTime",
+    "RequestWaitTime",
+    "ParseTime",
+    "BytesReceived",
+    "BroadcastPacketRate",
+    "RefreshRetries",
+    "CallbackCpu",
 ]
 
 
@@ -76,6 +94,7 @@ class Pressure(
     device_class=SensorDeviceClass.PRESSURE,
     state_class=SensorStateClass.MEASUREMENT,
     required_conditions=(LssBarCondition,),
+    input_fields=("bar_sea_level", "bar_trend", "bar_absolute"),
 ):
     @property
     def _lss_bar_condition(self) -> LssBarCondition:
@@ -101,6 +120,7 @@ class InsideTemp(
     device_class=SensorDeviceClass.TEMPERATURE,
     state_class=SensorStateClass.MEASUREMENT,
     required_conditions=(LssTempHumCondition,),
+    input_fields=("temp_in", "dew_point_in", "heat_index_in"),
 ):
     @property
     def _lss_temp_hum_condition(self) -> LssTempHumCondition:
@@ -126,6 +146,7 @@ class InsideHum(
     device_class=SensorDeviceClass.HUMIDITY,
     state_class=SensorStateClass.MEASUREMENT,
     required_conditions=(LssTempHumCondition,),
+    input_fields=("hum_in",),
 ):
     @property
     def _lss_temp_hum_condition(self) -> LssTempHumCondition:
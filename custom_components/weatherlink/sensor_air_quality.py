@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
@@ -42,18 +42,26 @@ class AirQualityStatus(
     sensor_name="Status",
     unit_of_measurement=None,
     device_class=None,
+    input_fields=(
+        "last_report_time",
+        "pct_pm_data_last_1_hour",
+        "pct_pm_data_last_3_hours",
+        "pct_pm_data_last_24_hours",
+        "pct_pm_data_nowcast",
+    ),
 ):
+    # becomes disconnected once the last report is too old
+    _time_dependent = True
+
     @property
     def icon(self):
         return "mdi:information"
 
     @property
     def native_value(self) -> str:
-        update_interval = self.coordinator.update_interval
-        if not update_interval:
-            return "unknown"
-
-        deadline = datetime.now() - 2 * update_interval
+        # the nominal interval, the delay until the next poll varies with its phase
+        period = self.coordinator.poller.period
+        deadline = datetime.now() - timedelta(seconds=2 * period)
         last_report_time = self._aq_condition.last_report_time
         # last report time is older than two update intervals
         if last_report_time < deadline:
@@ -79,6 +87,7 @@ class Temperature(
     unit_of_measurement=UnitOfTemperature.CELSIUS,
     device_class=SensorDeviceClass.TEMPERATURE,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("temp", "dew_point", "wet_bulb", "heat_index"),
 ):
     @property
     def native_value(self):
@@ -100,6 +109,7 @@ class Humidity(
     unit_of_measurement=PERCENTAGE,
     device_class=SensorDeviceClass.HUMIDITY,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("hum",),
 ):
     @property
     def native_value(self):
@@ -112,6 +122,7 @@ class Pm1p0(
     unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
     device_class=SensorDeviceClass.PM1,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("pm_1",),
 ):
     @property
     def icon(self):
@@ -128,6 +139,13 @@ class Pm2p5(
     unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
     device_class=SensorDeviceClass.PM25,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=(
+        "pm_2p5_nowcast",
+        "pm_2p5",
+        "pm_2p5_last_1_hour",
+        "pm_2p5_last_3_hours",
+        "pm_2p5_last_24_hours",
+    ),
 ):
     @property
     def icon(self):
@@ -154,6 +172,13 @@ class Pm10p0(
     unit_of_measurement=CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
     device_class=SensorDeviceClass.PM10,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=(
+        "pm_10_nowcast",
+        "pm_10",
+        "pm_10_last_1_hour",
+        "pm_10_last_3_hours",
+        "pm_10_last_24_hours",
+    ),
 ):
     @property
     def icon(self):
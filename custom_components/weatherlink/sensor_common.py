@@ -8,7 +8,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 
-from . import WeatherLinkCoordinator, WeatherLinkEntity
+from . import WeatherLinkCoordinator, WeatherLinkEntity, condition_fields
 from .api.conditions import ConditionRecord, CurrentConditions
 
 logger = logging.getLogger(__name__)
@@ -26,6 +26,7 @@ class WeatherLinkSensor(WeatherLinkEntity, SensorEntity):
         device_class: SensorDeviceClass | None,
         required_conditions: Iterable[type[ConditionRecord]] | None = None,
         state_class: SensorStateClass | None = None,
+        input_fields: Iterable[str] | None = None,
         **kwargs: typing.Any,
     ) -> None: ...
 
@@ -48,6 +49,7 @@ class WeatherLinkSensor(WeatherLinkEntity, SensorEntity):
 
         sensor_name = kwargs.pop("sensor_name")
         required_conditions = kwargs.pop("required_conditions", None)
+        input_fields = kwargs.pop("input_fields", None)
         cls._attr_native_unit_of_measurement = kwargs.pop("unit_of_measurement", None)
         cls._attr_device_class = kwargs.pop("device_class", None)
         cls._attr_state_class = kwargs.pop("state_class", None)
@@ -62,6 +64,10 @@ class WeatherLinkSensor(WeatherLinkEntity, SensorEntity):
         except AttributeError:
             requirements = ()
         cls._required_conditions = requirements + tuple(required_conditions)
+        if input_fields is not None:
+            cls._input_fields = condition_fields(
+                cls._required_conditions, *input_fields
+            )
 
         cls._SENSORS.append(cls)
 
@@ -0,0 +1,233 @@
+from abc import abstractmethod
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+
+from .api.metrics import Histogram
+from .sensor_common import WeatherLinkSensor
+
+__all__ = [
+    "UpdateInterval",
+    "RequestTime",
+    "RequestWaitTime",
+    "ParseTime",
+    "BytesReceived",
+    "BroadcastPacketRate",
+    "RefreshRetries",
+    "CallbackCpu",
+]
+
+
+def _ms(seconds: float | None) -> float | None:
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 2)
+
+
+class DiagnosticSensor(WeatherLinkSensor, abc=True):
+    """Describes the integration rather than the conditions.
+
+    None of the condition fields are inputs, the state is written after every poll instead.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _time_dependent = True
+
+    def __init_subclass__(
+        cls,
+        abc: bool = False,
+        **kwargs,
+    ) -> None:
+        if not abc:
+            kwargs.setdefault("required_conditions", ())
+            kwargs.setdefault("input_fields", ())
+        super().__init_subclass__(abc=abc, **kwargs)
+
+
+class UpdateInterval(
+    DiagnosticSensor,
+    sensor_name="Update Interval",
+    unit_of_measurement=UnitOfTime.SECONDS,
+    device_class=SensorDeviceClass.DURATION,
+):
+    _attr_entity_registry_enabled_default = True
+
+    @property
+    def native_value(self):
+        return round(self.coordinator.poller.period, 1)
+
+    @property
+    def extra_state_attributes(self):
+        coord = self.coordinator
+        broadcasting = coord.broadcast_health.is_healthy(self.hass.loop.time())
+        adaptive = coord.adaptive
+        if adaptive is None:
+            return {"broadcasting": broadcasting, "adaptive": False}
+
+        return {
+            "broadcasting": broadcasting,
+            "adaptive": True,
+            "activity": round(adaptive.activity, 2),
+            "min_interval": adaptive.min_interval,
+            "max_interval": adaptive.max_interval,
+        }
+
+
+class LatencySensor(DiagnosticSensor, abc=True):
+    """Median of a latency histogram in milliseconds."""
+
+    def __init_subclass__(
+        cls,
+        abc: bool = False,
+        **kwargs,
+    ) -> None:
+        if not abc:
+            kwargs["unit_of_measurement"] = UnitOfTime.MILLISECONDS
+            kwargs["device_class"] = SensorDeviceClass.DURATION
+            kwargs["state_class"] = SensorStateClass.MEASUREMENT
+        super().__init_subclass__(abc=abc, **kwargs)
+
+    @property
+    @abstractmethod
+    def _histogram(self) -> Histogram: ...
+
+    @property
+    def native_value(self):
+        return _ms(self._histogram.quantile(0.5))
+
+    @property
+    def extra_state_attributes(self):
+        histogram = self._histogram
+        return {
+            "count": histogram.count,
+            "mean": _ms(histogram.mean),
+            "p90": _ms(histogram.quantile(0.9)),
+            "p99": _ms(histogram.quantile(0.99)),
+            "max": _ms(histogram.max),
+        }
+
+
+class RequestTime(LatencySensor, sensor_name="Request Time"):
+    @property
+    def _histogram(self) -> Histogram:
+        return self.coordinator.session.request_time
+
+    @property
+    def extra_state_attributes(self):
+        session = self.coordinator.session
+        return {
+            **super().extra_state_attributes,
+            "requests": session.request_count,
+            "errors": session.error_count,
+        }
+
+
+class RequestWaitTime(LatencySensor, sensor_name="Request Wait Time"):
+    @property
+    def _histogram(self) -> Histogram:
+        return self.coordinator.session.wait_time
+
+
+class ParseTime(LatencySensor, sensor_name="Parse Time"):
+    @property
+    def _histogram(self) -> Histogram:
+        return self.coordinator.session.parse_time
+
+
+class BytesReceived(
+    DiagnosticSensor,
+    sensor_name="Bytes Received",
+    unit_of_measurement=UnitOfInformation.BYTES,
+    device_class=SensorDeviceClass.DATA_SIZE,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+):
+    @property
+    def native_value(self):
+        return self.coordinator.session.bytes_received
+
+
+class BroadcastPacketRate(
+    DiagnosticSensor,
+    sensor_name="Broadcast Packet Rate",
+    unit_of_measurement="packets/s",
+    device_class=None,
+    state_class=SensorStateClass.MEASUREMENT,
+):
+    @property
+    def native_value(self):
+        if (broadcast := self.coordinator.broadcast) is None:
+            return None
+        return round(broadcast.protocol.packets.rate(), 2)
+
+    @property
+    def extra_state_attributes(self):
+        if (broadcast := self.coordinator.broadcast) is None:
+            return None
+
+        protocol = broadcast.protocol
+        return {
+            "packets": protocol.packets.count,
+            "bytes": protocol.bytes_received,
+            "rejected": protocol.rejected,
+            "merged": protocol.mailbox.merged,
+            "dropped": protocol.mailbox.dropped,
+            "parse_time": _ms(protocol.parse_time.quantile(0.5)),
+        }
+
+
+class RefreshRetries(
+    DiagnosticSensor,
+    sensor_name="Refresh Retries",
+    unit_of_measurement=None,
+    device_class=None,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+):
+    @property
+    def native_value(self):
+        return self.coordinator.retry_count
+
+    @property
+    def extra_state_attributes(self):
+        coord = self.coordinator
+        return {
+            "refreshes": coord.refresh_count,
+            "failed_refreshes": coord.failed_refresh_count,
+            "skipped_refreshes": coord.skipped_refresh_count,
+            "refresh_time": _ms(coord.refresh_time.quantile(0.5)),
+            "breaker_open_count": coord.breaker.open_count,
+        }
+
+
+class CallbackCpu(
+    DiagnosticSensor,
+    sensor_name="Event Loop CPU",
+    unit_of_measurement=PERCENTAGE,
+    device_class=None,
+    state_class=SensorStateClass.MEASUREMENT,
+):
+    """Share of the event loop spent in the callbacks of the integration.
+
+    Only measured while latency is measured.
+    """
+
+    @property
+    def native_value(self):
+        meters = self.coordinator.cpu_meters()
+        if not meters:
+            return None
+        # entity writes are already part of notifying the listeners
+        meters.pop("entity_write")
+        return round(sum(meter.utilization() for meter in meters.values()) * 100, 3)
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            f"{name}_mean": _ms(meter.total / meter.count if meter.count else None)
+            for name, meter in self.coordinator.cpu_meters().items()
+        }
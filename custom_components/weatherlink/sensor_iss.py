@@ -50,6 +50,7 @@ class IssStatus(
     sensor_name="ISS Status",
     unit_of_measurement=None,
     device_class=None,
+    input_fields=("rx_state", "txid", "trans_battery_flag"),
 ):
     @property
     def icon(self):
@@ -77,6 +78,15 @@ class IssTemperature(
     unit_of_measurement=UnitOfTemperature.CELSIUS,
     device_class=SensorDeviceClass.TEMPERATURE,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=(
+        "temp",
+        "dew_point",
+        "wet_bulb",
+        "heat_index",
+        "wind_chill",
+        "thw_index",
+        "thsw_index",
+    ),
 ):
     @property
     def native_value(self):
@@ -101,6 +111,7 @@ class ThswIndex(
     unit_of_measurement=UnitOfTemperature.CELSIUS,
     device_class=SensorDeviceClass.TEMPERATURE,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("thsw_index",),
 ):
     @property
     def native_value(self):
@@ -113,6 +124,7 @@ class IssHumidity(
     unit_of_measurement=PERCENTAGE,
     device_class=SensorDeviceClass.HUMIDITY,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("hum",),
 ):
     @property
     def native_value(self):
@@ -125,6 +137,7 @@ class WindSpeed(
     unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
     device_class=SensorDeviceClass.WIND_SPEED,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("wind_speed_avg_last_2_min", "wind_speed_avg_last_10_min"),
 ):
     @property
     def icon(self):
@@ -148,6 +161,7 @@ class WindSpeedNow(
     unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
     device_class=SensorDeviceClass.WIND_SPEED,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("wind_speed_last",),
 ):
     @property
     def icon(self):
@@ -164,6 +178,7 @@ class WindMaxSpeed(
     unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
     device_class=SensorDeviceClass.WIND_SPEED,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("wind_speed_hi_last_2_min", "wind_speed_hi_last_10_min"),
 ):
     @property
     def icon(self):
@@ -187,6 +202,12 @@ class WindBearing(
     unit_of_measurement=DEGREE,
     device_class=SensorDeviceClass.WIND_DIRECTION,
     state_class=SensorStateClass.MEASUREMENT_ANGLE,
+    input_fields=(
+        "wind_dir_scalar_avg_last_2_min",
+        "wind_dir_at_hi_speed_last_2_min",
+        "wind_dir_scalar_avg_last_10_min",
+        "wind_dir_at_hi_speed_last_10_min",
+    ),
 ):
     @property
     def icon(self):
@@ -212,6 +233,7 @@ class WindBearingNow(
     unit_of_measurement=DEGREE,
     device_class=SensorDeviceClass.WIND_DIRECTION,
     state_class=SensorStateClass.MEASUREMENT_ANGLE,
+    input_fields=("wind_dir_last",),
 ):
     @property
     def icon(self):
@@ -227,6 +249,12 @@ class WindDirection(
     sensor_name="Wind direction",
     unit_of_measurement=None,
     device_class=None,
+    input_fields=(
+        "wind_dir_scalar_avg_last_2_min",
+        "wind_dir_at_hi_speed_last_2_min",
+        "wind_dir_scalar_avg_last_10_min",
+        "wind_dir_at_hi_speed_last_10_min",
+    ),
 ):
     _DIRECTIONS = (
         "N",
@@ -278,6 +306,7 @@ class SolarRad(
     unit_of_measurement=UnitOfIrradiance.WATTS_PER_SQUARE_METER,
     device_class=SensorDeviceClass.IRRADIANCE,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("solar_rad",),
 ):
     @property
     def icon(self):
@@ -294,6 +323,7 @@ class UvIndex(
     unit_of_measurement=None,
     device_class=None,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("uv_index",),
 ):
     @property
     def icon(self):
@@ -310,6 +340,7 @@ class RainRate(
     unit_of_measurement=UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
     device_class=SensorDeviceClass.PRECIPITATION_INTENSITY,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=("rain_rate_last", "rain_rate_hi", "rain_rate_hi_last_15_min"),
 ):
     @property
     def icon(self):
@@ -334,6 +365,14 @@ class Rainfall(
     unit_of_measurement=UnitOfPrecipitationDepth.MILLIMETERS,
     device_class=SensorDeviceClass.PRECIPITATION,
     state_class=SensorStateClass.MEASUREMENT,
+    input_fields=(
+        "rainfall_daily",
+        "rainfall_last_15_min",
+        "rainfall_last_60_min",
+        "rainfall_last_24_hr",
+        "rainfall_monthly",
+        "rainfall_year",
+    ),
 ):
     @property
     def icon(self):
@@ -361,6 +400,13 @@ class Rainstorm(
     unit_of_measurement=UnitOfPrecipitationDepth.MILLIMETERS,
     device_class=SensorDeviceClass.PRECIPITATION,
     state_class=SensorStateClass.TOTAL,
+    input_fields=(
+        "rain_storm",
+        "rain_storm_start_at",
+        "rain_storm_last",
+        "rain_storm_last_start_at",
+        "rain_storm_last_end_at",
+    ),
 ):
     @property
     def icon(self):
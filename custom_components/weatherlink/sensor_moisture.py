@@ -33,6 +33,7 @@ class MoistureStatus(
     sensor_name="Moisture Status",
     unit_of_measurement=None,
     device_class=None,
+    input_fields=("rx_state", "txid", "trans_battery_flag"),
 ):
     @property
     def icon(self):
@@ -62,6 +63,7 @@ class SoilMoistureABC(MoistureSensor, abc=True):
     def __init_subclass__(cls, *, sensor_id: int, **kwargs) -> None:
         super().__init_subclass__(
             sensor_name=f"Soil Moisture {sensor_id}",
+            input_fields=(f"moist_soil_{sensor_id}",),
             unit_of_measurement="cb",
             device_class=None,
             state_class=SensorStateClass.MEASUREMENT,
@@ -102,6 +104,7 @@ class SoilTemperatureABC(MoistureSensor, abc=True):
     def __init_subclass__(cls, *, sensor_id: int, **kwargs) -> None:
         super().__init_subclass__(
             sensor_name=f"Soil Temperature {sensor_id}",
+            input_fields=(f"temp_{sensor_id}",),
             unit_of_measurement=UnitOfTemperature.CELSIUS,
             device_class=SensorDeviceClass.TEMPERATURE,
             **kwargs,
@@ -138,6 +141,7 @@ class LeafABC(MoistureSensor, abc=True):
     def __init_subclass__(cls, *, sensor_id: int, **kwargs) -> None:
         super().__init_subclass__(
             sensor_name=f"Leaf {sensor_id}",
+            input_fields=(f"wet_leaf_{sensor_id}",),
             unit_of_measurement=PERCENTAGE,
             device_class=SensorDeviceClass.MOISTURE,
             **kwargs,
@@ -10,7 +10,7 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-from . import WeatherLinkCoordinator, WeatherLinkEntity
+from . import WeatherLinkCoordinator, WeatherLinkEntity, condition_fields
 from .api.conditions import IssCondition, LssBarCondition
 from .const import DOMAIN
 
@@ -30,6 +30,19 @@ async def async_setup_entry(
 
 
 class Weather(WeatherEntity, WeatherLinkEntity):
+    _input_fields = condition_fields(
+        (IssCondition, LssBarCondition),
+        "temp",
+        "hum",
+        "wind_speed_avg_last_2_min",
+        "wind_dir_scalar_avg_last_2_min",
+        "rain_rate_hi",
+        "solar_rad",
+        "bar_sea_level",
+    )
+    # the condition depends on the sun
+    _time_dependent = True
+
     @property
     def _iss_condition(self) -> IssCondition:
         return self._conditions[IssCondition]
@@ -1,5 +1,73 @@
 import sys
 from pathlib import Path
 
+import pytest
+
+from .weatherlink.benchmark import (
+    DEFAULT_TOLERANCE,
+    RESULTS,
+    Comparison,
+    compare,
+    load_results,
+    save_results,
+)
+
 CUSTOM_COMPONENTS_PATH = (Path(__file__) / "../../custom_components").resolve()
 sys.path.append(str(CUSTOM_COMPONENTS_PATH))
+
+_REGRESSIONS = pytest.StashKey[list[Comparison]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-json",
+        metavar="PATH",
+        help="save the timings of the benchmarks as JSON",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        metavar="PATH",
+        help="fail if a benchmark is slower than in the saved results",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        metavar="FRACTION",
+        help="how much slower than the baseline a benchmark may be (default: %(default)s)",
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    if path := config.getoption("benchmark_json"):
+        save_results(path)
+
+    if path := config.getoption("benchmark_baseline"):
+        regressions = compare(
+            RESULTS,
+            load_results(path),
+            tolerance=config.getoption("benchmark_tolerance"),
+        )
+        config.stash[_REGRESSIONS] = regressions
+        if regressions and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    regressions = config.stash.get(_REGRESSIONS, None)
+    if regressions is None:
+        return
+
+    terminalreporter.section("benchmark comparison")
+    if not regressions:
+        terminalreporter.write_line("no benchmark is slower than the baseline")
+        return
+
+    for regression in regressions:
+        terminalreporter.write_line(
+            f"{regression.name}: {regression.baseline * 1e6:.2f} µs -> "
+            f"{regression.current * 1e6:.2f} µs ({regression.ratio:.2f}x)",
+            red=True,
+        )
@@ -0,0 +1,184 @@
+"""Sample device payloads shared between tests.
+
+Every function returns a freshly decoded object because parsing mutates the payload.
+"""
+
+import json
+
+from weatherlink.api.from_json import JsonObject
+
+_WLL_CURRENT_CONDITIONS = """
+{
+    "data": {
+        "did": "001D0A714BE5",
+        "ts": 1624008330,
+        "conditions": [
+            {
+                "lsid": 428362,
+                "data_structure_type": 1,
+                "txid": 1,
+                "temp": 56.0,
+                "hum": 91.5,
+                "dew_point": 53.6,
+                "wet_bulb": 54.5,
+                "heat_index": 56.2,
+                "wind_chill": 53.0,
+                "thw_index": 53.2,
+                "thsw_index": 52.7,
+                "wind_speed_last": 10.00,
+                "wind_dir_last": 17,
+                "wind_speed_avg_last_1_min": 6.81,
+                "wind_dir_scalar_avg_last_1_min": 4,
+                "wind_speed_avg_last_2_min": 7.81,
+                "wind_dir_scalar_avg_last_2_min": 5,
+                "wind_speed_hi_last_2_min": 15.00,
+                "wind_dir_at_hi_speed_last_2_min": 5,
+                "wind_speed_avg_last_10_min": 8.93,
+                "wind_dir_scalar_avg_last_10_min": 8,
+                "wind_speed_hi_last_10_min": 15.00,
+                "wind_dir_at_hi_speed_last_10_min": 12,
+                "rain_size": 2,
+                "rain_rate_last": 32,
+                "rain_rate_hi": 32,
+                "rainfall_last_15_min": 9,
+                "rain_rate_hi_last_15_min": 58,
+                "rainfall_last_60_min": 24,
+                "rainfall_last_24_hr": 38,
+                "rain_storm": 61,
+                "rain_storm_start_at": 1623878520,
+                "solar_rad": 35,
+                "uv_index": 0.0,
+                "rx_state": 0,
+                "trans_battery_flag": 0,
+                "rainfall_daily": 34,
+                "rainfall_monthly": 61,
+                "rainfall_year": 61,
+                "rain_storm_last": null,
+                "rain_storm_last_start_at": null,
+                "rain_storm_last_end_at": null
+            },
+            {
+                "lsid": 428365,
+                "data_structure_type": 2,
+                "txid": 4,
+                "temp_1": 56.5,
+                "temp_2": null,
+                "temp_3": null,
+                "temp_4": null,
+                "moist_soil_1": 12.0,
+                "moist_soil_2": null,
+                "moist_soil_3": null,
+                "moist_soil_4": null,
+                "wet_leaf_1": 15.0,
+                "wet_leaf_2": null,
+                "rx_state": 0,
+                "trans_battery_flag": 0
+            },
+            {
+                "lsid": 428346,
+                "data_structure_type": 4,
+                "temp_in": 71.4,
+                "hum_in": 62.0,
+                "dew_point_in": 57.7,
+                "heat_index_in": 71.3
+            },
+            {
+                "lsid": 428345,
+                "data_structure_type": 3,
+                "bar_sea_level": 29.972,
+                "bar_trend": -0.007,
+                "bar_absolute": 29.944
+            }
+        ]
+    },
+    "error": null
+}
+"""
+
+_AIRLINK_CURRENT_CONDITIONS = """
+{
+    "data": {
+        "did": "001D0A10064A",
+        "name": "Luftqualität",
+        "ts": 1610810072,
+        "conditions": [
+            {
+                "lsid": 381867,
+                "data_structure_type": 6,
+                "temp": 27.6,
+                "hum": 87.1,
+                "dew_point": 24.2,
+                "wet_bulb": 26.3,
+                "heat_index": 27.4,
+                "pm_1_last": 28,
+                "pm_2p5_last": 47,
+                "pm_10_last": 57,
+                "pm_1": 25.87,
+                "pm_2p5": 48.55,
+                "pm_2p5_last_1_hour": 47.92,
+                "pm_2p5_last_3_hours": 47.24,
+                "pm_2p5_last_24_hours": 37.35,
+                "pm_2p5_nowcast": 47.45,
+                "pm_10": 59.28,
+                "pm_10_last_1_hour": 58.68,
+                "pm_10_last_3_hours": 57.82,
+                "pm_10_last_24_hours": 43.66,
+                "pm_10_nowcast": 58.15,
+                "last_report_time": 1610810072,
+                "pct_pm_data_last_1_hour": 100,
+                "pct_pm_data_last_3_hours": 100,
+                "pct_pm_data_nowcast": 100,
+                "pct_pm_data_last_24_hours": 100
+            }
+        ]
+    },
+    "error": null
+}
+"""
+
+_WLL_BROADCAST = """
+{
+    "did": "001D0A714BE5",
+    "ts": 1624008332,
+    "conditions": [
+        {
+            "lsid": 428362,
+            "data_structure_type": 1,
+            "txid": 1,
+            "wind_speed_last": 12.0,
+            "wind_dir_last": 20,
+            "rain_size": 2,
+            "rain_rate_last": 32,
+            "rain_15_min": 9,
+            "rain_60_min": 24,
+            "rain_24_hr": 38,
+            "rain_storm": 61,
+            "rain_storm_start_at": 1623878520,
+            "rainfall_daily": 34,
+            "rainfall_monthly": 61,
+            "rainfall_year": 61,
+            "wind_speed_hi_last_10_min": 15.0,
+            "wind_dir_at_hi_speed_last_10_min": 12
+        }
+    ]
+}
+"""
+
+
+def wll_current_conditions_body() -> JsonObject:
+    """`/v1/current_conditions` response of a WeatherLink Live with ISS, soil and LSS sensors."""
+    return json.loads(_WLL_CURRENT_CONDITIONS)
+
+
+def airlink_current_conditions_body() -> JsonObject:
+    """`/v1/current_conditions` response of an AirLink."""
+    return json.loads(_AIRLINK_CURRENT_CONDITIONS)
+
+
+def wll_broadcast_payload() -> JsonObject:
+    """UDP real-time broadcast of the same WeatherLink Live."""
+    return json.loads(_WLL_BROADCAST)
+
+
+def wll_broadcast_datagram() -> bytes:
+    return _WLL_BROADCAST.encode()
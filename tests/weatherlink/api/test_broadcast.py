@@ -0,0 +1,353 @@
+import asyncio
+import json
+import socket
+import time
+from datetime import timedelta
+from typing import override
+
+import pytest
+from weatherlink.api import broadcast
+from weatherlink.api.broadcast import (
+    BroadcastHub,
+    BroadcastRenewer,
+    Mailbox,
+    Protocol,
+    WeatherLinkBroadcast,
+)
+from weatherlink.api.conditions import CurrentConditions, IssCondition
+from weatherlink.api.metrics import RECENT_EVENTS, CpuMeter, StageLatency
+from weatherlink.api.rest import RealTimeBroadcastResponse
+
+from ..benchmark import report
+from . import samples
+
+REMOTE_ADDR = "192.0.2.10"
+
+
+def _broadcast(ts_offset: int = 0, **iss_values) -> CurrentConditions:
+    payload = samples.wll_broadcast_payload()
+    payload["ts"] += ts_offset
+    payload["conditions"][0].update(iss_values)
+    return CurrentConditions.from_json(payload)
+
+
+def test_mailbox_merges_pending_packets():
+    async def run():
+        mailbox = Mailbox()
+        first = _broadcast(wind_dir_last=10, rain_rate_last=1)
+        first_ts = first.ts
+        mailbox.put(first)
+        mailbox.put(_broadcast(2, wind_dir_last=20, rain_rate_last=None))
+        mailbox.put(_broadcast(4, wind_dir_last=30, rain_rate_last=None))
+
+        msg = await mailbox.get()
+        assert isinstance(msg, CurrentConditions)
+        assert msg.ts == first_ts + timedelta(seconds=4)
+        assert msg[IssCondition].wind_dir_last == 30
+        # only sent by the first packet
+        assert msg[IssCondition].rain_rate_last_counts == 1
+        assert mailbox.merged == 2
+        assert mailbox.dropped == 0
+        assert mailbox.get_nowait() is None
+
+    asyncio.run(run())
+
+
+def test_mailbox_newer_packet_wins():
+    mailbox = Mailbox()
+    mailbox.put(_broadcast(4, wind_dir_last=30))
+    # arrives late
+    mailbox.put(_broadcast(2, wind_dir_last=20, rain_rate_last=None))
+
+    msg = mailbox.get_nowait()
+    assert isinstance(msg, CurrentConditions)
+    assert msg[IssCondition].wind_dir_last == 30
+
+
+def test_mailbox_errors():
+    mailbox = Mailbox()
+    mailbox.put(ValueError("broken"))
+    mailbox.put(_broadcast())
+    mailbox.put(ValueError("broken"))
+
+    assert isinstance(mailbox.get_nowait(), CurrentConditions)
+    assert mailbox.dropped == 2
+
+
+def test_protocol_coalesces_datagrams():
+    async def run():
+        protocol = Protocol(REMOTE_ADDR)
+        protocol.parse_cpu = CpuMeter()
+        for i in range(10):
+            payload = samples.wll_broadcast_payload()
+            payload["ts"] += i
+            payload["conditions"][0]["wind_dir_last"] = i
+            protocol.datagram_received(
+                json.dumps(payload).encode(), (REMOTE_ADDR, 22222)
+            )
+        # ignored because it's from a different device
+        protocol.datagram_received(
+            samples.wll_broadcast_datagram(), ("192.0.2.11", 22222)
+        )
+
+        conditions = await protocol.queue_get()
+        assert conditions[IssCondition].wind_dir_last == 9
+        assert protocol.mailbox.merged == 9
+        # packets from other addresses aren't counted
+        assert protocol.packets.count == 10
+        assert protocol.parse_time.count == 10
+        assert protocol.parse_cpu.count == 10
+        assert protocol.parse_cpu.total > 0
+        assert protocol.bytes_received > 0
+
+    asyncio.run(run())
+
+
+def test_protocol_measures_latency_from_oldest_packet():
+    async def run():
+        protocol = Protocol(REMOTE_ADDR)
+        protocol.latency = latency = StageLatency()
+        before = time.perf_counter()
+        for i in range(3):
+            if i == 1:
+                first_received = time.perf_counter()
+            payload = samples.wll_broadcast_payload()
+            # arrives out of order
+            payload["ts"] -= i
+            protocol.datagram_received(
+                json.dumps(payload).encode(), (REMOTE_ADDR, 22222)
+            )
+
+        conditions = await protocol.queue_get()
+        assert conditions.received_at is not None
+        assert before <= conditions.received_at <= first_received
+        assert latency.stages["parsed"].count == 3
+        assert latency.stages["read"].count == 1
+
+    asyncio.run(run())
+
+
+def test_protocol_keeps_recent_parse_errors():
+    async def run():
+        protocol = Protocol(REMOTE_ADDR)
+        for _ in range(100):
+            protocol.datagram_received(b"{not json", (REMOTE_ADDR, 22222))
+        protocol.datagram_received(b'{"did": "x"}', (REMOTE_ADDR, 22222))
+
+        assert protocol.packets.count == 101
+        # a bounded ring buffer, the most recent error comes last
+        assert len(protocol.parse_errors) == RECENT_EVENTS
+        assert protocol.parse_errors[0].name == "json"
+        assert protocol.parse_errors[-1].name == "conditions"
+
+    asyncio.run(run())
+
+
+def test_protocol_connection_lost_fails_read():
+    async def run():
+        protocol = Protocol(REMOTE_ADDR)
+        reader = asyncio.create_task(protocol.queue_get())
+        await asyncio.sleep(0)
+
+        protocol.connection_lost(OSError("network down"))
+        with pytest.raises(OSError):
+            await reader
+        # later reads fail right away
+        with pytest.raises(OSError):
+            await protocol.queue_get()
+
+    asyncio.run(run())
+
+
+def test_protocol_delivers_pending_before_connection_lost():
+    async def run():
+        protocol = Protocol(REMOTE_ADDR)
+        protocol.datagram_received(
+            samples.wll_broadcast_datagram(), (REMOTE_ADDR, 22222)
+        )
+        protocol.connection_lost(None)
+
+        assert await protocol.queue_get()
+        with pytest.raises(RuntimeError):
+            await protocol.queue_get()
+
+    asyncio.run(run())
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _send_from(source_addr: str, port: int, data: bytes) -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((source_addr, 0))
+        sock.sendto(data, ("127.0.0.1", port))
+
+
+def test_hub_shares_port_between_devices():
+    async def run():
+        hub = BroadcastHub()
+        port = _free_udp_port()
+        did = samples.wll_broadcast_payload()["did"]
+        first = await Protocol.open("127.0.0.1", addr="127.0.0.1", port=port, hub=hub)
+        second = await Protocol.open(
+            "127.0.0.2", addr="127.0.0.1", port=port, hub=hub, did="other"
+        )
+        assert len(hub.endpoints) == 1
+        endpoint = hub.endpoints[0]
+
+        _send_from("127.0.0.1", port, samples.wll_broadcast_datagram())
+        assert (await asyncio.wait_for(first.queue_get(), 5)).did == did
+
+        # the device behind the second address isn't the expected one
+        _send_from("127.0.0.2", port, samples.wll_broadcast_datagram())
+        # nobody registered for this address
+        _send_from("127.0.0.3", port, b"not even json")
+        while endpoint.rejected + second.rejected < 2:
+            await asyncio.sleep(0.01)
+        assert endpoint.rejected == 1
+        assert second.rejected == 1
+        assert second.mailbox.get_nowait() is None
+
+        await first.close()
+        assert len(hub.endpoints) == 1
+        await second.close()
+        assert hub.endpoints == []
+
+        # the port can be reused right away
+        third = await Protocol.open("127.0.0.1", addr="127.0.0.1", port=port, hub=hub)
+        await third.close()
+
+    asyncio.run(run())
+
+
+class _FlakyRest:
+    """Stand-in for `WeatherLinkRest` whose `real_time` fails for the first few calls."""
+
+    def __init__(self, failures: int, duration: float) -> None:
+        self.calls = 0
+        self.failures = failures
+        self.duration = duration
+
+    async def real_time(self, *, duration: timedelta) -> RealTimeBroadcastResponse:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("device busy")
+
+        resp = RealTimeBroadcastResponse(broadcast_port=22222, duration=self.duration)
+        resp.addr = f"192.0.2.{self.calls}"
+        return resp
+
+
+def test_renewer_retries_in_background(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(broadcast, "RENEW_RETRY_MIN", 0.001)
+
+    async def run():
+        rest = _FlakyRest(failures=0, duration=0.02)
+        renewer = await BroadcastRenewer.init(rest, duration=timedelta(hours=1))  # type: ignore[arg-type]
+        assert renewer.remote_addr == "192.0.2.1"
+
+        # the next two renewals fail
+        rest.failures = 3
+        renewed = asyncio.Event()
+        task = asyncio.create_task(renewer.run(renewed.set))
+        await asyncio.wait_for(renewed.wait(), timeout=5)
+        task.cancel()
+
+        assert renewer.remote_addr == "192.0.2.4"
+        assert renewer.renew_count == 2
+        assert renewer.failure_count == 2
+        assert isinstance(renewer.last_error, OSError)
+        assert renewer.last_latency is not None
+
+    asyncio.run(run())
+
+
+class _HangingRest(_FlakyRest):
+    """`real_time` hangs once the first renewal is done."""
+
+    def __init__(self) -> None:
+        super().__init__(failures=0, duration=0.01)
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    @override
+    async def real_time(self, *, duration: timedelta) -> RealTimeBroadcastResponse:
+        if self.calls == 0:
+            return await super().real_time(duration=duration)
+
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        raise AssertionError("unreachable")
+
+
+def test_stop_waits_for_the_renewal():
+    async def run():
+        rest = _HangingRest()
+        renewer = await BroadcastRenewer.init(rest, duration=timedelta(hours=1))  # type: ignore[arg-type]
+        bc = WeatherLinkBroadcast(Protocol(REMOTE_ADDR), renewer)
+        await asyncio.wait_for(rest.started.wait(), timeout=5)
+
+        await bc.stop()
+        assert rest.cancelled
+
+    asyncio.run(run())
+
+
+def test_read_overhead_benchmark():
+    packets = 10_000
+    msg = _broadcast()
+
+    async def replay(put, get) -> float:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(packets):
+            # the packet arrives while the reader is waiting, just like a real broadcast
+            loop.call_soon(put, msg)
+            await get()
+        return (loop.time() - start) / packets
+
+    async def queue_with_task() -> float:
+        # the Queue + Task + asyncio.wait read used before the mailbox
+        queue: asyncio.Queue[CurrentConditions] = asyncio.Queue(16)
+        conn_lost = asyncio.get_running_loop().create_future()
+
+        async def get():
+            try:
+                return queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            queue_get = asyncio.create_task(queue.get())
+            await asyncio.wait(
+                {conn_lost, queue_get}, return_when=asyncio.FIRST_COMPLETED
+            )
+            return await queue_get
+
+        return await replay(queue.put_nowait, get)
+
+    async def mailbox() -> float:
+        protocol = Protocol(REMOTE_ADDR)
+        per_packet = await replay(protocol.mailbox.put, protocol.queue_get)
+        # a waiting reader gets every packet on its own
+        assert protocol.mailbox.merged == 0
+        assert protocol.mailbox.dropped == 0
+
+        # while the reader is behind, a burst collapses into a single read
+        for _ in range(100):
+            protocol.mailbox.put(msg)
+        assert isinstance(await protocol.queue_get(), CurrentConditions)
+        assert protocol.mailbox.merged == 99
+        assert protocol.mailbox.get_nowait() is None
+        return per_packet
+
+    report(
+        "broadcast read (10k packets)",
+        queue_task=asyncio.run(queue_with_task()),
+        mailbox=asyncio.run(mailbox()),
+    )
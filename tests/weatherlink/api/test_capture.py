@@ -0,0 +1,211 @@
+import asyncio
+import errno
+import io
+import json
+import time
+from pathlib import Path
+
+import aiohttp
+import pytest
+from weatherlink.api import WeatherLinkBroadcast, WeatherLinkRest, capture
+from weatherlink.api.broadcast import BroadcastHub
+from weatherlink.api.capture import (
+    CaptureRecord,
+    CaptureWriter,
+    RecordKind,
+    read_capture,
+    replay,
+)
+from weatherlink.api.conditions import IssCondition
+
+from ..benchmark import measure, report
+from ..simulator import run_stations
+from . import samples
+
+
+def _records() -> list[CaptureRecord]:
+    return [
+        CaptureRecord(
+            RecordKind.Response,
+            1000.0,
+            json.dumps(samples.wll_current_conditions_body()).encode(),
+        ),
+        CaptureRecord(
+            RecordKind.Datagram,
+            1002.5,
+            json.dumps(samples.wll_broadcast_payload()).encode(),
+        ),
+        CaptureRecord(RecordKind.Datagram, 1005.0, b"garbage"),
+    ]
+
+
+def test_round_trip(tmp_path: Path):
+    path = tmp_path / "device.capture"
+    records = _records()
+    writer = CaptureWriter(path)
+    for record in records:
+        writer.write(record.kind, record.payload, at=record.at)
+    writer.close()
+
+    assert list(read_capture(path)) == records
+    assert writer.record_count == 3
+    assert writer.bytes_written == path.stat().st_size
+
+    # appending keeps the existing records
+    writer = CaptureWriter(path)
+    writer.write(RecordKind.Datagram, b"{}", at=1007.5)
+    writer.close()
+    assert len(list(read_capture(path))) == 4
+
+
+def test_flush_without_closing(tmp_path: Path):
+    path = tmp_path / "device.capture"
+    writer = CaptureWriter(path)
+    try:
+        for record in _records():
+            writer.write(record.kind, record.payload, at=record.at)
+        writer.flush()
+        assert list(read_capture(path)) == _records()
+    finally:
+        writer.close()
+
+    assert writer.closed
+    with pytest.raises(ValueError):
+        writer.write(RecordKind.Datagram, b"{}")
+
+
+class _FullDisk(io.BytesIO):
+    def write(self, data) -> int:
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+
+def test_failing_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(capture, "open", lambda *_: _FullDisk(), raising=False)
+    writer = CaptureWriter(tmp_path / "device.capture")
+    try:
+        writer.write(RecordKind.Datagram, b"{}")
+        with pytest.raises(OSError, match="No space left"):
+            writer.flush()
+        assert isinstance(writer.error, OSError)
+
+        # further records are dropped instead of piling up
+        writer.write(RecordKind.Datagram, b"{}")
+        assert writer.dropped_count == 1
+        with pytest.raises(OSError):
+            writer.flush()
+    finally:
+        writer.close()
+    assert writer.record_count == 1
+
+
+def test_size_cap(tmp_path: Path):
+    path = tmp_path / "device.capture"
+    records = _records()
+    writer = CaptureWriter(path)
+    writer.write(records[0].kind, records[0].payload, at=records[0].at)
+    writer.close()
+    size = path.stat().st_size
+
+    # the existing file counts towards the cap
+    writer = CaptureWriter(path, max_bytes=size + 100)
+    for record in records[1:]:
+        writer.write(record.kind, record.payload, at=record.at)
+    writer.close()
+
+    assert writer.dropped_count == 1
+    assert list(read_capture(path)) == records[:1] + records[2:]
+    assert path.stat().st_size <= size + 100
+
+
+def test_truncated_record_is_ignored(tmp_path: Path):
+    path = tmp_path / "device.capture"
+    writer = CaptureWriter(path)
+    for record in _records():
+        writer.write(record.kind, record.payload, at=record.at)
+    writer.close()
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert len(list(read_capture(path))) == 2
+    path.write_bytes(data[: -len(b"garbage") - 5])
+    assert len(list(read_capture(path))) == 2
+
+
+def test_parse():
+    response, datagram, garbage = _records()
+    conditions = response.parse()
+    assert IssCondition in conditions
+    assert datagram.parse().did == conditions.did
+    with pytest.raises(json.JSONDecodeError):
+        garbage.parse()
+
+
+def test_replay_speed():
+    async def replayed(speed: float | None) -> tuple[int, float]:
+        start = time.perf_counter()
+        count = 0
+        async for _ in replay(_records(), speed=speed):
+            count += 1
+        return count, time.perf_counter() - start
+
+    # 5 seconds of traffic
+    count, duration = asyncio.run(replayed(100.0))
+    assert count == 3
+    assert 0.045 <= duration < 0.5
+
+    count, duration = asyncio.run(replayed(None))
+    assert count == 3
+    assert duration < 0.045
+
+
+def test_record_device_traffic(tmp_path: Path):
+    path = tmp_path / "device.capture"
+
+    async def run():
+        capture = CaptureWriter(path)
+        async with (
+            run_stations(1, broadcast_interval=0.01) as (station,),
+            aiohttp.ClientSession() as session,
+        ):
+            rest = WeatherLinkRest(session, station.base_url)
+            rest.capture = capture
+            polled = await rest.current_conditions(max_age=0)
+
+            broadcast = await WeatherLinkBroadcast.start(
+                rest, did=station.did, hub=BroadcastHub()
+            )
+            broadcast.protocol.capture = capture
+            try:
+                received = [
+                    await asyncio.wait_for(broadcast.read(), 1.0) for _ in range(3)
+                ]
+            finally:
+                await broadcast.stop()
+        capture.close()
+        return polled, received
+
+    polled, received = asyncio.run(run())
+    records = list(read_capture(path))
+    assert records[0].kind == RecordKind.Response
+    assert records[0].parse() == polled
+    datagrams = [record for record in records if record.kind == RecordKind.Datagram]
+    assert len(datagrams) >= len(received)
+    assert datagrams[0].parse().did == polled.did
+
+
+def test_benchmark_replay(tmp_path: Path):
+    path = tmp_path / "device.capture"
+    writer = CaptureWriter(path)
+    payload = json.dumps(samples.wll_broadcast_payload()).encode()
+    for index in range(1000):
+        writer.write(RecordKind.Datagram, payload, at=index * 2.5)
+    writer.close()
+
+    def read_and_parse():
+        for record in read_capture(path):
+            record.parse()
+
+    report(
+        "replay 1000 datagrams",
+        read_and_parse=measure(read_and_parse, number=3),
+    )
@@ -0,0 +1,279 @@
+import dataclasses
+import json
+import tracemalloc
+from typing import Any
+
+from weatherlink.api.conditions import (
+    AirQualityCondition,
+    ConditionRecord,
+    ConditionType,
+    CurrentConditions,
+    IssCondition,
+    LssBarCondition,
+    LssTempHumCondition,
+    MoistureCondition,
+    flatten_conditions,
+)
+from weatherlink.api.conditions.condition import field_names
+from weatherlink.api.rest import parse_from_json
+
+from ..benchmark import measure, report, report_rate
+from . import samples
+
+
+def _wll_conditions() -> CurrentConditions:
+    return parse_from_json(
+        CurrentConditions, samples.wll_current_conditions_body(), strict=True
+    )
+
+
+def test_lookup_by_class():
+    data = _wll_conditions()
+    for cls in (IssCondition, MoistureCondition, LssBarCondition, LssTempHumCondition):
+        assert isinstance(data[cls], cls)
+        assert cls in data
+        assert data.get(cls) is data[cls]
+
+    assert AirQualityCondition not in data
+    assert data.get(AirQualityCondition) is None
+
+
+def test_lookup_by_base_class():
+    data = _wll_conditions()
+    assert ConditionRecord in data
+    assert data[ConditionRecord] is data.conditions[0]
+
+
+def test_lookup_by_condition_type():
+    data = _wll_conditions()
+    assert data.get_by_type(ConditionType.Iss) is data[IssCondition]
+    assert data.get_by_type(ConditionType.LssBar) is data[LssBarCondition]
+    assert data.get_by_type(ConditionType.AirQuality) is None
+
+
+def test_index_follows_update_from():
+    data = _wll_conditions()
+    airlink = parse_from_json(
+        CurrentConditions, samples.airlink_current_conditions_body(), strict=True
+    )
+    assert AirQualityCondition not in data
+
+    data.update_from(airlink)
+    assert data[AirQualityCondition] is airlink[AirQualityCondition]
+    assert data.get_by_type(ConditionType.AirQuality) is airlink[AirQualityCondition]
+
+
+def test_lookup_benchmark():
+    data = _wll_conditions()
+
+    def scan():
+        # the linear scan used before the type index
+        return next(
+            cond for cond in data.conditions if isinstance(cond, LssTempHumCondition)
+        )
+
+    def indexed():
+        return data[LssTempHumCondition]
+
+    assert scan() is indexed()
+
+    report(
+        "CurrentConditions lookup",
+        scan=measure(scan, number=20_000),
+        indexed=measure(indexed, number=20_000),
+    )
+
+
+def _unslotted_copy(cls: type[ConditionRecord]) -> type:
+    """Build a plain (`__dict__` based) dataclass with the same fields as `cls`."""
+    return dataclasses.make_dataclass(
+        f"Unslotted{cls.__name__}",
+        [(field.name, Any) for field in dataclasses.fields(cls)],
+    )
+
+
+def _field_values(record: ConditionRecord) -> dict[str, Any]:
+    return {
+        field.name: getattr(record, field.name) for field in dataclasses.fields(record)
+    }
+
+
+def test_records_are_slotted():
+    data = _wll_conditions()
+    for cond in data.conditions:
+        assert not hasattr(cond, "__dict__")
+
+
+def test_record_memory():
+    iss = _wll_conditions()[IssCondition]
+    values = _field_values(iss)
+    unslotted_cls = _unslotted_copy(IssCondition)
+
+    def allocated(factory) -> int:
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            records = [factory(**values) for _ in range(1_000)]
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(records) == 1_000
+        return after - before
+
+    slotted = allocated(IssCondition)
+    unslotted = allocated(unslotted_cls)
+    # tracemalloc counts are deterministic, unlike timings
+    assert slotted < unslotted
+
+
+def test_record_attribute_benchmark():
+    iss = _wll_conditions()[IssCondition]
+    unslotted = _unslotted_copy(IssCondition)(**_field_values(iss))
+
+    report(
+        "IssCondition attribute access",
+        slotted=measure(lambda: iss.wind_speed_avg_last_2_min, number=100_000),
+        unslotted=measure(lambda: unslotted.wind_speed_avg_last_2_min, number=100_000),
+    )
+
+
+def test_update_from_broadcast_subset():
+    data = _wll_conditions()
+    broadcast = CurrentConditions.from_json(samples.wll_broadcast_payload())
+    iss = data[IssCondition]
+    temp = iss.temp
+
+    data.update_from(broadcast)
+    assert iss.wind_dir_last == 20
+    assert iss.wind_speed_last == broadcast[IssCondition].wind_speed_last
+    # not part of the broadcast
+    assert iss.temp == temp
+    assert iss.wind_speed_avg_last_2_min is not None
+
+
+def test_update_from_reports_changes():
+    data = _wll_conditions()
+    changes = data.update_from(
+        CurrentConditions.from_json(samples.wll_broadcast_payload())
+    )
+    assert changes == {IssCondition: ["wind_speed_last", "wind_dir_last"]}
+
+    # the same packet again doesn't change anything
+    changes = data.update_from(
+        CurrentConditions.from_json(samples.wll_broadcast_payload())
+    )
+    assert changes == {}
+
+
+def test_update_from_reports_new_records():
+    data = _wll_conditions()
+    airlink = parse_from_json(
+        CurrentConditions, samples.airlink_current_conditions_body(), strict=True
+    )
+    changes = data.update_from(airlink)
+    assert list(changes) == [AirQualityCondition]
+    assert "pm_2p5" in changes[AirQualityCondition]
+
+
+def test_changes_to():
+    data = _wll_conditions()
+    assert data.changes_to(_wll_conditions()) == {}
+
+    body = samples.wll_current_conditions_body()
+    conditions = body["data"]["conditions"]
+    conditions[0]["temp"] = None
+    conditions[3]["bar_trend"] = 0.01
+    # drop the LSS temp/hum record
+    del conditions[2]
+    changes = data.changes_to(parse_from_json(CurrentConditions, body))
+    assert changes == {
+        IssCondition: ["temp"],
+        LssBarCondition: ["bar_trend"],
+        LssTempHumCondition: field_names(LssTempHumCondition),
+    }
+
+
+def test_update_from_does_not_allocate():
+    iss = _wll_conditions()[IssCondition]
+    live = CurrentConditions.from_json(samples.wll_broadcast_payload())[IssCondition]
+    iss.update_from(live)  # warm up the field name cache
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        iss.update_from(live)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # only the loop iterator, no per-field or per-call dict (asdict peaks at ~3 kB)
+    assert peak - before < 100
+
+
+def test_update_from_benchmark():
+    iss = _wll_conditions()[IssCondition]
+    live = CurrentConditions.from_json(samples.wll_broadcast_payload())[IssCondition]
+
+    def update_from_asdict():
+        # the merge used before the field names were cached
+        for key, value in dataclasses.asdict(live).items():
+            if value is None:
+                continue
+            setattr(iss, key, value)
+
+    # both merges leave the record in the same state
+    expected = _wll_conditions()[IssCondition]
+    expected.update_from(live)
+    update_from_asdict()
+    assert iss == expected
+
+    cached_time = measure(lambda: iss.update_from(live), number=5_000)
+    report(
+        "IssCondition.update_from",
+        asdict=measure(update_from_asdict, number=5_000),
+        cached=cached_time,
+    )
+    report_rate("IssCondition.update_from", "merges", cached_time)
+
+
+def test_merge_benchmark():
+    data = _wll_conditions()
+    live = CurrentConditions.from_json(samples.wll_broadcast_payload())
+    wll_conditions = samples.wll_current_conditions_body()["data"]["conditions"]
+    broadcast_conditions = samples.wll_broadcast_payload()["conditions"]
+
+    report(
+        "flatten_conditions",
+        rest_wll=measure(lambda: flatten_conditions(wll_conditions), number=5_000),
+        broadcast=measure(
+            lambda: flatten_conditions(broadcast_conditions), number=5_000
+        ),
+    )
+    report(
+        "CurrentConditions.update_from",
+        broadcast=measure(lambda: data.update_from(live), number=5_000),
+    )
+
+
+def test_raw_conditions_can_be_parsed_again():
+    for body in (
+        samples.wll_current_conditions_body(),
+        samples.airlink_current_conditions_body(),
+    ):
+        conditions = parse_from_json(CurrentConditions, body, strict=True)
+        assert conditions.raw is not None
+        # what the coordinator persists for the next startup
+        stored = json.loads(json.dumps(conditions.raw))
+        assert CurrentConditions.from_json(stored, strict=True) == conditions
+
+
+def test_restore_benchmark():
+    conditions = _wll_conditions()
+    stored = json.dumps(conditions.raw)
+
+    def restore() -> CurrentConditions:
+        return CurrentConditions.from_json(json.loads(stored))
+
+    assert restore() == conditions
+    report("restore stored conditions", restore=measure(restore, number=2_000))
@@ -0,0 +1,187 @@
+import dataclasses
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import pytest
+from weatherlink.api import from_json
+from weatherlink.api.conditions import CurrentConditions, IssCondition
+from weatherlink.api.conditions.condition import STRUCTURE_TYPE_KEY, ReceiverState
+from weatherlink.api.conditions.iss import CollectorSize
+from weatherlink.api.from_json import compile_decoder
+from weatherlink.api.rest import parse_from_json
+
+from ..benchmark import measure, report
+from . import samples
+
+
+@dataclasses.dataclass()
+class _Record:
+    a: float
+    b: int | None = None
+    extra: dict | None = None
+
+
+_decode = compile_decoder(
+    _Record,
+    converters={"a": lambda value: value * 2},
+    aliases={"b": ("b_old", "b_older")},
+)
+
+
+def test_decoder_converts_fields():
+    assert _decode({"a": 1.5, "b": 3}) == _Record(a=3.0, b=3)
+    assert _decode({"a": None}) == _Record(a=None)  # type: ignore[arg-type]
+
+
+def test_decoder_aliases():
+    assert _decode({"a": 1, "b_older": 2}).b == 2
+    assert _decode({"a": 1, "b_old": 1, "b_older": 2}).b == 1
+    # the field's own key always wins
+    assert _decode({"a": 1, "b_old": 1, "b": 3}).b == 3
+    assert _decode({"a": 1, "b": 3, "b_old": 1}).b == 3
+
+
+def test_decoder_collects_unknown_keys():
+    record = _decode({"a": 1, "new_firmware_key": 5})
+    assert record.extra == {"new_firmware_key": 5}
+
+    with pytest.raises(TypeError):
+        _decode({"a": 1, "new_firmware_key": 5}, strict=True)
+
+
+def test_decoder_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        compile_decoder(_Record, converters={"c": int})
+
+
+def test_unknown_condition_keys():
+    payload = samples.wll_broadcast_payload()
+    payload["conditions"][0]["wind_gust_3_sec"] = 7.0
+
+    data = CurrentConditions.from_json(payload)
+    assert data[IssCondition].extra == {"wind_gust_3_sec": 7.0}
+
+
+def test_parse_benchmark():
+    rest_wll = samples.wll_current_conditions_body()
+    rest_airlink = samples.airlink_current_conditions_body()
+    broadcast = samples.wll_broadcast_payload()
+
+    report(
+        "CurrentConditions.from_json",
+        rest_wll=measure(
+            lambda: parse_from_json(CurrentConditions, rest_wll), number=2_000
+        ),
+        rest_airlink=measure(
+            lambda: parse_from_json(CurrentConditions, rest_airlink), number=2_000
+        ),
+        broadcast=measure(lambda: CurrentConditions.from_json(broadcast), number=2_000),
+    )
+    # the decoders leave the payloads alone, so timing them over and over is fair
+    assert rest_wll == samples.wll_current_conditions_body()
+    assert broadcast == samples.wll_broadcast_payload()
+
+
+def _apply_converters(d: dict[str, Any], **converters: Callable[[Any], Any]) -> None:
+    for key, converter in converters.items():
+        value = d.get(key)
+        if value is not None:
+            d[key] = converter(value)
+
+
+def _iss_from_json_chain(data: dict[str, Any]) -> IssCondition:
+    """The converter chain `IssCondition` used before the compiled decoder.
+
+    Mutates `data` like the original did.
+    """
+    del data[STRUCTURE_TYPE_KEY]
+    collector = CollectorSize(data["rain_size"])
+    data["rain_size"] = collector
+    aliases = {
+        "rainfall_last_15_min": "rain_15_min",
+        "rainfall_last_60_min": "rain_60_min",
+        "rainfall_last_24_hr": "rain_24_hr",
+    }
+    for key, alias in aliases.items():
+        if key not in data and alias in data:
+            data[key] = data[alias]
+    for alias in aliases.values():
+        data.pop(alias, None)
+    for key in (
+        "rain_rate_last",
+        "rain_rate_hi",
+        "rainfall_last_15_min",
+        "rain_rate_hi_last_15_min",
+        "rainfall_last_60_min",
+        "rainfall_last_24_hr",
+        "rain_storm",
+        "rainfall_daily",
+        "rainfall_monthly",
+        "rainfall_year",
+        "rain_storm_last",
+    ):
+        counts = data.get(key)
+        data[f"{key}_counts"] = counts
+        if counts:
+            data[key] = collector.to_mm(counts)
+    _apply_converters(data, rx_state=ReceiverState)
+    _apply_converters(
+        data,
+        **dict.fromkeys(
+            (
+                "temp",
+                "dew_point",
+                "wet_bulb",
+                "heat_index",
+                "wind_chill",
+                "thw_index",
+                "thsw_index",
+            ),
+            from_json.fahrenheit_to_celsius,
+        ),
+    )
+    _apply_converters(
+        data,
+        **dict.fromkeys(
+            (
+                "rain_storm_start_at",
+                "rain_storm_last_start_at",
+                "rain_storm_last_end_at",
+            ),
+            datetime.fromtimestamp,
+        ),
+    )
+    _apply_converters(
+        data,
+        **dict.fromkeys(
+            (
+                "wind_speed_last",
+                "wind_speed_avg_last_1_min",
+                "wind_speed_avg_last_2_min",
+                "wind_speed_hi_last_2_min",
+                "wind_speed_avg_last_10_min",
+                "wind_speed_hi_last_10_min",
+            ),
+            from_json.mph_to_kph,
+        ),
+    )
+    return IssCondition(**data)
+
+
+def test_iss_decoder_benchmark():
+    payload = samples.wll_current_conditions_body()["data"]["conditions"][0]
+    assert _iss_from_json_chain(dict(payload)) == IssCondition.from_json(payload)
+
+    number, repeat = 2_000, 5
+    # the chain mutates its input, every call gets a copy made up front
+    copies = iter([dict(payload) for _ in range(number * repeat)])
+    report(
+        "IssCondition.from_json",
+        chain=measure(
+            lambda: _iss_from_json_chain(next(copies)), number=number, repeat=repeat
+        ),
+        compiled=measure(
+            lambda: IssCondition.from_json(payload), number=number, repeat=repeat
+        ),
+    )
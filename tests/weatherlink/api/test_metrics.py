@@ -0,0 +1,114 @@
+import time
+import tracemalloc
+
+import pytest
+from weatherlink.api.metrics import CpuMeter, Histogram, RateMeter, StageLatency
+
+from ..benchmark import measure, report
+
+
+def test_histogram_buckets():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for value in (0.0005, 0.001, 0.005, 0.05, 0.05, 3.0):
+        histogram.observe(value)
+
+    # bounds are inclusive
+    assert histogram.counts == [2, 1, 2, 1]
+    assert histogram.count == 6
+    assert histogram.max == 3.0
+    assert histogram.mean == pytest.approx(3.1065 / 6)
+
+    assert histogram.quantile(0.3) == 0.001
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.8) == 0.1
+    assert histogram.quantile(1.0) == 3.0
+
+    data = histogram.as_dict()
+    assert data["buckets"] == {"le_0.001": 2, "le_0.01": 1, "le_0.1": 2, "inf": 1}
+
+
+def test_histogram_quantile_is_capped_by_max():
+    histogram = Histogram((1.0, 10.0))
+    histogram.observe(2.0)
+    assert histogram.quantile(0.5) == 2.0
+    assert Histogram().quantile(0.5) is None
+    assert Histogram().mean is None
+
+
+def test_rate_meter():
+    meter = RateMeter(window=10.0)
+    assert meter.rate(0.0) == 0.0
+    for i in range(25):
+        meter.mark(i * 0.5)
+    assert meter.count == 25
+    # the first window (0 s to 10 s) held 20 packets
+    assert meter.rate(12.0) == pytest.approx(2.0)
+    # nothing arrived for a while
+    assert meter.rate(50.0) == pytest.approx(5 / 40)
+
+
+def test_stage_latency():
+    latency = StageLatency()
+    received_at = time.perf_counter() - 0.01
+    latency.observe("parsed", received_at)
+    latency.observe("written", received_at)
+
+    assert list(latency.stages) == ["parsed", "written"]
+    assert latency.stages["parsed"].max >= 0.01
+    assert latency.stages["written"].max >= latency.stages["parsed"].max
+    assert latency.as_dict()["written"]["count"] == 1
+
+
+def test_cpu_meter():
+    meter = CpuMeter(window=10.0)
+    assert meter.utilization(0.0) == 0.0
+
+    meter.add(0.5, 0.0)
+    meter.add(1.5, 5.0)
+    assert meter.count == 2
+    assert meter.total == 2.0
+    assert meter.max == 1.5
+    # the first window isn't complete yet
+    assert meter.utilization(5.0) == 0.0
+    assert meter.utilization(10.0) == pytest.approx(0.2)
+
+    meter.add(0.25, 10.0)
+    assert meter.utilization(15.0) == pytest.approx(0.2)
+    assert meter.utilization(20.0) == pytest.approx(0.025)
+    assert meter.as_dict()["mean"] == pytest.approx(0.75)
+
+
+def test_histogram_observe_does_not_allocate():
+    histogram = Histogram()
+    histogram.observe(0.01)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(1_000):
+            histogram.observe(0.003)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # only the float objects which are freed right away
+    assert peak - before < 200
+
+
+def test_observe_benchmark():
+    histogram = Histogram()
+    meter = RateMeter()
+    observe_time = measure(lambda: histogram.observe(0.003), number=100_000)
+    mark_time = measure(lambda: meter.mark(1.0), number=100_000)
+    cpu = CpuMeter()
+
+    def measure_cpu():
+        # what every instrumented callback pays
+        start = time.thread_time()
+        cpu.add(time.thread_time() - start)
+
+    cpu_time = measure(measure_cpu, number=100_000)
+    report(
+        "metrics",
+        histogram_observe=observe_time,
+        rate_mark=mark_time,
+        cpu_measure=cpu_time,
+    )
@@ -0,0 +1,429 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from weatherlink.api.conditions import CurrentConditions, IssCondition
+from weatherlink.api.metrics import CpuMeter
+from weatherlink.api.rest import (
+    CircuitBreaker,
+    ConditionsCache,
+    HostScheduler,
+    RequestPriority,
+    WeatherLinkRest,
+)
+
+from .samples import wll_broadcast_payload, wll_current_conditions_body
+
+
+def test_scheduler_is_shared_per_host():
+    scheduler = HostScheduler.for_base_url("http://192.0.2.20")
+    assert HostScheduler.for_base_url("http://192.0.2.20:80") is scheduler
+    assert HostScheduler.for_base_url("http://192.0.2.20:8080") is not scheduler
+    assert HostScheduler.for_base_url("http://192.0.2.21") is not scheduler
+    for url in ("http://192.0.2.20:80", "http://192.0.2.20:8080", "http://192.0.2.21"):
+        HostScheduler.release(url)
+
+    # dropped once the last client released it
+    HostScheduler.release("http://192.0.2.20")
+    assert HostScheduler.for_base_url("http://192.0.2.20") is not scheduler
+    HostScheduler.release("http://192.0.2.20")
+
+
+def test_close_releases_shared_state():
+    first = WeatherLinkRest(None, "http://192.0.2.22")  # type: ignore[arg-type]
+    second = WeatherLinkRest(None, "http://192.0.2.22")  # type: ignore[arg-type]
+    assert second.scheduler is first.scheduler
+    assert second.cache is first.cache
+
+    first.close()
+    first.close()  # closing twice doesn't release twice
+    third = WeatherLinkRest(None, "http://192.0.2.22")  # type: ignore[arg-type]
+    assert third.cache is second.cache
+
+    second.close()
+    third.close()
+    assert ("192.0.2.22", 80) not in HostScheduler._REGISTRY
+    assert ("192.0.2.22", 80) not in ConditionsCache._REGISTRY
+
+
+def test_scheduler_serves_by_priority():
+    async def run():
+        scheduler = HostScheduler()
+        order: list[str] = []
+
+        async def request(name: str, priority: RequestPriority) -> None:
+            async with scheduler.turn(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(request("first", RequestPriority.Poll))
+        await asyncio.sleep(0)
+        others = [
+            asyncio.create_task(request("discovery", RequestPriority.Discovery)),
+            asyncio.create_task(request("poll", RequestPriority.Poll)),
+            asyncio.create_task(request("renewal", RequestPriority.Renewal)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 3
+
+        await asyncio.gather(first, *others)
+        assert order == ["first", "renewal", "poll", "discovery"]
+        assert scheduler.request_count == 4
+        assert scheduler.queue_depth == 0
+        assert scheduler.wait_time_max >= 0.03
+
+    asyncio.run(run())
+
+
+def test_scheduler_survives_cancelled_waiters():
+    async def run():
+        scheduler = HostScheduler()
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.turn(RequestPriority.Poll):
+                await release.wait()
+
+        async def request() -> None:
+            async with scheduler.turn(RequestPriority.Poll):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(request())
+        waiting = asyncio.create_task(request())
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        release.set()
+        await holder
+        await asyncio.wait_for(waiting, 1)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        # the device is free again
+        await asyncio.wait_for(request(), 1)
+
+    asyncio.run(run())
+
+
+def test_cache_coalesces_concurrent_requests():
+    async def run():
+        cache = ConditionsCache()
+        calls = 0
+
+        async def fetch(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return CurrentConditions.from_json(wll_current_conditions_body()["data"])
+
+        results = await asyncio.gather(*(cache.get(fetch, max_age=0) for _ in range(5)))
+        assert calls == 1
+        assert all(result == results[0] for result in results)
+        assert (cache.misses, cache.coalesced, cache.hits) == (1, 4, 0)
+
+        # fresh enough to be served from the cache
+        assert await cache.get(fetch, max_age=60) == results[0]
+        assert (calls, cache.hits) == (1, 1)
+
+        # max_age=0 forces a new request
+        await cache.get(fetch, max_age=0)
+        assert calls == 2
+
+    asyncio.run(run())
+
+
+def test_cache_hands_out_copies():
+    async def run():
+        cache = ConditionsCache()
+
+        async def fetch(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            return CurrentConditions.from_json(wll_current_conditions_body()["data"])
+
+        first, second = await asyncio.gather(
+            cache.get(fetch, max_age=60), cache.get(fetch, max_age=60)
+        )
+        cached = await cache.get(fetch, max_age=60)
+        assert first is not second
+        assert cached is not first
+
+        # merging a broadcast into one copy doesn't touch the others
+        first.update_from(CurrentConditions.from_json(wll_broadcast_payload()))
+        assert first[IssCondition].wind_dir_last == 20
+        assert second[IssCondition].wind_dir_last != 20
+        assert cached[IssCondition].wind_dir_last != 20
+        assert await cache.get(fetch, max_age=60) == second
+
+    asyncio.run(run())
+
+
+def test_cache_shares_errors_and_survives_cancellation():
+    async def run():
+        cache = ConditionsCache()
+        release = asyncio.Event()
+
+        async def fail(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            await release.wait()
+            raise RuntimeError("device unreachable")
+
+        cancelled = asyncio.create_task(cache.get(fail, max_age=0))
+        waiting = asyncio.create_task(cache.get(fail, max_age=0))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            await waiting
+        assert cancelled.cancelled()
+
+        # errors aren't cached
+        async def succeed(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            return CurrentConditions.from_json(wll_current_conditions_body()["data"])
+
+        assert await cache.get(succeed, max_age=60) == await cache.get(
+            succeed, max_age=60
+        )
+        assert (cache.misses, cache.hits) == (2, 1)
+
+    asyncio.run(run())
+
+
+def test_cache_serves_joined_callers_at_their_priority():
+    async def run():
+        scheduler = HostScheduler()
+        cache = ConditionsCache()
+        order: list[str] = []
+
+        async def fetch(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            async with scheduler.turn(priority):
+                order.append("shared")
+            return CurrentConditions.from_json(wll_current_conditions_body()["data"])
+
+        async def poll() -> None:
+            async with scheduler.turn(RequestPriority.Poll):
+                order.append("poll")
+
+        async with scheduler.turn(RequestPriority.Poll):
+            discovery = asyncio.create_task(
+                cache.get(
+                    fetch,
+                    max_age=0,
+                    priority=RequestPriority.Discovery,
+                    scheduler=scheduler,
+                )
+            )
+            other = asyncio.create_task(poll())
+            await asyncio.sleep(0.01)
+            assert scheduler.queue_depth == 2
+
+            # a renewal joining the discovery request mustn't wait behind the poll
+            renewal = asyncio.create_task(
+                cache.get(
+                    fetch,
+                    max_age=0,
+                    priority=RequestPriority.Renewal,
+                    scheduler=scheduler,
+                )
+            )
+            await asyncio.sleep(0)
+
+        await asyncio.gather(discovery, other, renewal)
+        assert order == ["shared", "poll"]
+        assert cache.coalesced == 1
+
+    asyncio.run(run())
+
+
+def test_cache_retries_for_callers_with_a_later_deadline():
+    async def run():
+        cache = ConditionsCache()
+        calls = 0
+
+        async def fetch(
+            priority: RequestPriority, timeout: float | None
+        ) -> CurrentConditions:
+            nonlocal calls
+            calls += 1
+            async with asyncio.timeout(timeout):
+                await asyncio.sleep(0.1)
+            return CurrentConditions.from_json(wll_current_conditions_body()["data"])
+
+        async def get(timeout: float | None) -> CurrentConditions:
+            async with asyncio.timeout(timeout):
+                return await cache.get(fetch, max_age=0, timeout=timeout)
+
+        impatient = asyncio.create_task(get(0.05))
+        await asyncio.sleep(0)
+        patient = asyncio.create_task(get(5.0))
+
+        with pytest.raises(TimeoutError):
+            await impatient
+        assert isinstance(await patient, CurrentConditions)
+        assert calls == 2
+
+    asyncio.run(run())
+
+
+def test_circuit_breaker_backs_off_and_recovers():
+    breaker = CircuitBreaker(threshold=3, base_delay=1.0, max_delay=4.0)
+    delays = [breaker.record_failure() for _ in range(5)]
+    # exponential with jitter, never below half of the nominal delay
+    for delay, nominal in zip(delays, (1.0, 2.0, 4.0, 4.0, 4.0), strict=True):
+        assert nominal / 2 <= delay <= nominal
+
+    assert breaker.is_open
+    assert breaker.open_count == 1
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert breaker.retry_in == 0.0
+
+
+def test_request_deadline_frees_the_host():
+    class _HangingSession:
+        def get(self, url: str, **kwargs):
+            return self
+
+        async def __aenter__(self):
+            await asyncio.Event().wait()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    async def run():
+        rest = WeatherLinkRest(_HangingSession(), "http://192.0.2.30")  # type: ignore[arg-type]
+        with pytest.raises(TimeoutError):
+            await rest.current_conditions(timeout=0.05)
+
+        # the hung request must not keep the device busy
+        assert rest.scheduler.queue_depth == 0
+        async with asyncio.timeout(0.1), rest.scheduler.turn(RequestPriority.Poll):
+            pass
+
+        assert rest.error_count == 1
+        assert rest.recent_requests[-1].error == "TimeoutError()"
+
+    asyncio.run(run())
+
+
+def test_request_metrics():
+    body = json.dumps(wll_current_conditions_body()).encode()
+
+    class _Response:
+        async def read(self) -> bytes:
+            return body
+
+    class _StaticSession:
+        def get(self, url: str, **kwargs):
+            return self
+
+        async def __aenter__(self):
+            return _Response()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    async def run():
+        rest = WeatherLinkRest(_StaticSession(), "http://192.0.2.31")  # type: ignore[arg-type]
+        await rest.current_conditions(max_age=0)
+        assert rest.parse_cpu is None
+        rest.parse_cpu = CpuMeter()
+        await rest.current_conditions(max_age=0)
+
+        assert rest.request_count == 2
+        assert rest.error_count == 0
+        assert rest.bytes_received == 2 * len(body)
+        for histogram in (rest.wait_time, rest.request_time, rest.parse_time):
+            assert histogram.count == 2
+        assert rest.parse_cpu.count == 1
+        assert [event.name for event in rest.recent_requests] == [
+            "/v1/current_conditions"
+        ] * 2
+        assert all(event.error is None for event in rest.recent_requests)
+
+    asyncio.run(run())
+
+
+def test_hung_renewal_frees_the_host():
+    body = json.dumps(wll_current_conditions_body()).encode()
+
+    class _Response:
+        async def read(self) -> bytes:
+            return body
+
+    class _Session:
+        def get(self, url: str, **kwargs):
+            return self if url.endswith("/v1/real_time") else _Answer()
+
+        async def __aenter__(self):
+            # the device never answers the renewal
+            await asyncio.Event().wait()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    class _Answer:
+        async def __aenter__(self):
+            return _Response()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    async def run():
+        rest = WeatherLinkRest(_Session(), "http://192.0.2.32")  # type: ignore[arg-type]
+        renewal = asyncio.create_task(
+            rest.real_time(duration=timedelta(hours=1), timeout=0.05)
+        )
+        await asyncio.sleep(0)
+        # waits for the hung renewal to hit its deadline instead of forever
+        conditions = await asyncio.wait_for(rest.current_conditions(max_age=0), 1)
+        assert conditions.did == wll_current_conditions_body()["data"]["did"]
+        with pytest.raises(TimeoutError):
+            await renewal
+        rest.close()
+
+    asyncio.run(run())
+
+
+def test_real_time_resolves_the_device_address():
+    body = json.dumps(
+        {"data": {"broadcast_port": 22222, "duration": 3600}, "error": None}
+    ).encode()
+
+    class _Response:
+        async def read(self) -> bytes:
+            return body
+
+    class _StaticSession:
+        def get(self, url: str, **kwargs):
+            return self
+
+        async def __aenter__(self):
+            return _Response()
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+    async def run():
+        rest = WeatherLinkRest(_StaticSession(), "http://192.0.2.33:8080")  # type: ignore[arg-type]
+        resp = await rest.real_time(duration=timedelta(hours=1))
+        assert resp.addr == "192.0.2.33"
+        assert rest.remote_addr == "192.0.2.33"
+        assert resp.broadcast_port == 22222
+        rest.close()
+
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from weatherlink.api import WeatherLinkBroadcast, WeatherLinkRest
+from weatherlink.api.broadcast import BroadcastHub
+from weatherlink.api.conditions import AirQualityCondition, IssCondition
+
+from ..simulator import Faults, run_stations
+
+
+def test_polls_many_stations():
+    async def run():
+        async with (
+            run_stations(10) as stations,
+            aiohttp.ClientSession() as session,
+        ):
+            clients = [
+                WeatherLinkRest(session, station.base_url) for station in stations
+            ]
+
+            async def poll(rest: WeatherLinkRest) -> None:
+                for _ in range(20):
+                    conditions = await rest.current_conditions(max_age=0)
+                    assert IssCondition in conditions
+
+            # concurrent polls of the same client share requests, the device only serves one at a time
+            await asyncio.gather(*(poll(rest) for rest in clients for _ in range(3)))
+
+            for station, rest in zip(stations, clients, strict=True):
+                assert station.request_count == rest.request_count
+                assert station.overlapping_requests == 0
+
+    asyncio.run(run())
+
+
+def test_airlink_station():
+    async def run():
+        async with (
+            run_stations(1, kind="airlink") as (station,),
+            aiohttp.ClientSession() as session,
+        ):
+            conditions = await WeatherLinkRest(
+                session, station.base_url
+            ).current_conditions()
+            assert conditions.did == station.did
+            assert AirQualityCondition in conditions
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    ("faults", "error"),
+    [
+        (Faults(malformed_rate=1.0), json.JSONDecodeError),
+        (Faults(disconnect_rate=1.0), aiohttp.ClientError),
+        (Faults(latency=1.0), TimeoutError),
+    ],
+)
+def test_injected_faults(faults: Faults, error: type[Exception]):
+    async def run():
+        async with (
+            run_stations(1, faults=faults) as (station,),
+            aiohttp.ClientSession() as session,
+        ):
+            rest = WeatherLinkRest(session, station.base_url)
+            with pytest.raises(error):
+                await rest.current_conditions(timeout=0.2)
+
+            # the client recovers as soon as the device behaves again
+            station.faults = Faults()
+            await asyncio.sleep(0.05)
+            conditions = await rest.current_conditions(max_age=0, timeout=1.0)
+            assert conditions.did == station.did
+
+    asyncio.run(run())
+
+
+def test_broadcasts_at_100x_rate():
+    async def run():
+        hub = BroadcastHub()
+        async with (
+            # 100 times faster than the real device
+            run_stations(5, broadcast_interval=0.025) as stations,
+            aiohttp.ClientSession() as session,
+        ):
+            broadcasts = [
+                await WeatherLinkBroadcast.start(
+                    WeatherLinkRest(session, station.base_url),
+                    did=station.did,
+                    hub=hub,
+                )
+                for station in stations
+            ]
+            # every station shares the same socket
+            assert len(hub.endpoints) == 1
+
+            try:
+                for station, broadcast in zip(stations, broadcasts, strict=True):
+                    for _ in range(10):
+                        conditions = await asyncio.wait_for(broadcast.read(), 1.0)
+                        assert conditions.did == station.did
+                    assert broadcast.protocol.rejected == 0
+            finally:
+                for broadcast in broadcasts:
+                    await broadcast.stop()
+
+    asyncio.run(run())
+
+
+def test_malformed_broadcasts_are_skipped():
+    async def run():
+        async with (
+            run_stations(
+                1, broadcast_interval=0.01, faults=Faults(malformed_rate=0.5)
+            ) as (station,),
+            aiohttp.ClientSession() as session,
+        ):
+            # the renewal itself must succeed
+            rest = WeatherLinkRest(session, station.base_url)
+            station.faults.malformed_rate = 0.0
+            broadcast = await WeatherLinkBroadcast.start(
+                rest, did=station.did, hub=BroadcastHub()
+            )
+            station.faults.malformed_rate = 0.5
+            try:
+                for _ in range(5):
+                    conditions = await asyncio.wait_for(broadcast.read(), 1.0)
+                    assert conditions.did == station.did
+                while not broadcast.protocol.parse_errors:
+                    await asyncio.sleep(0.01)
+            finally:
+                await broadcast.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""Tiny helpers for the micro-benchmarks that live next to the regular tests.
+
+Run with `pytest -s` to see the numbers. `--benchmark-json PATH` saves every reported timing and
+`--benchmark-baseline PATH` fails the run if a timing got slower than a saved one.
+"""
+
+import dataclasses
+import json
+import platform
+import timeit
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+"""Fraction by which a timing may exceed the baseline before it counts as a regression."""
+
+RESULTS: dict[str, float] = {}
+"""Per-call timings (in seconds) reported during the session, keyed by `<name>: <timing>`."""
+
+
+def measure(fn: Callable[[], Any], *, number: int, repeat: int = 5) -> float:
+    """Return the best per-call time of `fn` in seconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def report(name: str, **timings: float) -> None:
+    """Print per-call timings (in seconds) in a single line and keep them in `RESULTS`."""
+    for key, value in timings.items():
+        RESULTS[f"{name}: {key}"] = value
+    parts = ", ".join(f"{key} {value * 1e6:.2f} µs" for key, value in timings.items())
+    print(f"[bench] {name}: {parts}")  # noqa: T201
+
+
+def report_rate(name: str, unit: str, seconds: float) -> None:
+    """Print how many calls per second a per-call time of `seconds` allows."""
+    print(f"[bench] {name}: {1 / seconds:,.0f} {unit}/s")  # noqa: T201
+
+
+def save_results(path: str | Path, results: Mapping[str, float] = RESULTS) -> None:
+    document = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": dict(sorted(results.items())),
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load_results(path: str | Path) -> dict[str, float]:
+    document = json.loads(Path(path).read_text())
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"unsupported benchmark results version in {path}")
+    return document["results"]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(
+    results: Mapping[str, float],
+    baseline: Mapping[str, float],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[Comparison]:
+    """Get the timings which are slower than the baseline by more than `tolerance`.
+
+    Timings missing from either side are ignored.
+    """
+    regressions: list[Comparison] = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current > previous * (1 + tolerance):
+            regressions.append(Comparison(name, previous, current))
+    return regressions
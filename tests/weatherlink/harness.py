@@ -0,0 +1,84 @@
+"""Run the real coordinator inside a bare Home Assistant instance.
+
+The coordinator talks to simulated stations, see `simulator`.
+"""
+
+import contextlib
+import socket
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import frame
+from weatherlink import WeatherLinkCoordinator
+from weatherlink.api import WeatherLinkRest
+from weatherlink.const import DOMAIN
+
+
+@contextlib.asynccontextmanager
+async def home_assistant(config_dir: Path) -> AsyncIterator[HomeAssistant]:
+    hass = HomeAssistant(str(config_dir))
+    frame.async_setup(hass)
+    loader.async_setup(hass)
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+def config_entry(host: str, **options: Any) -> ConfigEntry:
+    return ConfigEntry(
+        data={"host": host},
+        discovery_keys={},
+        domain=DOMAIN,
+        minor_version=1,
+        options={"listen_to_broadcasts": False, **options},
+        source="user",
+        subentries_data=None,
+        title=host,
+        unique_id=None,
+        version=1,
+    )
+
+
+@contextlib.asynccontextmanager
+async def run_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> AsyncIterator[WeatherLinkCoordinator]:
+    async with aiohttp.ClientSession() as session:
+        rest = WeatherLinkRest(session, entry.data["host"])
+        try:
+            coordinator = await WeatherLinkCoordinator.build(hass, rest, entry)
+        except BaseException:
+            rest.close()
+            raise
+
+        try:
+            yield coordinator
+        finally:
+            await coordinator.destroy()
+
+
+def unreachable_url() -> str:
+    """URL of a port nobody listens on, connecting to it fails right away."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class FakeEntity:
+    """Counts how often the coordinator writes its state."""
+
+    write_count: int
+
+    def __init__(self) -> None:
+        self.write_count = 0
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self.write_count += 1
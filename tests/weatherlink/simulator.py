@@ -0,0 +1,241 @@
+"""Local WeatherLink Live / AirLink simulator for load and latency tests.
+
+Every station serves `/v1/current_conditions` and `/v1/real_time` over HTTP on its own loopback
+address (127.0.0.N) and, once asked to, broadcasts its conditions over UDP, just like the real
+devices on a LAN. Faults (latency, disconnects and malformed JSON) can be injected per station.
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import json
+import random
+import socket
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from aiohttp import web
+
+from .api import samples
+
+type StationKind = Literal["wll", "airlink"]
+
+MALFORMED_JSON = b'{"data": {"did": '
+
+
+def free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("0.0.0.0", 0))
+        return sock.getsockname()[1]
+
+
+@dataclasses.dataclass()
+class Faults:
+    latency: float = 0.0
+    """seconds before a request is answered"""
+    disconnect_rate: float = 0.0
+    """probability of dropping the connection instead of answering a request"""
+    malformed_rate: float = 0.0
+    """probability of a response or broadcast containing malformed JSON"""
+
+
+class SimulatedStation:
+    """A single virtual device.
+
+    Like the real device it only handles one request at a time, requests arriving while it's
+    busy wait for their turn and are counted in `overlapping_requests`.
+    """
+
+    kind: StationKind
+    did: str
+    host: str
+    port: int
+    faults: Faults
+    broadcast_port: int
+    broadcast_interval: float
+    """seconds between two broadcasts, the real WLL broadcasts every 2.5 seconds"""
+
+    request_count: int
+    overlapping_requests: int
+    broadcast_count: int
+
+    _rng: random.Random
+    _busy: asyncio.Lock
+    _runner: web.AppRunner | None
+    _broadcast_until: float
+    _broadcast_task: asyncio.Task[None] | None
+    _transport: asyncio.DatagramTransport | None
+
+    def __init__(
+        self,
+        kind: StationKind,
+        did: str,
+        host: str,
+        *,
+        broadcast_port: int,
+        broadcast_interval: float = 2.5,
+        faults: Faults | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.kind = kind
+        self.did = did
+        self.host = host
+        self.port = 0
+        self.faults = faults or Faults()
+        self.broadcast_port = broadcast_port
+        self.broadcast_interval = broadcast_interval
+
+        self.request_count = 0
+        self.overlapping_requests = 0
+        self.broadcast_count = 0
+
+        self._rng = random.Random(seed)
+        self._busy = asyncio.Lock()
+        self._runner = None
+        self._broadcast_until = 0.0
+        self._broadcast_task = None
+        self._transport = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/v1/current_conditions", self.__handle_current_conditions)
+        app.router.add_get("/v1/real_time", self.__handle_real_time)
+        self._runner = runner = web.AppRunner(app, handle_signals=False)
+        await runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        await web.SockSite(runner, sock).start()
+
+    async def stop(self) -> None:
+        if self._broadcast_task is not None:
+            self._broadcast_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._broadcast_task
+        if self._transport is not None:
+            self._transport.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def conditions_body(self) -> dict[str, Any]:
+        if self.kind == "airlink":
+            body = samples.airlink_current_conditions_body()
+        else:
+            body = samples.wll_current_conditions_body()
+
+        data = body["data"]
+        data["did"] = self.did
+        data["ts"] = int(time.time())
+        return body
+
+    def broadcast_payload(self) -> dict[str, Any]:
+        payload = samples.wll_broadcast_payload()
+        payload["did"] = self.did
+        payload["ts"] = int(time.time())
+        iss = payload["conditions"][0]
+        iss["wind_speed_last"] = round(self._rng.uniform(0, 30), 1)
+        iss["wind_dir_last"] = self._rng.randrange(360)
+        return payload
+
+    def __malformed(self) -> bool:
+        return self._rng.random() < self.faults.malformed_rate
+
+    async def __respond(self, request: web.Request, body: Any) -> web.StreamResponse:
+        self.request_count += 1
+        if self._busy.locked():
+            self.overlapping_requests += 1
+
+        async with self._busy:
+            if self.faults.latency:
+                await asyncio.sleep(self.faults.latency)
+
+            if self._rng.random() < self.faults.disconnect_rate:
+                assert request.transport is not None
+                request.transport.close()
+                return web.Response()
+
+            payload = (
+                MALFORMED_JSON if self.__malformed() else json.dumps(body).encode()
+            )
+            return web.Response(body=payload, content_type="application/json")
+
+    async def __handle_current_conditions(
+        self, request: web.Request
+    ) -> web.StreamResponse:
+        return await self.__respond(request, self.conditions_body())
+
+    async def __handle_real_time(self, request: web.Request) -> web.StreamResponse:
+        if self.kind != "wll":
+            return await self.__respond(
+                request,
+                {"data": None, "error": {"code": 404, "message": "not supported"}},
+            )
+
+        duration = int(request.query.get("duration", "1200"))
+        self._broadcast_until = time.monotonic() + duration
+        if self._broadcast_task is None:
+            self._broadcast_task = asyncio.create_task(self.__broadcast_loop())
+
+        return await self.__respond(
+            request,
+            {
+                "data": {"broadcast_port": self.broadcast_port, "duration": duration},
+                "error": None,
+            },
+        )
+
+    async def __broadcast_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, local_addr=(self.host, 0)
+        )
+        self._transport = transport
+        try:
+            while time.monotonic() < self._broadcast_until:
+                if self.__malformed():
+                    datagram = MALFORMED_JSON
+                else:
+                    datagram = json.dumps(self.broadcast_payload()).encode()
+                transport.sendto(datagram, ("127.0.0.1", self.broadcast_port))
+                self.broadcast_count += 1
+                await asyncio.sleep(self.broadcast_interval)
+        finally:
+            self._broadcast_task = None
+
+
+@contextlib.asynccontextmanager
+async def run_stations(
+    count: int,
+    *,
+    kind: StationKind = "wll",
+    broadcast_port: int | None = None,
+    broadcast_interval: float = 2.5,
+    faults: Faults | None = None,
+) -> AsyncIterator[list[SimulatedStation]]:
+    """Run `count` stations on 127.0.0.2 and up, all broadcasting to the same port."""
+    if broadcast_port is None:
+        broadcast_port = free_udp_port()
+
+    stations = [
+        SimulatedStation(
+            kind,
+            f"SIM{index:09X}",
+            f"127.0.0.{index + 2}",
+            broadcast_port=broadcast_port,
+            broadcast_interval=broadcast_interval,
+            faults=dataclasses.replace(faults) if faults else None,
+            seed=index,
+        )
+        for index in range(count)
+    ]
+    try:
+        await asyncio.gather(*(station.start() for station in stations))
+        yield stations
+    finally:
+        await asyncio.gather(*(station.stop() for station in stations))
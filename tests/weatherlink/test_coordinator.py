@@ -0,0 +1,319 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from weatherlink import (  # noqa: E402
+    BROADCAST_POLL_INTERVAL,
+    MAX_RESTORE_AGE,
+    condition_fields,
+    get_conditions_store,
+)
+from weatherlink.api.capture import CaptureRecord, RecordKind  # noqa: E402
+from weatherlink.api.conditions import (  # noqa: E402
+    AirQualityCondition,
+    CurrentConditions,
+    IssCondition,
+    LssBarCondition,
+)
+from weatherlink.api.rest import parse_from_json  # noqa: E402
+from weatherlink.sensor_air_quality import AirQualityStatus  # noqa: E402
+from weatherlink.weather import Weather  # noqa: E402
+
+from .api import samples  # noqa: E402
+from .benchmark import report  # noqa: E402
+from .harness import (  # noqa: E402
+    FakeEntity,
+    config_entry,
+    home_assistant,
+    run_coordinator,
+    unreachable_url,
+)
+from .simulator import run_stations  # noqa: E402
+
+
+def test_condition_fields():
+    assert condition_fields(IssCondition, "temp") == {(IssCondition, "temp")}
+    # every name belongs to the first class with that field
+    assert condition_fields((IssCondition, LssBarCondition), "temp", "bar_trend") == {
+        (IssCondition, "temp"),
+        (LssBarCondition, "bar_trend"),
+    }
+    assert (LssBarCondition, "bar_sea_level") in Weather._input_fields
+    with pytest.raises(ValueError, match="bar_trend"):
+        condition_fields(IssCondition, "bar_trend")
+
+
+def test_unchanged_poll_writes_time_dependent_entities(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1) as (station,),
+            run_coordinator(hass, config_entry(station.base_url)) as coordinator,
+        ):
+            notified = 0
+
+            def listener() -> None:
+                nonlocal notified
+                notified += 1
+
+            coordinator.async_add_listener(listener)
+            temp = condition_fields(IssCondition, "temp")
+            plain, clock = FakeEntity(), FakeEntity()
+            coordinator.async_subscribe_fields(plain, temp)
+            coordinator.async_subscribe_fields(clock, temp, time_dependent=True)
+
+            # nothing changed, only the entities depending on the time are written
+            coordinator.session.cache.invalidate()
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+            assert notified == 0
+            assert (plain.write_count, clock.write_count) == (0, 1)
+
+            conditions_body = station.conditions_body
+
+            def warmer():
+                body = conditions_body()
+                body["data"]["conditions"][0]["temp"] += 1.0
+                return body
+
+            # a change notifies every listener
+            station.conditions_body = warmer  # type: ignore[method-assign]
+            coordinator.session.cache.invalidate()
+            await coordinator.async_refresh()
+            assert notified == 1
+            assert (plain.write_count, clock.write_count) == (0, 1)
+
+    asyncio.run(run())
+
+
+def test_polls_never_use_cached_conditions(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1, kind="airlink") as (station,),
+            run_coordinator(hass, config_entry(station.base_url)) as coordinator,
+        ):
+            # still fresh enough for every other caller
+            await coordinator.session.current_conditions()
+            requests = station.request_count
+            assert coordinator.session.cache.hits == 1
+
+            await coordinator.async_refresh()
+            assert station.request_count == requests + 1
+            assert len(coordinator.poller.ages) == 2
+
+    asyncio.run(run())
+
+
+def test_cpu_is_only_measured_with_latency(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1) as (station,),
+        ):
+            entry = config_entry(station.base_url)
+            async with run_coordinator(hass, entry) as coordinator:
+                await coordinator.async_refresh()
+                assert coordinator.cpu_meters() == {}
+                assert coordinator.session.parse_cpu is None
+
+            entry = config_entry(station.base_url, measure_latency=True)
+            async with run_coordinator(hass, entry) as coordinator:
+                await coordinator.async_refresh()
+                meters = coordinator.cpu_meters()
+                assert set(meters) == {
+                    "response_parse",
+                    "refresh",
+                    "notify",
+                    "entity_write",
+                }
+                assert meters["response_parse"].count >= 1
+                assert meters["refresh"].count >= 1
+
+    asyncio.run(run())
+
+
+def test_broadcast_writes_subscribed_entities(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1) as (station,),
+            run_coordinator(hass, config_entry(station.base_url)) as coordinator,
+        ):
+            wind, temp, everything = FakeEntity(), FakeEntity(), FakeEntity()
+            coordinator.async_subscribe_fields(
+                wind, condition_fields(IssCondition, "wind_speed_last")
+            )
+            coordinator.async_subscribe_fields(
+                temp, condition_fields(IssCondition, "temp")
+            )
+            coordinator.async_subscribe_fields(everything, None)
+
+            payload = samples.wll_broadcast_payload()
+            payload["did"] = station.did
+            payload["conditions"][0]["wind_dir_last"] = None
+            datagram = CaptureRecord(
+                RecordKind.Datagram, 0.0, json.dumps(payload).encode()
+            )
+            await coordinator.async_replay([datagram], speed=None)
+
+            assert coordinator.last_changes == {IssCondition: ["wind_speed_last"]}
+            assert wind.write_count == 1
+            assert temp.write_count == 0
+            assert everything.write_count == 1
+
+    asyncio.run(run())
+
+
+def test_next_poll_keeps_the_nominal_interval(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1, kind="airlink") as (station,),
+            run_coordinator(hass, config_entry(station.base_url)) as coordinator,
+        ):
+            # broadcasts arriving push the next poll far out
+            coordinator.broadcast_health.feed(hass.loop.time())
+            await coordinator.async_refresh()
+            assert coordinator.next_poll_delay == BROADCAST_POLL_INTERVAL
+            assert coordinator.update_interval == timedelta(seconds=30)
+
+            status = AirQualityStatus(coordinator)
+            report_time = datetime.now() - timedelta(seconds=45)
+            coordinator.data[AirQualityCondition].last_report_time = report_time
+            # within two nominal intervals, the delay until the next poll doesn't matter
+            assert status.native_value == "connected"
+            coordinator.poller.set_period(20.0)
+            assert status.native_value == "disconnected"
+
+    asyncio.run(run())
+
+
+def test_broadcast_packet_fires_trigger(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1) as (station,),
+            run_coordinator(
+                hass,
+                config_entry(
+                    station.base_url,
+                    listen_to_broadcasts=True,
+                    broadcast_on_events=True,
+                    trigger_wind_speed=50.0,
+                    trigger_rain_rate=1e6,
+                    trigger_bar_trend=1e6,
+                ),
+            ) as coordinator,
+        ):
+            trigger = coordinator.broadcast_trigger
+            assert trigger is not None
+            assert not trigger.active
+
+            def datagram(wind_speed: float) -> CaptureRecord:
+                payload = samples.wll_broadcast_payload()
+                payload["did"] = station.did
+                payload["conditions"][0]["wind_speed_last"] = wind_speed
+                return CaptureRecord(
+                    RecordKind.Datagram, 0.0, json.dumps(payload).encode()
+                )
+
+            await coordinator.async_replay([datagram(5.0)], speed=None)
+            assert not trigger.active
+
+            # a gust in a single packet is enough
+            await coordinator.async_replay([datagram(60.0)], speed=None)
+            assert trigger.active
+            assert trigger.triggered_by == (IssCondition, "wind_speed_last")
+
+    asyncio.run(run())
+
+
+def test_setup_from_store_while_device_is_unreachable(tmp_path: Path):
+    conditions = parse_from_json(
+        CurrentConditions, samples.wll_current_conditions_body()
+    )
+
+    async def run():
+        async with home_assistant(tmp_path) as hass:
+            entry = config_entry(unreachable_url())
+            store = get_conditions_store(hass, entry)
+
+            async def save(stored_at: float) -> None:
+                await store.async_save(
+                    {
+                        "device_type": "WeatherLink",
+                        "device_name": "Garden",
+                        "conditions": conditions.raw,
+                        "stored_at": stored_at,
+                    }
+                )
+
+            await save(time.time())
+            async with run_coordinator(hass, entry) as coordinator:
+                assert coordinator.device_name == "Garden"
+                assert coordinator.data == conditions
+                assert coordinator.last_update_success
+                # restored conditions only last until the device fails to confirm them
+                await coordinator.async_refresh()
+                assert not coordinator.last_update_success
+
+            # old conditions still set up the entities, they're unavailable until the device answers
+            await save(time.time() - MAX_RESTORE_AGE - 1)
+            async with run_coordinator(hass, entry) as coordinator:
+                assert coordinator.device_name == "Garden"
+                assert coordinator.data == conditions
+                assert not coordinator.last_update_success
+
+    asyncio.run(run())
+
+
+def test_setup_benchmark(tmp_path: Path):
+    conditions = parse_from_json(
+        CurrentConditions, samples.wll_current_conditions_body()
+    )
+
+    async def store_conditions(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        await get_conditions_store(hass, entry).async_save(
+            {
+                "device_type": "WeatherLink",
+                "device_name": "Garden",
+                "conditions": conditions.raw,
+                "stored_at": time.time(),
+            }
+        )
+
+    async def setup_time(hass: HomeAssistant, entry: ConfigEntry) -> float:
+        loop = asyncio.get_running_loop()
+        best = float("inf")
+        for _ in range(3):
+            start = loop.time()
+            async with run_coordinator(hass, entry):
+                best = min(best, loop.time() - start)
+        return best
+
+    async def run() -> dict[str, float]:
+        async with home_assistant(tmp_path) as hass, run_stations(1) as (station,):
+            live = config_entry(station.base_url)
+            reachable = config_entry(station.base_url)
+            unreachable = config_entry(unreachable_url())
+            await store_conditions(hass, reachable)
+            await store_conditions(hass, unreachable)
+
+            return {
+                # without a store setup waits for the device (and fails if it is unreachable)
+                "live": await setup_time(hass, live),
+                "stored_reachable": await setup_time(hass, reachable),
+                "stored_unreachable": await setup_time(hass, unreachable),
+            }
+
+    timings = asyncio.run(run())
+    report("coordinator setup", **timings)
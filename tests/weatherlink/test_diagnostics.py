@@ -0,0 +1,42 @@
+import asyncio
+import contextlib
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from weatherlink.const import DOMAIN  # noqa: E402
+from weatherlink.diagnostics import async_get_config_entry_diagnostics  # noqa: E402
+
+from .harness import config_entry, home_assistant, run_coordinator  # noqa: E402
+from .simulator import run_stations  # noqa: E402
+
+
+def test_diagnostics_redact_addresses(tmp_path: Path):
+    async def run():
+        async with (
+            home_assistant(tmp_path) as hass,
+            run_stations(1, broadcast_interval=0.05) as (station,),
+        ):
+            entry = config_entry(station.base_url, listen_to_broadcasts=True)
+            async with run_coordinator(hass, entry) as coordinator:
+                hass.data[DOMAIN] = {entry.entry_id: coordinator}
+                async with asyncio.timeout(5):
+                    while coordinator.broadcast is None:
+                        await asyncio.sleep(0.01)
+
+                # the error of a failed request names the host as well
+                await station.stop()
+                with contextlib.suppress(Exception):
+                    await coordinator.session.current_conditions(max_age=0)
+                assert station.host in coordinator.session.recent_requests[-1].error
+
+                diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        assert diagnostics["broadcast"]["renewer"]["remote_addr"] == "**REDACTED**"
+        dumped = json.dumps(diagnostics)
+        assert station.host not in dumped
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+"""Packet-to-state latency of the broadcasts of many simulated stations.
+
+Every station has a coordinator of its own, the packets take the same path as in Home Assistant.
+Run with `pytest -s` to see the numbers.
+"""
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from weatherlink import WeatherLinkCoordinator, condition_fields  # noqa: E402
+from weatherlink.api.conditions import IssCondition  # noqa: E402
+from weatherlink.api.metrics import StageLatency  # noqa: E402
+
+from .benchmark import report  # noqa: E402
+from .harness import FakeEntity, config_entry, home_assistant, run_coordinator  # noqa: E402
+from .simulator import run_stations  # noqa: E402
+
+PACKETS_PER_STATION = 40
+BROADCAST_INTERVAL = 0.025
+"""100 times faster than the real device."""
+STAGES = ("parsed", "read", "merged", "written")
+
+
+async def _measure(config_dir: Path, station_count: int) -> StageLatency:
+    latency = StageLatency()
+    async with (
+        home_assistant(config_dir) as hass,
+        run_stations(station_count, broadcast_interval=BROADCAST_INTERVAL) as stations,
+        contextlib.AsyncExitStack() as stack,
+    ):
+        coordinators: list[WeatherLinkCoordinator] = []
+        for station in stations:
+            entry = config_entry(
+                station.base_url, listen_to_broadcasts=True, measure_latency=True
+            )
+            coordinator = await stack.enter_async_context(run_coordinator(hass, entry))
+            # one set of histograms for all stations, before the first broadcast arrives
+            coordinator.packet_latency = latency
+            coordinator.async_subscribe_fields(
+                FakeEntity(), condition_fields(IssCondition, "wind_speed_last")
+            )
+            coordinators.append(coordinator)
+
+        async with asyncio.timeout(30):
+            while (
+                merged := latency.stages.get("merged")
+            ) is None or merged.count < station_count * PACKETS_PER_STATION:
+                await asyncio.sleep(0.05)
+
+        assert all(coordinator.broadcast is not None for coordinator in coordinators)
+
+    return latency
+
+
+@pytest.mark.parametrize("station_count", [1, 10, 50])
+def test_packet_to_state_latency(tmp_path: Path, station_count: int):
+    latency = asyncio.run(_measure(tmp_path, station_count))
+
+    assert set(latency.stages) == set(STAGES)
+    # the simulated wind changes with nearly every packet, so most of them are written
+    counts = [latency.stages[stage].count for stage in STAGES]
+    assert counts == sorted(counts, reverse=True)
+    assert latency.stages["written"].count >= station_count * PACKETS_PER_STATION / 2
+
+    timings: dict[str, float] = {}
+    for stage in STAGES:
+        histogram = latency.stages[stage]
+        timings[f"{stage}_p50"] = histogram.quantile(0.5) or 0.0
+        timings[f"{stage}_p99"] = histogram.quantile(0.99) or 0.0
+    report(f"packet to state latency, {station_count} station(s)", **timings)
@@ -0,0 +1,203 @@
+import math
+
+import pytest
+from weatherlink.polling import (
+    AdaptiveInterval,
+    DataAgeSummary,
+    EventTrigger,
+    PhaseLockedPoller,
+    StreamHealth,
+)
+
+
+def simulate(
+    poller: PhaseLockedPoller,
+    *,
+    refresh_period: float,
+    refresh_offset: float,
+    polls: int,
+    phase_locked: bool,
+) -> DataAgeSummary:
+    """Poll a device which refreshes every `refresh_period` seconds.
+
+    Like the AirLink the device reports its last refresh with a resolution of seconds.
+    """
+    now = 0.25
+    for _ in range(polls):
+        last_refresh = (
+            math.floor((now - refresh_offset) / refresh_period) * refresh_period
+            + refresh_offset
+        )
+        poller.observe(now, data_age=math.floor(now) - math.floor(last_refresh))
+        now += poller.next_delay(now) if phase_locked else poller.period
+
+    summary = poller.age_summary()
+    assert summary is not None
+    return summary
+
+
+@pytest.mark.parametrize("refresh_period", [30.0, 60.0])
+def test_phase_locked_polls_get_fresher_data(refresh_period: float):
+    fixed = simulate(
+        PhaseLockedPoller(30.0),
+        refresh_period=refresh_period,
+        refresh_offset=17.0,
+        polls=200,
+        phase_locked=False,
+    )
+    locked = simulate(
+        PhaseLockedPoller(30.0),
+        refresh_period=refresh_period,
+        refresh_offset=17.0,
+        polls=200,
+        phase_locked=True,
+    )
+    assert locked.mean < fixed.mean
+    # polls land just after a refresh, except for every other poll of a device refreshing every 60 s
+    assert locked.mean <= 2.0 + (refresh_period - 30.0) / 2
+
+
+def test_phase_wraps_around_the_period():
+    poller = PhaseLockedPoller(30.0)
+    # refreshes straddling the end of the period average to its end, not its middle
+    poller.observe(29.0, data_age=0.0)
+    poller.observe(61.0, data_age=0.0)
+    assert poller.phase is not None
+    assert min(poller.phase, 30.0 - poller.phase) < 1.0
+
+
+def test_poller_without_observations_keeps_the_period():
+    poller = PhaseLockedPoller(30.0)
+    poller.observe(10.0, data_age=None)
+    assert poller.next_delay(10.0) == 30.0
+    assert poller.age_summary() is None
+
+
+def test_stale_sensor_does_not_move_the_phase():
+    poller = PhaseLockedPoller(30.0)
+    poller.observe(100.0, data_age=3.0)
+    phase = poller.phase
+    poller.observe(130.0, data_age=3600.0)
+    assert poller.phase == phase
+    assert len(poller.ages) == 2
+
+    delay = poller.next_delay(130.0)
+    assert 15.0 <= delay < 45.0
+
+    # the stale report doesn't anchor the phase either
+    poller.set_period(60.0)
+    assert poller.phase == pytest.approx(37.0)
+
+
+def test_phase_survives_period_changes():
+    poller = PhaseLockedPoller(30.0)
+    assert poller.phase is None
+    poller.set_period(60.0)
+    assert poller.phase is None
+
+    now = 0.25
+
+    def poll() -> float:
+        # the device refreshes every 30 seconds, 17 seconds into the period
+        nonlocal now
+        last_refresh = math.floor((now - 17.0) / 30.0) * 30.0 + 17.0
+        data_age = math.floor(now) - math.floor(last_refresh)
+        poller.observe(now, data_age=data_age)
+        now += poller.next_delay(now)
+        return data_age
+
+    def refresh_offset() -> float:
+        assert poller.phase is not None
+        return poller.phase % 30.0
+
+    for _ in range(20):
+        poll()
+    assert refresh_offset() == pytest.approx(17.0, abs=1.0)
+
+    # adaptive polling switching between intervals
+    for period in (30.0, 60.0, 120.0, 30.0, 60.0):
+        poller.set_period(period)
+        assert refresh_offset() == pytest.approx(17.0, abs=1.0)
+        # every poll lands right after a refresh, without re-learning the phase first
+        assert max(poll() for _ in range(3)) <= 2.0
+
+
+def test_adaptive_interval_follows_the_change_rate():
+    adaptive = AdaptiveInterval(
+        {"rain_rate": 1.0, "pressure": 0.1},
+        min_interval=10.0,
+        max_interval=300.0,
+        interval=30.0,
+    )
+    now = 0.0
+
+    def poll(**values: float | None) -> float:
+        nonlocal now
+        interval = adaptive.observe(now, values)
+        now += interval
+        return interval
+
+    # a calm night lets the interval grow up to the ceiling
+    intervals = [poll(rain_rate=0.0, pressure=1013.0) for _ in range(20)]
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 300.0
+
+    # the first fast change shrinks the interval, a storm holds it at the floor
+    intervals = [poll(rain_rate=20.0 * i, pressure=1013.0) for i in range(1, 11)]
+    assert intervals[0] == 150.0
+    assert intervals[-1] == 10.0
+    assert adaptive.activity >= 1.0
+
+
+def test_adaptive_interval_ignores_missing_values():
+    adaptive = AdaptiveInterval(
+        {"wind": 5.0}, min_interval=10.0, max_interval=60.0, interval=120.0
+    )
+    assert adaptive.interval == 60.0
+    assert adaptive.observe(0.0, {"wind": None}) == 60.0
+    # no previous value to compare against counts as flat
+    assert adaptive.observe(60.0, {"wind": 50.0}) == 60.0
+    assert adaptive.observe(120.0, {"wind": 100.0}) == 30.0
+
+    with pytest.raises(ValueError):
+        AdaptiveInterval({}, min_interval=60.0, max_interval=10.0, interval=30.0)
+
+
+def test_stream_health_tracks_stalls():
+    health = StreamHealth(10.0)
+    assert not health.is_healthy(0.0)
+
+    assert health.feed(0.0)
+    assert not health.feed(2.5)
+    assert health.is_healthy(12.0)
+    assert not health.is_healthy(12.5)
+
+    assert health.stall()
+    assert not health.stall()
+    assert not health.is_healthy(2.5)
+    assert health.stall_count == 1
+
+    assert health.feed(20.0)
+    assert health.is_healthy(20.0)
+
+
+def test_event_trigger_lapses_after_quiet_period():
+    trigger = EventTrigger(
+        {"wind": 30.0, "rain_rate": 0.0, "bar_trend": 3.0}, quiet_period=900.0
+    )
+    calm = {"wind": 10.0, "rain_rate": 0.0, "bar_trend": -1.0}
+    assert not trigger.update(0.0, calm)
+
+    # a falling pressure counts just like a rising one
+    assert trigger.update(60.0, {**calm, "bar_trend": -4.0})
+    assert trigger.triggered_by == "bar_trend"
+    assert trigger.update(120.0, {**calm, "rain_rate": 0.2})
+    assert trigger.trigger_count == 1
+
+    assert trigger.update(1000.0, calm)
+    assert not trigger.update(1020.0, calm)
+
+    assert not trigger.update(1030.0, {**calm, "wind": None})
+    assert trigger.update(1040.0, {**calm, "wind": 45.0})
+    assert trigger.triggered_by == "wind"
+    assert trigger.trigger_count == 2
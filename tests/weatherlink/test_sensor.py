@@ -0,0 +1,106 @@
+import asyncio
+import types
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from weatherlink.api import CurrentConditions, WeatherLinkRest  # noqa: E402
+from weatherlink.api.metrics import CpuMeter, Histogram, recent_events  # noqa: E402
+from weatherlink.api.rest import CircuitBreaker, parse_from_json  # noqa: E402
+from weatherlink.polling import PhaseLockedPoller, StreamHealth  # noqa: E402
+from weatherlink.sensor import WeatherLinkSensor  # noqa: E402
+from weatherlink.sensor_diagnostic import (  # noqa: E402
+    DiagnosticSensor,
+    LatencySensor,
+    ParseTime,
+    UpdateInterval,
+)
+
+from .api import samples  # noqa: E402
+from .benchmark import measure, report  # noqa: E402
+
+
+def _coordinator(body: dict, base_url: str) -> types.SimpleNamespace:
+    """Stand-in for the coordinator with everything the sensors read."""
+    conditions = parse_from_json(CurrentConditions, body)
+    session = WeatherLinkRest(None, base_url)  # type: ignore[arg-type]
+    cpu_meters = {
+        "response_parse": CpuMeter(),
+        "refresh": CpuMeter(),
+        "notify": CpuMeter(),
+        "entity_write": CpuMeter(),
+    }
+    return types.SimpleNamespace(
+        data=conditions,
+        device_did=conditions.did,
+        device_model_name=conditions.determine_device_type().value,
+        device_name=conditions.determine_device_name(),
+        update_interval=timedelta(seconds=30),
+        session=session,
+        cpu_meters=lambda: dict(cpu_meters),
+        poller=PhaseLockedPoller(30),
+        adaptive=None,
+        broadcast=None,
+        broadcast_health=StreamHealth(10),
+        breaker=CircuitBreaker(),
+        refresh_count=0,
+        retry_count=0,
+        failed_refresh_count=0,
+        skipped_refresh_count=0,
+        refresh_time=Histogram(),
+        recent_refreshes=recent_events(),
+    )
+
+
+@pytest.mark.parametrize(
+    ("device", "body"),
+    [
+        ("wll", samples.wll_current_conditions_body),
+        ("airlink", samples.airlink_current_conditions_body),
+    ],
+)
+def test_sensor_state_benchmark(device: str, body):
+    loop = asyncio.new_event_loop()
+    try:
+        coord = _coordinator(body(), f"http://{device}.invalid")
+        sensors = list(WeatherLinkSensor.iter_sensors_for_coordinator(coord))  # type: ignore[arg-type]
+        assert sensors
+        for sensor in sensors:
+            sensor.hass = types.SimpleNamespace(loop=loop)  # type: ignore[assignment]
+
+        def write_all():
+            # what writing the state of every entity evaluates
+            for sensor in sensors:
+                sensor.native_value
+                sensor.extra_state_attributes
+
+        write_all()
+        report(
+            f"sensor state {device}",
+            all_sensors=measure(write_all, number=500),
+        )
+    finally:
+        loop.close()
+
+
+def test_latency_sensor_needs_a_histogram():
+    coord = _coordinator(samples.wll_current_conditions_body(), "http://wll.invalid")
+    with pytest.raises(TypeError, match="_histogram"):
+        LatencySensor(coord)  # type: ignore[abstract, arg-type]
+
+    assert ParseTime(coord)._histogram is coord.session.parse_time  # type: ignore[arg-type]
+
+
+def test_diagnostics_are_only_written_per_poll():
+    diagnostics = [
+        sensor
+        for sensor in WeatherLinkSensor._SENSORS
+        if issubclass(sensor, DiagnosticSensor)
+    ]
+    assert UpdateInterval in diagnostics
+    for sensor in diagnostics:
+        # not written by broadcasts, which never change them
+        assert sensor._input_fields == frozenset(), sensor
+        assert sensor._time_dependent, sensor